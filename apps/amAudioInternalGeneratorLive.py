@@ -31,19 +31,39 @@ import sys
 import time
 
 # Third party imports
-from gnuradio import blocks  # type: ignore
-from gnuradio import filter # type: ignore
 from gnuradio import gr # type: ignore
-from gnuradio import qtgui # type: ignore
-from gnuradio import soapy, uhd  # type: ignore
-from gnuradio.fft import window # type: ignore
-from gnuradio.qtgui import Range, RangeWidget # type: ignore
 from PyQt5 import Qt # type: ignore
 from PyQt5 import QtCore # type: ignore
 from PyQt5.QtCore import pyqtSlot # type: ignore
 
 # Local imports
-from apps.utils import apply_dark_theme, read_settings
+from apps.utils import apply_dark_theme, read_settings, lazy_import
+from apps.control_server import maybe_start_control_server
+from apps.iq_recorder import maybe_attach_iq_recorder
+from apps.graph_optimizer import recording_connections, maybe_optimize_graph
+from apps.network_audio import NetworkAudioSource
+
+# Deferred gnuradio imports: DSP blocks and the radio driver load on first use
+blocks = lazy_import('gnuradio.blocks')
+filter = lazy_import('gnuradio.filter')
+qtgui = lazy_import('gnuradio.qtgui')
+soapy = lazy_import('gnuradio.soapy')
+uhd = lazy_import('gnuradio.uhd')
+window = lazy_import('gnuradio.fft', 'window')
+Range = lazy_import('gnuradio.qtgui', 'Range')
+RangeWidget = lazy_import('gnuradio.qtgui', 'RangeWidget')
+
+# Launcher manifest: read by apps/app_index.py without importing this module
+APP_MANIFEST = {
+    'name': "AM Audio Generator",
+    'icon': "amAudio.jpg",
+    'category': 'audio',
+    'order': 0,
+    'media': ['wav'],
+    'samp_rate': 2e6,
+    'cpu_cost': 'low',
+    'radios': ['hackrf', 'usrp'],
+}
 
 def get_wav_files(settings):
     """Get list of wav files from media directory"""
@@ -211,6 +231,7 @@ class ConfigDialog(Qt.QDialog):
                 display_name = os.path.splitext(os.path.basename(wav_file))[0].replace('-', ' ')
                 self.source_combo.addItem(display_name, wav_file)
 
+            self.source_combo.addItem("Network Audio (UDP)", "network")
             self.source_combo.addItem("Sinewave", "sinewave")
             self.source_combo.addItem("No Modulation", "none")
 
@@ -316,12 +337,17 @@ class ConfigDialog(Qt.QDialog):
         sidebandTypeDefault = (1 if self.upper_sideband.isChecked() else -1) if sidebandDefault == 1 else 1
 
         current_data = self.source_combo.currentData()
+        networkAudio = None
         if current_data == "sinewave":
             sourceIndex = 1
             wavFile = None
         elif current_data == "none":
             sourceIndex = 2
             wavFile = None
+        elif current_data == "network":
+            sourceIndex = 0
+            wavFile = None
+            networkAudio = {}
         else:
             sourceIndex = 0
             wavFile = current_data
@@ -338,6 +364,7 @@ class ConfigDialog(Qt.QDialog):
             'sidebandTypeDefault': sidebandTypeDefault,
             'sourceIndex': sourceIndex,
             'wavFile': wavFile,
+            'networkAudio': networkAudio,
             'sineFreq': self.sine_slider.value(),
         }
 
@@ -780,8 +807,12 @@ class amAudioInternalGeneratorLive(gr.top_block, Qt.QWidget):
         self.blocks_complex_to_float_0 = blocks.complex_to_float(1)
         self.blocks_add_const_vxx_0 = blocks.add_const_ff(carrier)
 
-        # WAV file source (48kHz → 24kHz via decimation by 2)
-        if self.wavFile and os.path.exists(self.wavFile):
+        # WAV file or network audio source (48kHz → 24kHz via decimation by 2)
+        self.network_audio = None
+        if values.get('networkAudio') is not None:
+            self.network_audio = NetworkAudioSource(mikePort, 48000, values['networkAudio'], "amAudioInternalGeneratorLive")
+            self.blocks_wavfile_source_0 = self.network_audio
+        elif self.wavFile and os.path.exists(self.wavFile):
             self.blocks_wavfile_source_0 = blocks.wavfile_source(self.wavFile, True)
         else:
             self.blocks_wavfile_source_0 = blocks.null_source(gr.sizeof_float*1)
@@ -817,6 +848,7 @@ class amAudioInternalGeneratorLive(gr.top_block, Qt.QWidget):
         self.connect((self.blocks_float_to_complex_0_0, 0), (self.qtgui_time_sink_x_0, 0))
         self.connect((self.blocks_float_to_complex_0_0, 0), (self.rational_resampler_xxx_1, 0))
         self.connect((self.blocks_float_to_complex_0_0, 0), (self.radio_sink, 0))
+        self.radio_feed = (self.blocks_float_to_complex_0_0, 0)
         self.connect((self.blocks_multiply_const_vxx_0, 0), (self.blocks_float_to_complex_0_0, 1))
         self.connect((self.blocks_multiply_const_vxx_2, 0), (self.blocks_add_const_vxx_0, 0))
         self.connect((self.blocks_multiply_const_vxx_3, 0), (self.blocks_complex_to_float_0, 0))
@@ -831,6 +863,8 @@ class amAudioInternalGeneratorLive(gr.top_block, Qt.QWidget):
         self.settings.setValue("geometry", self.saveGeometry())
         self.stop()
         self.wait()
+        if self.network_audio is not None:
+            self.network_audio.close()
 
         event.accept()
 
@@ -993,8 +1027,11 @@ def main(top_block_cls=amAudioInternalGeneratorLive, options=None, app=None, con
             Qt.QApplication.setGraphicsSystem(style)
         app = Qt.QApplication(sys.argv)
 
-    tb = top_block_cls(config_values)
+    tb = recording_connections(top_block_cls)(config_values)
+    tb.graph_report = maybe_optimize_graph(tb, 'amAudioInternalGeneratorLive')
+    tb.iq_recorder = maybe_attach_iq_recorder(tb, 'amAudioInternalGeneratorLive')
     tb.start()
+    tb.control_server = maybe_start_control_server(tb, 'amAudioInternalGeneratorLive')
     tb.show()
 
     def sig_handler(sig=None, frame=None):
@@ -30,21 +30,40 @@ import sys
 import time
 
 # Third party imports
-from gnuradio import analog # type: ignore
-from gnuradio import blocks # type: ignore
-from gnuradio import filter # type: ignore
 from gnuradio import gr # type: ignore
-from gnuradio import qtgui # type: ignore
-from gnuradio import soapy, uhd  # type: ignore
-from gnuradio.fft import window  # type: ignore
-from gnuradio.qtgui import Range, RangeWidget # type: ignore
 from packaging.version import Version as StrictVersion # type: ignore
 from PyQt5 import Qt # type: ignore
 from PyQt5 import QtCore # type: ignore
 from PyQt5.QtCore import pyqtSlot # type: ignore
 
 # Local imports
-from apps.utils import apply_dark_theme, read_settings
+from apps.utils import apply_dark_theme, read_settings, lazy_import
+from apps.control_server import maybe_start_control_server
+from apps.iq_recorder import maybe_attach_iq_recorder
+from apps.graph_optimizer import recording_connections, maybe_optimize_graph
+
+# Deferred gnuradio imports: DSP blocks and the radio driver load on first use
+analog = lazy_import('gnuradio.analog')
+blocks = lazy_import('gnuradio.blocks')
+filter = lazy_import('gnuradio.filter')
+qtgui = lazy_import('gnuradio.qtgui')
+soapy = lazy_import('gnuradio.soapy')
+uhd = lazy_import('gnuradio.uhd')
+window = lazy_import('gnuradio.fft', 'window')
+Range = lazy_import('gnuradio.qtgui', 'Range')
+RangeWidget = lazy_import('gnuradio.qtgui', 'RangeWidget')
+
+# Launcher manifest: read by apps/app_index.py without importing this module
+APP_MANIFEST = {
+    'name': "AM Sine Generator",
+    'icon': "amSine.jpg",
+    'category': 'digital',
+    'order': 0,
+    'media': [],
+    'samp_rate': 2e6,
+    'cpu_cost': 'low',
+    'radios': ['hackrf', 'usrp'],
+}
 
 
 class ConfigDialog(Qt.QDialog):
@@ -717,6 +736,7 @@ class amSineGenerator(gr.top_block, Qt.QWidget):
         self.connect((self.blocks_multiply_const_vxx_0, 0), (self.blocks_float_to_complex_0_0, 1))
         self.connect((self.blocks_multiply_const_vxx_3, 0), (self.blocks_complex_to_float_0, 0))
         self.connect((self.blocks_multiply_xx_0, 0), (self.radio_sink, 0))
+        self.radio_feed = (self.blocks_multiply_xx_0, 0)
         self.connect((self.blocks_selector_2, 0), (self.rational_resampler_xxx_0, 0))
         self.connect((self.hilbert_fc_0, 0), (self.blocks_selector_2, 1))
         self.connect((self.rational_resampler_xxx_0, 0), (self.blocks_multiply_const_vxx_3, 0))
@@ -901,8 +921,11 @@ def main(top_block_cls=amSineGenerator, options=None, app=None, config_values=No
             Qt.QApplication.setGraphicsSystem(style)
         app = Qt.QApplication(sys.argv)
 
-    tb = top_block_cls(config_values)
+    tb = recording_connections(top_block_cls)(config_values)
+    tb.graph_report = maybe_optimize_graph(tb, 'amSineGenerator')
+    tb.iq_recorder = maybe_attach_iq_recorder(tb, 'amSineGenerator')
     tb.start()
+    tb.control_server = maybe_start_control_server(tb, 'amSineGenerator')
     tb.show()
 
     def sig_handler(sig=None, frame=None):
@@ -32,12 +32,34 @@ import time
 from PyQt5 import Qt, QtCore # type: ignore
 import sip # type: ignore
 
-from gnuradio import blocks, filter, gr, qtgui, soapy, uhd  # type: ignore
-from gnuradio.fft import window # type: ignore
+from gnuradio import gr # type: ignore
 import pmt # type: ignore
 
 # Local imports
-from apps.utils import apply_dark_theme, read_settings
+from apps.utils import apply_dark_theme, read_settings, lazy_import
+from apps.control_server import maybe_start_control_server
+from apps.iq_recorder import maybe_attach_iq_recorder
+from apps.graph_optimizer import recording_connections, maybe_optimize_graph
+
+# Deferred gnuradio imports: DSP blocks and the radio driver load on first use
+blocks = lazy_import('gnuradio.blocks')
+filter = lazy_import('gnuradio.filter')
+qtgui = lazy_import('gnuradio.qtgui')
+soapy = lazy_import('gnuradio.soapy')
+uhd = lazy_import('gnuradio.uhd')
+window = lazy_import('gnuradio.fft', 'window')
+
+# Launcher manifest: read by apps/app_index.py without importing this module
+APP_MANIFEST = {
+    'name': "AM Video Transmitter",
+    'icon': "amVideo.jpg",
+    'category': 'video',
+    'order': 2,
+    'media': ['dat'],
+    'samp_rate': 20e6,
+    'cpu_cost': 'medium',
+    'radios': ['hackrf', 'usrp'],
+}
 
 class ConfigDialog(Qt.QDialog):
     def __init__(self, parent=None):
@@ -394,6 +416,7 @@ class amVideoRecordedXmitter(gr.top_block, Qt.QWidget):
         self.connect((self.blocks_null_source_0, 0), (self.blocks_float_to_complex_0, 1))
         self.connect((self.rational_resampler_xxx_0, 0), (self.qtgui_freq_sink_x_0, 0))
         self.connect((self.rational_resampler_xxx_0, 0), (self.radio_sink, 0))
+        self.radio_feed = (self.rational_resampler_xxx_0, 0)
 
 
     def closeEvent(self, event):
@@ -433,8 +456,11 @@ def main(top_block_cls=amVideoRecordedXmitter, *, app=None, config_values=None):
             Qt.QApplication.setGraphicsSystem(style)
         app = Qt.QApplication(sys.argv)
 
-    tb = top_block_cls(config_values)
+    tb = recording_connections(top_block_cls)(config_values)
+    tb.graph_report = maybe_optimize_graph(tb, 'amVideoRecordedXmitter')
+    tb.iq_recorder = maybe_attach_iq_recorder(tb, 'amVideoRecordedXmitter')
     tb.start()
+    tb.control_server = maybe_start_control_server(tb, 'amVideoRecordedXmitter')
     tb.show()
 
     def sig_handler(*_):  # Catch any arguments but don't use them
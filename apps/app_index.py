@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import ast
+import glob
+import json
+import os
+
+from apps.settings_store import atomic_write_json
+
+APPS_DIR = "apps"
+INDEX_FILE = os.path.join("config", "app_index.json")
+MANIFEST_NAME = "APP_MANIFEST"
+# Launcher grid rows, top to bottom
+APP_CATEGORIES = ['digital', 'audio', 'video', 'replay']
+
+
+def read_manifest(path):
+    """Return the APP_MANIFEST dict literal declared in ``path``, or None.
+
+    The source is parsed, not executed, so no app (or gnuradio) code runs.
+    """
+    try:
+        with open(path) as f:
+            tree = ast.parse(f.read(), filename=path)
+    except (OSError, SyntaxError) as e:
+        print(f"Error reading manifest from {path}: {e}")
+        return None
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name)
+                and node.targets[0].id == MANIFEST_NAME):
+            try:
+                return ast.literal_eval(node.value)
+            except ValueError as e:
+                print(f"Error evaluating manifest in {path}: {e}")
+    return None
+
+
+def source_state(apps_dir=APPS_DIR):
+    """Map each app source file to [mtime_ns, size] so changes can be detected"""
+    state = {}
+    for path in sorted(glob.glob(os.path.join(apps_dir, "*.py"))):
+        stat = os.stat(path)
+        state[os.path.basename(path)] = [stat.st_mtime_ns, stat.st_size]
+    return state
+
+
+def build_app_index(apps_dir=APPS_DIR):
+    apps = []
+    for path in sorted(glob.glob(os.path.join(apps_dir, "*.py"))):
+        manifest = read_manifest(path)
+        if manifest:
+            manifest['module'] = os.path.splitext(os.path.basename(path))[0]
+            apps.append(manifest)
+    rank = {category: i for i, category in enumerate(APP_CATEGORIES)}
+    apps.sort(key=lambda m: (rank.get(m.get('category'), len(rank)), m.get('order', 0), m['name']))
+    return apps
+
+
+def load_app_index(apps_dir=APPS_DIR, index_file=INDEX_FILE):
+    """Return app manifests from the cached index, rebuilding it if apps/ changed"""
+    state = source_state(apps_dir)
+    try:
+        with open(index_file) as f:
+            cached = json.load(f)
+        if cached.get('sources') == state:
+            return cached['apps']
+    except (OSError, ValueError, KeyError):
+        pass
+
+    apps = build_app_index(apps_dir)
+    try:
+        atomic_write_json(index_file, {'sources': state, 'apps': apps})
+    except Exception as e:
+        print(f"Error saving app index: {e}")
+    return apps
@@ -27,19 +27,45 @@ import json
 import os
 import signal
 import sys
+import time
 
 # Third party imports 
 from PyQt5 import Qt, QtCore # type: ignore
 from PyQt5.QtCore import pyqtSlot # type: ignore
 import sip # type: ignore
 
-from gnuradio import analog, blocks, eng_notation, filter, gr, qtgui, soapy, uhd # type: ignore
-from gnuradio.fft import window # type: ignore
-from gnuradio.filter import firdes # type: ignore
-from gnuradio.qtgui import Range, RangeWidget # type: ignore
+from gnuradio import eng_notation, gr # type: ignore
 
 # Local imports
-from apps.utils import apply_dark_theme, read_settings
+from apps.utils import apply_dark_theme, read_settings, lazy_import
+from apps.control_server import maybe_start_control_server
+from apps.iq_recorder import maybe_attach_iq_recorder
+from apps.graph_optimizer import recording_connections, maybe_optimize_graph
+from apps.tx_controls import TxControls
+from apps.ask_shaper import AskShaper
+
+# Deferred gnuradio imports: DSP blocks and the radio driver load on first use
+analog = lazy_import('gnuradio.analog')
+blocks = lazy_import('gnuradio.blocks')
+qtgui = lazy_import('gnuradio.qtgui')
+soapy = lazy_import('gnuradio.soapy')
+uhd = lazy_import('gnuradio.uhd')
+window = lazy_import('gnuradio.fft', 'window')
+firdes = lazy_import('gnuradio.filter', 'firdes')
+Range = lazy_import('gnuradio.qtgui', 'Range')
+RangeWidget = lazy_import('gnuradio.qtgui', 'RangeWidget')
+
+# Launcher manifest: read by apps/app_index.py without importing this module
+APP_MANIFEST = {
+    'name': "ASK Generator",
+    'icon': "ask.jpg",
+    'category': 'digital',
+    'order': 1,
+    'media': [],
+    'samp_rate': 10e6,
+    'cpu_cost': 'medium',
+    'radios': ['hackrf', 'usrp'],
+}
 
 class ConfigDialog(Qt.QDialog):
     def __init__(self, parent=None):
@@ -258,6 +284,7 @@ class ConfigDialog(Qt.QDialog):
         return {
             'radio_type': self.radio_type,
             'ipXmitAddr': ipXmitAddr,
+            'mikePort': 2020 + ipNum,
             'cf': self.cf_slider.value(),
             'pwr': pwr,
             'bitsPerSym': bitsPerSym,
@@ -268,7 +295,7 @@ class ConfigDialog(Qt.QDialog):
             'alphaDefault': self.alpha_slider.value() / 100
         }
 
-class askGenerator(gr.top_block, Qt.QWidget):
+class askGenerator(gr.top_block, Qt.QWidget, TxControls):
 
     def __init__(self, config_values=None):
         gr.top_block.__init__(self, "ASK Signal Generator", catch_exceptions=True)
@@ -316,6 +343,7 @@ class askGenerator(gr.top_block, Qt.QWidget):
         # Assign all values
         radio_type = values.get('radio_type', 'hackrf')
         ipXmitAddr = values.get('ipXmitAddr', '')
+        mikePort = values.get('mikePort', 2020)
         cf = values['cf']
         pwr = values['pwr']
         bitsPerSym = values['bitsPerSym']
@@ -341,6 +369,11 @@ class askGenerator(gr.top_block, Qt.QWidget):
         self.sps = sps = int(samp_rate/actualSymRate/1000)
         self.rfPwr = rfPwr = rfPwrDefault
         self.radio_type = radio_type
+        self.hopper = None
+        self.burst_gate = None
+        self.payload_source = None
+        self.payload_port = mikePort
+        self.reconfigure_ms = None  # flowgraph pause of the last live modulation change
         self.modName = modName = modNameDefault
         self.filterVal = filterVal = filterDefault
         self.displayedBitsPerSym = displayedBitsPerSym = bitsPerSym
@@ -364,6 +397,23 @@ class askGenerator(gr.top_block, Qt.QWidget):
             self.top_grid_layout.setRowStretch(r, 1)
         for c in range(3, 6):
             self.top_grid_layout.setColumnStretch(c, 1)
+        # Modulation order is a live control: see set_bitsPerSym
+        self._bitsPerSym_options = [1, 2, 3]
+        self._bitsPerSym_labels = ['2ASK', '4ASK', '8ASK']
+        self._bitsPerSym_tool_bar = Qt.QToolBar(self)
+        self._bitsPerSym_tool_bar.addWidget(Qt.QLabel("Modulation Order" + ": "))
+        self._bitsPerSym_combo_box = Qt.QComboBox()
+        self._bitsPerSym_tool_bar.addWidget(self._bitsPerSym_combo_box)
+        for _label in self._bitsPerSym_labels: self._bitsPerSym_combo_box.addItem(_label)
+        self._bitsPerSym_callback = lambda i: Qt.QMetaObject.invokeMethod(self._bitsPerSym_combo_box, "setCurrentIndex", Qt.Q_ARG("int", self._bitsPerSym_options.index(i)))
+        self._bitsPerSym_callback(self.bitsPerSym)
+        self._bitsPerSym_combo_box.currentIndexChanged.connect(
+            lambda i: self.set_bitsPerSym(self._bitsPerSym_options[i]))
+        self.top_grid_layout.addWidget(self._bitsPerSym_tool_bar, 1, 5, 1, 3)
+        for r in range(1, 2):
+            self.top_grid_layout.setRowStretch(r, 1)
+        for c in range(5, 8):
+            self.top_grid_layout.setColumnStretch(c, 1)
         self._rfPwr_range = Range(-80, -30, 1, rfPwrDefault, 200)
         self._rfPwr_win = RangeWidget(self._rfPwr_range, self.set_rfPwr, "RF Output Power", "counter_slider", float, QtCore.Qt.Horizontal)
         self.top_grid_layout.addWidget(self._rfPwr_win, 1, 0, 1, 5)
@@ -622,7 +672,6 @@ class askGenerator(gr.top_block, Qt.QWidget):
             self.top_grid_layout.setRowStretch(r, 1)
         for c in range(3, 6):
             self.top_grid_layout.setColumnStretch(c, 1)
-        self.filter_fft_rrc_filter_0 = filter.fft_filter_fff(1, firdes.root_raised_cosine(1, samp_rate, actualSymRate*1e3, alpha, 11*sps), 1)
         self._displayedBitsPerSym_tool_bar = Qt.QToolBar(self)
 
         if None:
@@ -653,18 +702,10 @@ class askGenerator(gr.top_block, Qt.QWidget):
             self.top_grid_layout.setRowStretch(r, 1)
         for c in range(6, 10):
             self.top_grid_layout.setColumnStretch(c, 1)
-        self.blocks_uchar_to_float_0 = blocks.uchar_to_float()
-        self.blocks_selector_0 = blocks.selector(gr.sizeof_float*1,filterVal,0)
-        self.blocks_selector_0.set_enabled(True)
-        self.blocks_repeat_0_0 = blocks.repeat(gr.sizeof_char*1, int(samp_rate/symRate/1000))
-        self.blocks_null_source_0 = blocks.null_source(gr.sizeof_float*1)
         self.blocks_multiply_const_vxx_2 = blocks.multiply_const_cc(10**((rfPwr<=-50)*(rfPwr+50)/20))
-        self.blocks_multiply_const_vxx_1 = blocks.multiply_const_ff(1/(2**bitsPerSym-1))
-        self.blocks_multiply_const_vxx_0 = blocks.multiply_const_cc(0.475)
-        self.blocks_float_to_complex_0 = blocks.float_to_complex(1)
-        self.blocks_add_const_vxx_1 = blocks.add_const_ff(carrier)
-        self.blocks_add_const_vxx_0 = blocks.add_const_ff(-0.5)
         self.analog_random_uniform_source_x_0 = analog.random_uniform_source_b(0, int(2**bitsPerSym), 0)
+        # Symbol-rate ASK: levels, RRC polyphase shaping and carrier offset in one stage (see apps/ask_shaper.py)
+        self.ask_shaper_0 = AskShaper(bitsPerSym, sps, firdes.root_raised_cosine(1, samp_rate, actualSymRate*1e3, alpha, 11*sps) if filterVal else None, carrier, 0.475)
         self._actualBitRate_tool_bar = Qt.QToolBar(self)
 
         if None:
@@ -685,29 +726,39 @@ class askGenerator(gr.top_block, Qt.QWidget):
         ##################################################
         # Connections
         ##################################################
-        self.connect((self.analog_random_uniform_source_x_0, 0), (self.blocks_repeat_0_0, 0))
-        self.connect((self.blocks_add_const_vxx_0, 0), (self.blocks_selector_0, 0))
-        self.connect((self.blocks_add_const_vxx_0, 0), (self.filter_fft_rrc_filter_0, 0))
-        self.connect((self.blocks_add_const_vxx_1, 0), (self.blocks_float_to_complex_0, 0))
-        self.connect((self.blocks_add_const_vxx_1, 0), (self.qtgui_time_sink_x_0, 0))
-        self.connect((self.blocks_float_to_complex_0, 0), (self.blocks_multiply_const_vxx_0, 0))
-        self.connect((self.blocks_multiply_const_vxx_0, 0), (self.blocks_multiply_const_vxx_2, 0))
-        self.connect((self.blocks_multiply_const_vxx_0, 0), (self.qtgui_const_sink_x_0, 0))
-        self.connect((self.blocks_multiply_const_vxx_0, 0), (self.qtgui_freq_sink_x_0, 0))
-        self.connect((self.blocks_multiply_const_vxx_1, 0), (self.blocks_add_const_vxx_0, 0))
+        self.connect((self.analog_random_uniform_source_x_0, 0), (self.ask_shaper_0, 0))
+        self.connect((self.ask_shaper_0, 0), (self.blocks_multiply_const_vxx_2, 0))
+        self.connect((self.ask_shaper_0, 0), (self.qtgui_const_sink_x_0, 0))
+        self.connect((self.ask_shaper_0, 0), (self.qtgui_freq_sink_x_0, 0))
+        self.connect((self.ask_shaper_0, 1), (self.qtgui_time_sink_x_0, 0))
         self.connect((self.blocks_multiply_const_vxx_2, 0), (self.radio_sink, 0))
-        self.connect((self.blocks_null_source_0, 0), (self.blocks_float_to_complex_0, 1))
-        self.connect((self.blocks_repeat_0_0, 0), (self.blocks_uchar_to_float_0, 0))
-        self.connect((self.blocks_selector_0, 0), (self.blocks_add_const_vxx_1, 0))
-        self.connect((self.blocks_uchar_to_float_0, 0), (self.blocks_multiply_const_vxx_1, 0))
-        self.connect((self.filter_fft_rrc_filter_0, 0), (self.blocks_selector_0, 1))
+        self.radio_feed = (self.blocks_multiply_const_vxx_2, 0)
+
+        # Optional frequency-hopping plan (see apps/freq_hopper.py)
+        if values.get('hopping'):
+            self.set_hopping(values['hopping'])
+
+        # Optional burst (duty-cycled) transmission (see apps/burst_gate.py)
+        if values.get('burst'):
+            self.set_burst(values['burst'])
+
+        # Optional external payload in place of the random symbol source (see apps/payload_source.py)
+        if values.get('payload'):
+            try:
+                self.set_payload(values['payload'])
+            except Exception as e:
+                print(f"Error starting payload source: {e}")
 
 
     def closeEvent(self, event):
         self.settings = Qt.QSettings("GNU Radio", "askGenerator")
         self.settings.setValue("geometry", self.saveGeometry())
+        if self.hopper is not None:
+            self.hopper.stop()
         self.stop()
         self.wait()
+        if self.payload_source is not None:
+            self.payload_source.close()
 
         event.accept()
 
@@ -718,7 +769,6 @@ class askGenerator(gr.top_block, Qt.QWidget):
         self.symRate = symRate
         self.set_actualSymRate(self.samp_rate/int(self.samp_rate/self.symRate/1000)/1000)
         Qt.QMetaObject.invokeMethod(self._symRate_line_edit, "setText", Qt.Q_ARG("QString", eng_notation.num_to_str(self.symRate)))
-        self.blocks_repeat_0_0.set_interpolation(int(self.samp_rate/self.symRate/1000))
 
     def get_samp_rate(self):
         return self.samp_rate
@@ -727,14 +777,15 @@ class askGenerator(gr.top_block, Qt.QWidget):
         self.samp_rate = samp_rate
         self.set_actualSymRate(self.samp_rate/int(self.samp_rate/self.symRate/1000)/1000)
         self.set_sps(int(self.samp_rate/self.actualSymRate/1000))
-        self.blocks_repeat_0_0.set_interpolation(int(self.samp_rate/self.symRate/1000))
-        self.filter_fft_rrc_filter_0.set_taps(firdes.root_raised_cosine(1, self.samp_rate, self.actualSymRate*1e3, self.alpha, 11*self.sps))
+        self.ask_shaper_0.set_pulse(self.sps, firdes.root_raised_cosine(1, self.samp_rate, self.actualSymRate*1e3, self.alpha, 11*self.sps) if self.filterVal else None)
         self.qtgui_freq_sink_x_0.set_frequency_range(self.cf*1e6, self.samp_rate)
         self.qtgui_time_sink_x_0.set_samp_rate(self.samp_rate)
         if self.radio_type == 'usrp':
             self.radio_sink.set_samp_rate(self.samp_rate)
         else:
             self.radio_sink.set_sample_rate(0, self.samp_rate)
+        if self.burst_gate is not None:
+            self.burst_gate.set_samp_rate(self.samp_rate)
 
     def get_rfPwrDefault(self):
         return self.rfPwrDefault
@@ -775,10 +826,30 @@ class askGenerator(gr.top_block, Qt.QWidget):
         return self.bitsPerSym
 
     def set_bitsPerSym(self, bitsPerSym):
-        self.bitsPerSym = bitsPerSym
+        if bitsPerSym == self.bitsPerSym:
+            return
+        # random_uniform_source_b has no setter for its range, so a new source is
+        # swapped in while the flowgraph is locked; the radio and the rest of the graph stay up
+        source = analog.random_uniform_source_b(0, int(2**bitsPerSym), 0)
+        paused = time.perf_counter()
+        self.lock()
+        try:
+            if self.payload_source is None:
+                self.disconnect((self.analog_random_uniform_source_x_0, 0), (self.ask_shaper_0, 0))
+                self.connect((source, 0), (self.ask_shaper_0, 0))
+            else:
+                self.payload_source.set_bits_per_sym(bitsPerSym)
+            self.analog_random_uniform_source_x_0 = source
+            self.bitsPerSym = bitsPerSym
+            self.ask_shaper_0.set_bits_per_sym(self.bitsPerSym)
+        finally:
+            self.unlock()
+        self.reconfigure_ms = (time.perf_counter() - paused) * 1e3
+        print(f"askGenerator: {2**self.bitsPerSym}ASK, flowgraph paused {self.reconfigure_ms:.1f} ms")
+        self._bitsPerSym_callback(self.bitsPerSym)
         self.set_actualBitRate(self.actualSymRate*self.bitsPerSym)
         self.set_displayedBitsPerSym(self.bitsPerSym)
-        self.blocks_multiply_const_vxx_1.set_k(1/(2**self.bitsPerSym-1))
+        self.set_modName(f"{2**self.bitsPerSym}ASK")
 
     def get_alphaDefault(self):
         return self.alphaDefault
@@ -795,14 +866,18 @@ class askGenerator(gr.top_block, Qt.QWidget):
         self.set_actualBitRate(self.actualSymRate*self.bitsPerSym)
         self.set_displayedActSymRate(self.actualSymRate)
         self.set_sps(int(self.samp_rate/self.actualSymRate/1000))
-        self.filter_fft_rrc_filter_0.set_taps(firdes.root_raised_cosine(1, self.samp_rate, self.actualSymRate*1e3, self.alpha, 11*self.sps))
+        self.ask_shaper_0.set_pulse(self.sps, firdes.root_raised_cosine(1, self.samp_rate, self.actualSymRate*1e3, self.alpha, 11*self.sps) if self.filterVal else None)
+
+    def get_occupiedBw(self):
+        # kHz occupied by the signal; RRC: symbol rate * (1 + alpha); unfiltered: the main lobe
+        return self.actualSymRate*(1 + self.alpha) if self.filterVal else 2*self.actualSymRate
 
     def get_sps(self):
         return self.sps
 
     def set_sps(self, sps):
         self.sps = sps
-        self.filter_fft_rrc_filter_0.set_taps(firdes.root_raised_cosine(1, self.samp_rate, self.actualSymRate*1e3, self.alpha, 11*self.sps))
+        self.ask_shaper_0.set_pulse(self.sps, firdes.root_raised_cosine(1, self.samp_rate, self.actualSymRate*1e3, self.alpha, 11*self.sps) if self.filterVal else None)
 
     def get_rfPwr(self):
         return self.rfPwr
@@ -828,7 +903,7 @@ class askGenerator(gr.top_block, Qt.QWidget):
     def set_filterVal(self, filterVal):
         self.filterVal = filterVal
         self._filterVal_callback(self.filterVal)
-        self.blocks_selector_0.set_input_index(self.filterVal)
+        self.ask_shaper_0.set_pulse(self.sps, firdes.root_raised_cosine(1, self.samp_rate, self.actualSymRate*1e3, self.alpha, 11*self.sps) if self.filterVal else None)
 
     def get_displayedBitsPerSym(self):
         return self.displayedBitsPerSym
@@ -855,20 +930,31 @@ class askGenerator(gr.top_block, Qt.QWidget):
         else:
             self.radio_sink.set_frequency(0, self.cf*1e6)
 
+    def tx_output(self):
+        return (self.blocks_multiply_const_vxx_2, 0)
+
+    def symbol_input(self):
+        return (self.ask_shaper_0, 0)
+
+    def symbol_edges(self):
+        return [
+            ((self.analog_random_uniform_source_x_0, 0), (self.ask_shaper_0, 0)),
+        ]
+
     def get_carrier(self):
         return self.carrier
 
     def set_carrier(self, carrier):
         self.carrier = carrier
         self._carrier_callback(self.carrier)
-        self.blocks_add_const_vxx_1.set_k(self.carrier)
+        self.ask_shaper_0.set_carrier(self.carrier)
 
     def get_alpha(self):
         return self.alpha
 
     def set_alpha(self, alpha):
         self.alpha = alpha
-        self.filter_fft_rrc_filter_0.set_taps(firdes.root_raised_cosine(1, self.samp_rate, self.actualSymRate*1e3, self.alpha, 11*self.sps))
+        self.ask_shaper_0.set_pulse(self.sps, firdes.root_raised_cosine(1, self.samp_rate, self.actualSymRate*1e3, self.alpha, 11*self.sps) if self.filterVal else None)
 
     def get_actualBitRate(self):
         return self.actualBitRate
@@ -887,8 +973,11 @@ def main(top_block_cls=askGenerator, options=None, app=None, config_values=None)
             Qt.QApplication.setGraphicsSystem(style)
         app = Qt.QApplication(sys.argv)
 
-    tb = top_block_cls(config_values)
+    tb = recording_connections(top_block_cls)(config_values)
+    tb.graph_report = maybe_optimize_graph(tb, 'askGenerator')
+    tb.iq_recorder = maybe_attach_iq_recorder(tb, 'askGenerator')
     tb.start()
+    tb.control_server = maybe_start_control_server(tb, 'askGenerator')
     tb.show()
 
     def sig_handler(sig=None, frame=None):
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Symbol-rate ASK shaper producing complex samples in one stage.
+
+``AskShaper`` takes one symbol (0 .. M-1) per input item, maps it to the
+level ``s/(M-1) - 0.5`` and writes ``sps`` complex samples per symbol:
+``gain * (shaped level + carrier)`` with a zero imaginary part. Shaping is
+a polyphase interpolator: a symbol held for ``sps`` samples and then
+filtered by ``taps`` (the app's RRC) gives the pulse
+``convolve(ones(sps), taps)``, cut into ``span`` phases of ``sps`` samples.
+The samples of one symbol period are the last ``span`` levels times those
+phases, so each output sample costs ``span`` multiply-adds, computed for
+a whole block of symbols as one matrix product. With ``taps`` None
+(filter off) the pulse is the held level alone.
+
+The output equals the repeat -> level -> RRC -> carrier offset ->
+float_to_complex chain it replaces, scaled by ``gain``, from the first
+sample. The second output is the real amplitude (level plus carrier), for
+a time display.
+"""
+
+import numpy as np # type: ignore
+from gnuradio import gr # type: ignore
+
+
+def shaping_phases(sps, taps=None):
+    """(span, phases): row m is the pulse ``m`` symbol periods after its symbol started"""
+    pulse = np.ones(sps)
+    if taps is not None:
+        pulse = np.convolve(pulse, taps)
+    span = -(-len(pulse) // sps)
+    phases = np.zeros(span * sps)
+    phases[:len(pulse)] = pulse
+    return span, phases.reshape(span, sps)
+
+
+class AskShaper(gr.basic_block):
+    """Symbols in, ``sps`` shaped complex ASK samples out per symbol; amplitude on output 1"""
+    def __init__(self, bitsPerSym, sps, taps=None, carrier=0, gain=1.0):
+        gr.basic_block.__init__(self, name="ask_shaper",
+                                in_sig=[np.uint8], out_sig=[np.complex64, np.float32])
+        self.bitsPerSym = bitsPerSym
+        self.sps = sps
+        self.taps = taps
+        self.carrier = carrier
+        self.gain = gain
+        self._history = np.zeros(0)  # last span-1 levels, oldest first
+        self._pending = (np.zeros(0, np.complex64), np.zeros(0, np.float32))  # rest of the last symbol
+        self._rebuild()
+
+    # ----- parameters -----
+
+    def _rebuild(self):
+        M = 2**self.bitsPerSym
+        span, phases = shaping_phases(self.sps, self.taps)
+        # Newest symbol's phase last, to match the order of a window of levels
+        self._tables = (np.arange(M) / (M - 1) - 0.5, span, self.sps, phases[::-1].copy(),
+                        float(self.carrier), float(self.gain))
+
+    def set_bits_per_sym(self, bitsPerSym):
+        self.bitsPerSym = bitsPerSym
+        self._rebuild()
+
+    def set_pulse(self, sps, taps=None):
+        """Samples per symbol and shaping taps (None: unshaped)"""
+        self.sps = sps
+        self.taps = taps
+        self._rebuild()
+
+    def set_carrier(self, carrier):
+        self.carrier = carrier
+        self._rebuild()
+
+    def set_gain(self, gain):
+        self.gain = gain
+        self._rebuild()
+
+    # ----- scheduler hooks -----
+
+    def forecast(self, noutput_items, ninputs):
+        missing = noutput_items - len(self._pending[0])
+        return [max(0, -(-missing // self._tables[2]))] * ninputs
+
+    def general_work(self, input_items, output_items):
+        out, amplitude = output_items[0], output_items[1]
+        pending, pending_amplitude = self._pending
+        done = min(len(out), len(amplitude), len(pending))
+        out[:done] = pending[:done]
+        amplitude[:done] = pending_amplitude[:done]
+        pending, pending_amplitude = pending[done:], pending_amplitude[done:]
+
+        wanted = min(len(out), len(amplitude)) - done
+        symbols = input_items[0][:max(0, -(-wanted // self._tables[2]))]
+        if len(symbols) and wanted > 0:
+            samples, samples_amplitude = self._shape(symbols)
+            n = min(wanted, len(samples))
+            out[done:done + n] = samples[:n]
+            amplitude[done:done + n] = samples_amplitude[:n]
+            pending, pending_amplitude = samples[n:], samples_amplitude[n:]
+            done += n
+            self.consume(0, len(symbols))
+        self._pending = (pending, pending_amplitude)
+        return done
+
+    # ----- helpers -----
+
+    def _shape(self, symbols):
+        levels, span, sps, phases, carrier, gain = self._tables
+        history = self._history[len(self._history) - (span - 1):] if span > 1 else self._history[:0]
+        history = np.concatenate((np.zeros(span - 1 - len(history)), history))
+        run = np.concatenate((history, levels[np.minimum(symbols, len(levels) - 1)]))
+        self._history = run[len(symbols):]
+
+        windows = np.lib.stride_tricks.sliding_window_view(run, span)
+        amplitude = (windows @ phases).reshape(-1) + carrier
+        samples = np.zeros(len(amplitude), dtype=np.complex64)
+        samples.real = gain * amplitude
+        return samples, amplitude.astype(np.float32)
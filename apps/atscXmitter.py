@@ -33,13 +33,37 @@ from PyQt5 import Qt, QtCore # type: ignore
 import sip # type: ignore # type: ignore
 import pmt # type: ignore
 
-from gnuradio import blocks, dtv, filter, gr, qtgui, soapy, uhd  # type: ignore
-from gnuradio.filter import firdes # type: ignore
-from gnuradio.fft import window # type: ignore
-from gnuradio.qtgui import Range, RangeWidget # type: ignore
+from gnuradio import gr # type: ignore
 
 # Local imports
-from apps.utils import apply_dark_theme, read_settings
+from apps.utils import apply_dark_theme, read_settings, lazy_import
+from apps.control_server import maybe_start_control_server
+from apps.iq_recorder import maybe_attach_iq_recorder
+from apps.graph_optimizer import recording_connections, maybe_optimize_graph
+
+# Deferred gnuradio imports: DSP blocks and the radio driver load on first use
+blocks = lazy_import('gnuradio.blocks')
+dtv = lazy_import('gnuradio.dtv')
+filter = lazy_import('gnuradio.filter')
+qtgui = lazy_import('gnuradio.qtgui')
+soapy = lazy_import('gnuradio.soapy')
+uhd = lazy_import('gnuradio.uhd')
+firdes = lazy_import('gnuradio.filter', 'firdes')
+window = lazy_import('gnuradio.fft', 'window')
+Range = lazy_import('gnuradio.qtgui', 'Range')
+RangeWidget = lazy_import('gnuradio.qtgui', 'RangeWidget')
+
+# Launcher manifest: read by apps/app_index.py without importing this module
+APP_MANIFEST = {
+    'name': "ATSC Video Transmitter",
+    'icon': "atsc.jpg",
+    'category': 'video',
+    'order': 0,
+    'media': ['ts'],
+    'samp_rate': 12.5e6,
+    'cpu_cost': 'high',
+    'radios': ['hackrf', 'usrp'],
+}
 
 class ConfigDialog(Qt.QDialog):
     def __init__(self, parent=None):
@@ -430,6 +454,7 @@ class atscXmitter2(gr.top_block, Qt.QWidget):
         self.connect((self.blocks_file_source_0, 0), (self.dtv_atsc_pad_0, 0))
         self.connect((self.blocks_keep_m_in_n_0, 0), (self.dtv_dvbs2_modulator_bc_0, 0))
         self.connect((self.blocks_multiply_const_vxx_0, 0), (self.radio_sink, 0))
+        self.radio_feed = (self.blocks_multiply_const_vxx_0, 0)
         self.connect((self.blocks_rotator_cc_0, 0), (self.fft_filter_xxx_0, 0))
         self.connect((self.blocks_vector_to_stream_1, 0), (self.blocks_keep_m_in_n_0, 0))
         self.connect((self.dtv_atsc_field_sync_mux_0, 0), (self.blocks_vector_to_stream_1, 0))
@@ -554,8 +579,11 @@ def main(top_block_cls=atscXmitter2, options=None, app=None, config_values=None)
         # Apply dark theme to the application
         apply_dark_theme(app)
 
-    tb = top_block_cls(config_values)
+    tb = recording_connections(top_block_cls)(config_values)
+    tb.graph_report = maybe_optimize_graph(tb, 'atscXmitter')
+    tb.iq_recorder = maybe_attach_iq_recorder(tb, 'atscXmitter')
     tb.start()
+    tb.control_server = maybe_start_control_server(tb, 'atscXmitter')
     tb.show()
 
     def sig_handler(sig=None, frame=None):
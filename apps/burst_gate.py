@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import random
+import threading
+import time
+
+import numpy as np # type: ignore
+import pmt # type: ignore
+from gnuradio import gr # type: ignore
+
+DEFAULT_LEAD = 0.02  # how far ahead of a timed (tx_time) burst its samples are released
+MAX_SLEEP = 0.05     # longest single idle wait, so stop() is honoured promptly
+
+SOB = pmt.intern('tx_sob')
+EOB = pmt.intern('tx_eob')
+TX_TIME = pmt.intern('tx_time')
+
+
+def burst_schedule(plan, samp_rate):
+    """Validate a burst plan and return (burst samples, period s, jitter s).
+
+    ``plan`` is a dict with ``burst`` (burst length, seconds), ``period``
+    (burst start to burst start, seconds) and optional ``jitter`` (each
+    period is varied uniformly by +/- jitter seconds).
+    """
+    burst = float(plan['burst'])
+    period = float(plan['period'])
+    jitter = float(plan.get('jitter', 0.0))
+    if burst <= 0 or period < burst:
+        raise ValueError("burst plan needs 0 < burst <= period")
+    if jitter < 0 or jitter > period - burst:
+        raise ValueError("burst jitter must be between 0 and period - burst")
+    return max(1, int(round(burst * samp_rate))), period, jitter
+
+
+class BurstGate(gr.basic_block):
+    """Passes the transmit stream through in scheduled bursts.
+
+    Each burst is ``burst`` seconds of the upstream signal, tagged
+    ``tx_sob`` on its first sample and ``tx_eob`` on its last so
+    uhd.usrp_sink transmits it as a discrete burst. Between bursts nothing
+    is consumed, so the upstream buffers fill and the whole DSP chain
+    (source, modulator, filters, GUI sinks) sits idle; CPU use follows the
+    duty cycle.
+
+    With ``timed`` (USRP) the first sample also carries ``tx_time`` and is
+    released ``lead`` seconds early, so the burst starts on its scheduled
+    device time. The apps set device time from time.time(). Without it
+    (HackRF, whose sink ignores burst tags) ``fill_idle`` streams zeros
+    between bursts so the radio does not underrun.
+    """
+    def __init__(self, samp_rate, plan, timed=False, fill_idle=False, lead=DEFAULT_LEAD):
+        gr.basic_block.__init__(self, name="burst_gate",
+                                in_sig=[np.complex64], out_sig=[np.complex64])
+        self.plan = dict(plan)
+        self.samp_rate = float(samp_rate)
+        self.burst_len, self.period, self.jitter = burst_schedule(plan, self.samp_rate)
+        self.timed = timed
+        self.fill_idle = fill_idle
+        self.lead = float(plan.get('lead', lead))
+        self.max_bursts = plan.get('count')
+        self._rng = random.Random(plan.get('seed'))
+        self._halt = threading.Event()
+        self._lock = threading.Lock()
+        self._next_start = None
+        self._remaining = 0
+        self._bursts = 0
+        self._late = 0
+        self._burst_samples = 0
+        self._idle_samples = 0
+        self._started_at = None
+
+    # ----- scheduler hooks -----
+
+    def start(self):
+        self._halt.clear()
+        self._started_at = time.time()
+        self._next_start = self._started_at + (self.lead if self.timed else 0.0)
+        return True
+
+    def stop(self):
+        self._halt.set()
+        return True
+
+    def forecast(self, noutput_items, ninputs):
+        # Zero fill and idle waits need no input; only a burst reads upstream
+        return [noutput_items if self._remaining else 0] * ninputs
+
+    def general_work(self, input_items, output_items):
+        out = output_items[0]
+        if not self._remaining:
+            if self.max_bursts is not None and self._bursts >= self.max_bursts:
+                return self._idle(out, MAX_SLEEP)
+            wait = self._next_start - time.time() - (self.lead if self.timed else 0.0)
+            if wait > 0:
+                return self._idle(out, wait)
+            self._begin_burst()
+
+        inp = input_items[0]
+        n = min(self._remaining, len(inp), len(out))
+        if n == 0:
+            return 0
+        out[:n] = inp[:n]
+        self._remaining -= n
+        if not self._remaining:
+            self.add_item_tag(0, self.nitems_written(0) + n - 1, EOB, pmt.PMT_T)
+        self.consume(0, n)
+        with self._lock:
+            self._burst_samples += n
+        return n
+
+    # ----- helpers -----
+
+    def _idle(self, out, wait):
+        if self.fill_idle:
+            n = min(len(out), max(1, int(wait * self.samp_rate)))
+            out[:n] = 0
+            with self._lock:
+                self._idle_samples += n
+            return n
+        self._halt.wait(min(wait, MAX_SLEEP))
+        return 0
+
+    def _begin_burst(self):
+        start = self._next_start
+        now = time.time()
+        offset = self.nitems_written(0)
+        self.add_item_tag(0, offset, SOB, pmt.PMT_T)
+        late = self.timed and now > start
+        if self.timed and not late:
+            seconds = int(start)
+            self.add_item_tag(0, offset, TX_TIME, pmt.make_tuple(
+                pmt.from_uint64(seconds), pmt.from_double(start - seconds)))
+        with self._lock:
+            self._bursts += 1
+            self._late += late
+        self._remaining = self.burst_len
+        next_start = start + self.period + self._rng.uniform(-self.jitter, self.jitter)
+        # After a stall, resynchronise rather than firing a backlog of bursts
+        self._next_start = max(next_start, now + self.burst_len / self.samp_rate)
+
+    # ----- control -----
+
+    def set_samp_rate(self, samp_rate):
+        self.samp_rate = float(samp_rate)
+        self.burst_len = burst_schedule(self.plan, self.samp_rate)[0]
+
+    def stats(self):
+        """Bursts sent so far and the measured transmit duty cycle"""
+        with self._lock:
+            elapsed = time.time() - self._started_at if self._started_at else 0.0
+            result = {
+                'mode': 'timed' if self.timed else ('zero-fill' if self.fill_idle else 'gated'),
+                'bursts': self._bursts,
+                'late_bursts': self._late,
+                'burst_samples': self._burst_samples,
+                'idle_samples': self._idle_samples,
+                'duty_cycle_planned': self.burst_len / self.samp_rate / self.period,
+            }
+        result['duty_cycle'] = result['burst_samples'] / (elapsed * self.samp_rate) if elapsed else 0.0
+        return result
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Run several generator apps side by side through one radio.
+
+Each app contributes only its baseband core: its top block is built with
+its radio sink swapped for a ``ChannelFeed`` that hands samples to the
+combiner through a bounded ring, its qtgui sinks are taken out of the
+flowgraph and its window is not shown. Apps with a symbol rate (PSK, ASK,
+FSK) are retuned to the channel rate ``samp_rate / channels``; others run
+at their own rate. The frequency the app tunes its "radio" to becomes its
+channel's RF frequency, so the app's ``cf`` (plan values or control
+server) places it in the band.
+
+The combiner flowgraph resamples each channel to the channel rate if it
+is not there already, corrects the distance to the nearest filterbank bin
+with a rotator at the channel rate, and a polyphase synthesis filterbank
+(``pfb_synthesizer_ccf``) upconverts and sums all bins into the radio
+stream. The only full-rate work is the shared filterbank, so each extra
+channel costs about its own narrowband rate. Channels in the same bin are
+added at the channel rate. A plan::
+
+    {"center": 300.0, "samp_rate": 20e6, "channels": 8, "power": 0, "usrp": 1,
+     "signals": [{"app": "pskGenerator", "values": {"cf": 297.5}},
+                 {"app": "pskGenerator", "values": {"cf": 300.5, "pskMode": 2}, "bandwidth": 0.4},
+                 {"app": "fskGenerator", "values": {"cf": 303.0}},
+                 {"app": "amSineGenerator", "values": {"centerFreq": 305}, "bandwidth": 0.2}]}
+
+``values`` override the app's saved dialog settings; ``center`` and the
+occupied ``bandwidth`` are in MHz. ``bandwidth`` may be left out for apps
+with a symbol rate, which report it (``get_occupiedBw``); other apps must
+give it. A channel must stay within ``(channels - 1) / channels`` of the
+band. Its distance from the nearest bin center plus half its bandwidth
+must stay within the flat passband of the synthesis prototype,
+``PASSBAND`` of the channel rate (+/-0.75 MHz in the plan above). Run
+with::
+
+    python -m apps.channel_synthesizer plan.json
+"""
+
+import argparse
+import fractions
+import importlib
+import json
+import math
+import signal
+import sys
+import threading
+import time
+import types
+
+import numpy as np # type: ignore
+from gnuradio import gr # type: ignore
+
+from apps.control_server import maybe_start_control_server
+from apps.graph_optimizer import recording_connections
+from apps.utils import read_settings, lazy_import
+from apps.waveform_compiler import StandInRadio, default_values, top_block_class
+
+blocks = lazy_import('gnuradio.blocks')
+filter = lazy_import('gnuradio.filter')
+soapy = lazy_import('gnuradio.soapy')
+uhd = lazy_import('gnuradio.uhd')
+window = lazy_import('gnuradio.fft', 'window')
+
+RING_SAMPLES = 1 << 18   # per-channel hand-off buffer between an app and the combiner
+WAIT = 0.05              # longest a feed or source blocks on its ring, seconds
+PASSBAND = 0.3           # flat half-width of the synthesis prototype, fraction of the channel rate
+STOPBAND = 0.5           # where the prototype reaches STOPBAND_DB (the next bin's center is at 1.0)
+STOPBAND_DB = 80
+MIN_SPS = 2              # an app keeps its own rate if the channel rate gives fewer samples per symbol
+
+
+class SampleRing:
+    """Bounded complex64 ring handing samples from one flowgraph to another"""
+    def __init__(self, capacity=RING_SAMPLES):
+        self.capacity = int(capacity)
+        self.buf = np.zeros(self.capacity, dtype=np.complex64)
+        self._head = 0
+        self._tail = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def write(self, samples, timeout):
+        """Copy as many of ``samples`` as fit, waiting up to ``timeout`` for space"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._closed or self._head - self._tail < self.capacity, timeout):
+                return 0
+            if self._closed:
+                return 0
+            n = min(len(samples), self.capacity - (self._head - self._tail))
+            start = self._head % self.capacity
+            first = min(n, self.capacity - start)
+            self.buf[start:start + first] = samples[:first]
+            self.buf[:n - first] = samples[first:n]
+            self._head += n
+            self._cond.notify_all()
+            return n
+
+    def read_into(self, out, timeout):
+        """Fill the front of ``out``, waiting up to ``timeout`` for data; return the count"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._closed or self._head > self._tail, timeout):
+                return 0
+            n = min(len(out), self._head - self._tail)
+            start = self._tail % self.capacity
+            first = min(n, self.capacity - start)
+            out[:first] = self.buf[start:start + first]
+            out[first:n] = self.buf[:n - first]
+            self._tail += n
+            self._cond.notify_all()
+            return n
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class ChannelFeed(StandInRadio, gr.sync_block):
+    """Stands in for an app's soapy.sink and passes its stream to the combiner"""
+    def __init__(self, ring):
+        gr.sync_block.__init__(self, name="channel_feed", in_sig=[np.complex64], out_sig=None)
+        self.ring = ring
+        self.settings = {}
+
+    def work(self, input_items, output_items):
+        return self.ring.write(input_items[0], WAIT)
+
+
+class ChannelSource(gr.sync_block):
+    """Reads a channel's ring; outputs zeros (and counts an underrun) if the app falls behind"""
+    def __init__(self, ring):
+        gr.sync_block.__init__(self, name="channel_source", in_sig=None, out_sig=[np.complex64])
+        self.ring = ring
+        self.underruns = 0
+
+    def work(self, input_items, output_items):
+        out = output_items[0]
+        n = self.ring.read_into(out, WAIT)
+        if n == 0:
+            out[:] = 0
+            self.underruns += 1
+            return len(out)
+        return n
+
+
+def channel_plan(offsets, samp_rate, channels, bandwidths):
+    """(bin, residual offset Hz) for each channel offset from the center.
+
+    ``bandwidths`` (Hz, occupied) must fit with the residual offset inside
+    the prototype's flat passband.
+    """
+    spacing = samp_rate / channels
+    plan = []
+    for offset, bandwidth in zip(offsets, bandwidths):
+        if bandwidth <= 0:
+            raise ValueError(f"Channel at {offset / 1e6:+.3f} MHz needs its occupied bandwidth")
+        signed_bin = int(round(offset / spacing))
+        if not -channels // 2 < signed_bin < channels // 2 + (channels % 2):
+            raise ValueError(f"Channel offset {offset / 1e6:+.3f} MHz is outside the usable band "
+                             f"(+/-{(channels - 1) / 2 * spacing / 1e6:.3f} MHz)")
+        residual = offset - signed_bin * spacing
+        if abs(residual) + bandwidth / 2 > PASSBAND * spacing:
+            raise ValueError(f"Channel at {offset / 1e6:+.3f} MHz is {residual / 1e6:+.3f} MHz from its bin "
+                             f"center; with {bandwidth / 1e6:g} MHz bandwidth it must stay within "
+                             f"+/-{PASSBAND * spacing / 1e6:.3f} MHz of it")
+        plan.append((signed_bin % channels, residual))
+    return plan
+
+
+def resampling_ratio(in_rate, out_rate):
+    """Exact (interpolation, decimation) from ``in_rate`` to ``out_rate``"""
+    ratio = fractions.Fraction(out_rate / in_rate).limit_denominator(1000)
+    if abs(float(ratio) * in_rate - out_rate) > 1e-6 * out_rate:
+        raise ValueError(f"No rational resampling from {in_rate / 1e6:g} to {out_rate / 1e6:g} Msps")
+    return ratio.numerator, ratio.denominator
+
+
+class ChannelSynthesizer(gr.hier_block2):
+    """Places N complex baseband inputs at frequency offsets in one output stream.
+
+    Input i runs at ``rates[i]`` and lands at ``offsets[i]`` Hz from the
+    center of the ``samp_rate`` output; its occupied ``bandwidths[i]`` (Hz)
+    is checked against the bin's passband. Amplitudes are scaled by 1/N so
+    the sum cannot clip.
+    """
+    def __init__(self, rates, offsets, samp_rate, bandwidths, channels=8):
+        n = len(rates)
+        gr.hier_block2.__init__(self, "channel_synthesizer",
+                                gr.io_signature(n, n, gr.sizeof_gr_complex),
+                                gr.io_signature(1, 1, gr.sizeof_gr_complex))
+        self.samp_rate = float(samp_rate)
+        self.channels = int(channels)
+        self.channel_rate = self.samp_rate / self.channels
+        self.bandwidths = list(bandwidths)
+        self.plan = channel_plan(offsets, self.samp_rate, self.channels, self.bandwidths)
+
+        self.resamplers = []
+        self.rotators = []
+        by_bin = {}
+        for i, (rate, (bin_, residual)) in enumerate(zip(rates, self.plan)):
+            head = (self, i)
+            interpolation, decimation = resampling_ratio(rate, self.channel_rate)
+            resampler = None
+            if interpolation != decimation:
+                resampler = filter.rational_resampler_ccc(
+                    interpolation=interpolation, decimation=decimation, taps=[], fractional_bw=0)
+                self.connect(head, resampler)
+                head = resampler
+            rotator = blocks.rotator_cc(2 * math.pi * residual / self.channel_rate)
+            self.connect(head, rotator)
+            self.resamplers.append(resampler)
+            self.rotators.append(rotator)
+            by_bin.setdefault(bin_, []).append(rotator)
+
+        # Prototype filter gain M restores unit amplitude per bin; 1/N shares headroom
+        taps = filter.firdes.low_pass_2(self.channels / n, self.samp_rate,
+                                        (PASSBAND + STOPBAND) / 2 * self.channel_rate,
+                                        (STOPBAND - PASSBAND) * self.channel_rate, STOPBAND_DB,
+                                        window.WIN_BLACKMAN_hARRIS)
+        self.filterbank = filter.pfb_synthesizer_ccf(self.channels, taps, False)
+        self.filterbank.set_channel_map(list(by_bin))
+        self.adders = []
+        for port, (bin_, rotators) in enumerate(by_bin.items()):
+            if len(rotators) == 1:
+                self.connect(rotators[0], (self.filterbank, port))
+            else:
+                adder = blocks.add_vcc(1)
+                for k, rotator in enumerate(rotators):
+                    self.connect(rotator, (adder, k))
+                self.connect(adder, (self.filterbank, port))
+                self.adders.append(adder)
+        self.connect(self.filterbank, self)
+
+    def set_offset(self, index, offset):
+        """Retune channel ``index`` within its filterbank bin"""
+        bin_, residual = channel_plan([offset], self.samp_rate, self.channels, [self.bandwidths[index]])[0]
+        if bin_ != self.plan[index][0]:
+            raise ValueError(f"Offset {offset / 1e6:+.3f} MHz is outside channel {index + 1}'s "
+                             f"bin; restart the combiner to move it further")
+        self.plan[index] = (bin_, residual)
+        self.rotators[index].set_phase_inc(2 * math.pi * residual / self.channel_rate)
+
+
+def make_radio_sink(radio_type, address, samp_rate, frequency, gain):
+    """The radio sink the apps build, for the combined stream"""
+    if radio_type == 'usrp':
+        sink = uhd.usrp_sink(",".join((f'addr={address}', '')),
+                             uhd.stream_args(cpu_format="fc32", args='', channels=list(range(0,1))), "")
+        sink.set_samp_rate(samp_rate)
+        sink.set_time_now(uhd.time_spec(time.time()), uhd.ALL_MBOARDS)
+        sink.set_center_freq(frequency, 0)
+        sink.set_antenna("TX/RX", 0)
+        sink.set_gain(gain, 0)
+    else:
+        sink = soapy.sink('driver=hackrf', 'fc32', 1, '', '', [''], [''])
+        sink.set_sample_rate(0, samp_rate)
+        sink.set_frequency(0, frequency)
+        sink.set_gain(0, 'VGA', gain)
+        sink.set_gain(0, 'AMP', 0)
+    return sink
+
+
+class Combiner(gr.top_block):
+    """ChannelSources -> ChannelSynthesizer -> radio sink"""
+    def __init__(self, feeds, center, samp_rate, channels, radio_type, address, gain, bandwidths):
+        gr.top_block.__init__(self, "channel_synthesizer", catch_exceptions=True)
+        self.center = center
+        self.feeds = feeds
+        offsets = [feed.get_frequency(0) - center for feed in feeds]
+        rates = [feed.get_sample_rate(0) for feed in feeds]
+        self.sources = [ChannelSource(feed.ring) for feed in feeds]
+        self.synthesizer = ChannelSynthesizer(rates, offsets, samp_rate, bandwidths, channels)
+        self.radio_sink = make_radio_sink(radio_type, address, samp_rate, center, gain)
+        for i, source in enumerate(self.sources):
+            self.connect(source, (self.synthesizer, i))
+        self.connect(self.synthesizer, self.radio_sink)
+        for i, feed in enumerate(feeds):
+            feed.on_frequency = lambda frequency, i=i: self._retune(i, frequency)
+
+    def _retune(self, index, frequency):
+        try:
+            self.synthesizer.set_offset(index, frequency - self.center)
+        except ValueError as e:
+            print(f"Error retuning channel {index + 1}: {e}")
+
+    def stats(self):
+        return [{'offset': self.feeds[i].get_frequency(0) - self.center,
+                 'bin': self.synthesizer.plan[i][0], 'underruns': source.underruns}
+                for i, source in enumerate(self.sources)]
+
+    def close(self):
+        for feed in self.feeds:
+            feed.ring.close()
+
+
+def strip_gui(tb):
+    """Take the app's qtgui sinks out of its flowgraph.
+
+    A block left feeding nothing goes too; an output port left open on a
+    block that still feeds something else ends in a null sink.
+    """
+    edges = tb.recorded_edges
+    dropped = [value for name, value in vars(tb).items() if name.startswith('qtgui_') and hasattr(value, 'to_basic_block')]
+    while dropped:
+        block = dropped.pop()
+        for e in [e for e in edges if e[2] is block]:
+            tb.disconnect((e[0], e[1]), (e[2], e[3]))
+            if any(f[0] is e[0] and f[1] == e[1] for f in edges):
+                continue
+            if any(f[0] is e[0] for f in edges):
+                tb.connect((e[0], e[1]), blocks.null_sink(e[0].output_signature().sizeof_stream_item(e[1])))
+            else:
+                dropped.append(e[0])
+
+
+def build_app(module_name, overrides, channel_rate):
+    """Build one app's baseband core with a ChannelFeed in place of its radio; return (tb, feed)"""
+    module = importlib.import_module(f"apps.{module_name}")
+    values = default_values(module_name)
+    values.update(overrides or {})
+    values['radio_type'] = 'hackrf'
+    holder = {}
+
+    def make_feed(device, cpu_format, *args):
+        holder['feed'] = ChannelFeed(SampleRing())
+        return holder['feed']
+
+    module.soapy = types.SimpleNamespace(sink=make_feed)
+    tb = recording_connections(top_block_class(module))(values)
+    strip_gui(tb)
+    if hasattr(tb, 'get_symRate') and channel_rate / (tb.get_symRate() * 1e3) >= MIN_SPS:
+        tb.set_samp_rate(channel_rate)
+    return tb, holder['feed']
+
+
+def signal_bandwidth(signal_plan, tb):
+    """Occupied bandwidth in Hz: the plan's, else the one the app derives from its symbol rate"""
+    if 'bandwidth' in signal_plan:
+        return float(signal_plan['bandwidth']) * 1e6
+    if hasattr(tb, 'get_occupiedBw'):
+        return tb.get_occupiedBw() * 1e3
+    raise ValueError(f"{signal_plan['app']} has no symbol rate; give its \"bandwidth\" (MHz) in the plan")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('plan', help="JSON channel plan")
+    args = parser.parse_args(argv)
+    with open(args.plan) as f:
+        plan = json.load(f)
+
+    from PyQt5 import Qt # type: ignore
+    app = Qt.QApplication(sys.argv[:1])
+    settings = read_settings()
+    radio_type = plan.get('radio', settings.get('radio_type', 'hackrf'))
+    addresses = settings.get('ip_addresses', [])
+    address = addresses[plan.get('usrp', 1) - 1].strip() if radio_type == 'usrp' and addresses else ''
+
+    samp_rate = float(plan.get('samp_rate', 20e6))
+    channels = int(plan.get('channels', 8))
+    apps = []
+    bandwidths = []
+    for signal_plan in plan['signals']:
+        tb, feed = build_app(signal_plan['app'], signal_plan.get('values'), samp_rate / channels)
+        apps.append((signal_plan['app'], tb, feed))
+        bandwidths.append(signal_bandwidth(signal_plan, tb))
+
+    center = float(plan['center']) * 1e6
+    combiner = Combiner([feed for _, _, feed in apps], center, samp_rate, channels,
+                        radio_type, address, plan.get('power', 0), bandwidths)
+    combiner.start()
+    for i, (name, tb, _) in enumerate(apps):
+        tb.start()
+        tb.control_server = maybe_start_control_server(tb, f"{name}-{i + 1}")
+    for i, stats in enumerate(combiner.stats()):
+        print(f"Channel {i + 1}: {apps[i][0]} at {stats['offset'] / 1e6:+.3f} MHz "
+              f"(bin {stats['bin']}, {bandwidths[i] / 1e6:g} MHz wide, "
+              f"{apps[i][2].get_sample_rate(0) / 1e6:g} Msps)")
+
+    def shutdown(*_):
+        for _, tb, _ in apps:
+            tb.stop()
+        combiner.close()
+        combiner.stop()
+        for _, tb, _ in apps:
+            tb.wait()
+        combiner.wait()
+        for i, stats in enumerate(combiner.stats()):
+            print(f"Channel {i + 1}: {stats['underruns']} underruns")
+        Qt.QApplication.quit()
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+    timer = Qt.QTimer()
+    timer.start(500)
+    timer.timeout.connect(lambda: None)
+    return app.exec_()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Remote control of a running flowgraph over newline-delimited JSON-RPC 2.0.
+
+Every ``get_<name>``/``set_<name>`` pair on the top block is exposed as the
+parameter ``<name>``. Methods:
+
+  list                         -> ["cf", "rfPwr", ...]
+  get        {"names": [...]}  -> {"cf": 300.0, ...} (all parameters if omitted)
+  set        {"cf": 301.5, "rfPwr": -40}
+                               -> applied together; if any setter fails the
+                                  others are rolled back
+  subscribe  {"names": [...]}  -> later changes arrive as "changed" notifications
+  unsubscribe {"names": [...]}
+  get_<name> / set_<name> [value] - the top block's own methods
+
+The server listens on TCP or a Unix socket and runs its asyncio loop on a
+daemon thread. Setters touch Qt widgets, so with a Qt application they run
+on the GUI thread while the request waits on an executor thread.
+``ControlClient`` is a small blocking client for scripts and testing:
+``python -m apps.control_server tcp:127.0.0.1:5550 get``.
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import os
+import socket
+import sys
+import threading
+
+POLL_INTERVAL = 0.1  # seconds between checks for changes made from the GUI
+
+
+def discover_parameters(target):
+    """Names that have both a get_<name> and a set_<name> method on ``target``"""
+    names = []
+    for attr in dir(target):
+        if attr.startswith('get_'):
+            name = attr[4:]
+            if callable(getattr(target, attr, None)) and callable(getattr(target, 'set_' + name, None)):
+                names.append(name)
+    return names
+
+
+def _json_default(value):
+    if isinstance(value, complex):
+        return [value.real, value.imag]
+    if hasattr(value, 'item'):  # numpy scalars
+        return value.item()
+    return str(value)
+
+
+class RpcError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def gui_invoker(target):
+    """Function running ``fn(*args)`` on ``target``'s Qt thread and returning its result.
+
+    ``post(fn, *args)`` queues the call without waiting for it. None when ``target`` is not a QObject or there is no Qt application to
+    run the queued call.
+    """
+    try:
+        from PyQt5.QtCore import QCoreApplication, QObject, QThread, pyqtSignal # type: ignore
+    except ImportError:
+        return None
+    if not isinstance(target, QObject) or QCoreApplication.instance() is None:
+        return None
+
+    class Invoker(QObject):
+        requested = pyqtSignal(object)
+
+        def __init__(self):
+            super().__init__()
+            self.moveToThread(target.thread())
+            # Cross-thread emits are queued, so run() executes on the GUI thread
+            self.requested.connect(self.run)
+
+        def run(self, call):
+            fn, args, future = call
+            try:
+                result = fn(*args)
+            except Exception as e:
+                if future is None:
+                    print(f"Error in GUI call {getattr(fn, '__name__', fn)}: {e}")
+                else:
+                    future.set_exception(e)
+            else:
+                if future is not None:
+                    future.set_result(result)
+
+        def __call__(self, fn, *args):
+            if QThread.currentThread() == self.thread():
+                return fn(*args)
+            future = concurrent.futures.Future()
+            self.requested.emit((fn, args, future))
+            return future.result()
+
+        def post(self, fn, *args):
+            self.requested.emit((fn, args, None))
+
+    return Invoker()
+
+
+class ControlServer:
+    """JSON-RPC control endpoint for a gr.top_block with get_/set_ pairs"""
+    def __init__(self, target, host='127.0.0.1', port=0, unix_path=None, poll_interval=POLL_INTERVAL):
+        self.target = target
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.poll_interval = poll_interval
+        self.parameters = discover_parameters(target)
+        self.address = None
+        self._apply_lock = threading.Lock()
+        self._subscribers = {}  # writer -> set of names
+        self._snapshot = {}
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._gui = gui_invoker(target)
+
+    # ----- lifecycle -----
+
+    def start(self):
+        """Start serving on a background thread and return the bound address"""
+        self._thread = threading.Thread(target=self._run, name="control-server", daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        return self.address
+
+    def stop(self):
+        if self._loop and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread:
+            self._thread.join(timeout=2)
+        if self.unix_path and os.path.exists(self.unix_path):
+            os.unlink(self.unix_path)
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._serve())
+            self._loop.run_forever()
+        finally:
+            if self._server:
+                self._server.close()
+            tasks = asyncio.all_tasks(self._loop)
+            for task in tasks:
+                task.cancel()
+            self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self._loop.close()
+
+    async def _serve(self):
+        if self.unix_path:
+            self._server = await asyncio.start_unix_server(self._handle, path=self.unix_path)
+            self.address = f"unix:{self.unix_path}"
+        else:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+            host, port = self._server.sockets[0].getsockname()[:2]
+            self.address = f"tcp:{host}:{port}"
+        self._snapshot = self.read_state()
+        self._loop.create_task(self._watch())
+        self._ready.set()
+
+    # ----- parameter access -----
+
+    def read_state(self, names=None):
+        state = {}
+        for name in names or self.parameters:
+            try:
+                state[name] = getattr(self.target, 'get_' + name)()
+            except Exception as e:
+                print(f"Error reading {name}: {e}")
+        return state
+
+    def apply(self, values):
+        """Apply several parameters as one change, rolling back on failure"""
+        unknown = [name for name in values if name not in self.parameters]
+        if unknown:
+            raise RpcError(-32602, f"Unknown parameter(s): {', '.join(unknown)}")
+        with self._apply_lock:
+            if self._gui:
+                return self._gui(self._apply_now, values)
+            return self._apply_now(values)
+
+    def _apply_now(self, values):
+        # No flowgraph lock: unlock() restarts the scheduler and gaps the TX stream.
+        # Setters that rewire the graph lock it themselves, as from the GUI.
+        previous = self.read_state(list(values))
+        applied = []
+        try:
+            for name, value in values.items():
+                getattr(self.target, 'set_' + name)(value)
+                applied.append(name)
+        except Exception as e:
+            failed, error = name, e
+            for name in reversed(applied):
+                try:
+                    getattr(self.target, 'set_' + name)(previous[name])
+                except Exception:
+                    pass
+            raise RpcError(-32000, f"Failed to set {failed}: {error}")
+        return self.read_state(list(values))
+
+    # ----- change notification -----
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            if self._subscribers:
+                await self._publish_changes()
+
+    async def _publish_changes(self):
+        state = self.read_state()
+        changed = {k: v for k, v in state.items() if self._snapshot.get(k) != v}
+        self._snapshot = state
+        if not changed:
+            return
+        for writer, names in list(self._subscribers.items()):
+            params = {k: v for k, v in changed.items() if k in names}
+            if params:
+                await self._send(writer, {'jsonrpc': '2.0', 'method': 'changed', 'params': params})
+
+    # ----- protocol -----
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self._dispatch(line, writer)
+                if response is not None:
+                    await self._send(writer, response)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self._subscribers.pop(writer, None)
+            writer.close()
+
+    async def _send(self, writer, message):
+        try:
+            writer.write(json.dumps(message, default=_json_default).encode() + b"\n")
+            await writer.drain()
+        except ConnectionError:
+            self._subscribers.pop(writer, None)
+
+    async def _dispatch(self, line, writer):
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {'jsonrpc': '2.0', 'id': None, 'error': {'code': -32700, 'message': "Parse error"}}
+        if isinstance(request, list):
+            responses = [await self._call(r, writer) for r in request]
+            return [r for r in responses if r is not None] or None
+        return await self._call(request, writer)
+
+    async def _call(self, request, writer):
+        request_id = request.get('id') if isinstance(request, dict) else None
+        try:
+            if not isinstance(request, dict) or 'method' not in request:
+                raise RpcError(-32600, "Invalid request")
+            method = request['method']
+            if method.startswith('set'):
+                # Setters may block on the radio; keep the loop free for other clients
+                result = await self._loop.run_in_executor(
+                    None, self._execute, method, request.get('params'), writer)
+                if self._subscribers:
+                    await self._publish_changes()
+            else:
+                result = self._execute(method, request.get('params'), writer)
+            response = {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+        except RpcError as e:
+            response = {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': e.code, 'message': e.message}}
+        except Exception as e:
+            response = {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': -32000, 'message': str(e)}}
+        return response if request_id is not None else None
+
+    def _names(self, params):
+        names = (params or {}).get('names') if isinstance(params, dict) else params
+        names = names or self.parameters
+        unknown = [n for n in names if n not in self.parameters]
+        if unknown:
+            raise RpcError(-32602, f"Unknown parameter(s): {', '.join(unknown)}")
+        return names
+
+    def _execute(self, method, params, writer):
+        if method == 'list':
+            return self.parameters
+        if method == 'get':
+            return self.read_state(self._names(params))
+        if method == 'set':
+            if not isinstance(params, dict) or not params:
+                raise RpcError(-32602, "set expects an object of parameter values")
+            return self.apply(params)
+        if method == 'subscribe':
+            names = self._names(params)
+            self._subscribers.setdefault(writer, set()).update(names)
+            return sorted(self._subscribers[writer])
+        if method == 'unsubscribe':
+            names = set(self._names(params))
+            remaining = self._subscribers.get(writer, set()) - names
+            if remaining:
+                self._subscribers[writer] = remaining
+            else:
+                self._subscribers.pop(writer, None)
+            return sorted(remaining)
+        if method.startswith(('get_', 'set_')) and method[4:] in self.parameters:
+            args = params if isinstance(params, list) else ([] if params is None else [params])
+            if method.startswith('set_'):
+                return self.apply({method[4:]: args[0]})[method[4:]]
+            return getattr(self.target, method)()
+        raise RpcError(-32601, f"Method not found: {method}")
+
+
+class ControlClient:
+    """Blocking JSON-RPC client for ControlServer (``tcp:host:port`` or ``unix:path``)"""
+    def __init__(self, address, timeout=5.0):
+        kind, _, rest = address.partition(':')
+        if kind == 'unix':
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(rest)
+        else:
+            host, _, port = rest.rpartition(':')
+            self.sock = socket.create_connection((host, int(port)))
+        self.sock.settimeout(timeout)
+        self.file = self.sock.makefile('rwb')
+        self.notifications = []
+        self._next_id = 0
+
+    def call(self, method, params=None):
+        self._next_id += 1
+        request = {'jsonrpc': '2.0', 'id': self._next_id, 'method': method}
+        if params is not None:
+            request['params'] = params
+        self.file.write(json.dumps(request).encode() + b"\n")
+        self.file.flush()
+        while True:
+            message = self.read_message()
+            if message.get('id') == self._next_id:
+                if 'error' in message:
+                    raise RuntimeError(message['error']['message'])
+                return message['result']
+            self.notifications.append(message)
+
+    def read_message(self):
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("control server closed the connection")
+        return json.loads(line)
+
+    def wait_notification(self):
+        """Return the next 'changed' notification (blocks until one arrives)"""
+        if self.notifications:
+            return self.notifications.pop(0)
+        return self.read_message()
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+
+def maybe_start_control_server(tb, name):
+    """Start a ControlServer for ``tb`` if enabled in the global settings.
+
+    Settings key ``control_server``: ``{"enabled": true, "host": "127.0.0.1",
+    "port": 0, "unix_socket_dir": ""}``. Port 0 picks a free port; a
+    non-empty ``unix_socket_dir`` serves on ``<dir>/<name>-<pid>.sock``.
+    """
+    from apps.utils import read_settings
+    config = read_settings().get('control_server') or {}
+    if not config.get('enabled'):
+        return None
+    socket_dir = config.get('unix_socket_dir')
+    unix_path = os.path.join(socket_dir, f"{name}-{os.getpid()}.sock") if socket_dir else None
+    try:
+        server = ControlServer(tb, config.get('host', '127.0.0.1'), config.get('port', 0), unix_path)
+        address = server.start()
+    except Exception as e:
+        print(f"Error starting control server: {e}")
+        return None
+    print(f"{name}: control server listening on {address}")
+    if hasattr(tb, 'installEventFilter'):
+        tb._control_server_filter = _stop_on_close(tb, server)
+    return server
+
+
+def _stop_on_close(widget, server):
+    """Install an event filter that stops ``server`` when ``widget`` is closed"""
+    from PyQt5.QtCore import QObject, QEvent # type: ignore
+
+    class StopOnClose(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Close:
+                server.stop()
+            return False
+
+    event_filter = StopOnClose(widget)
+    widget.installEventFilter(event_filter)
+    return event_filter
+
+
+def main(argv):
+    if len(argv) < 2:
+        print("usage: python -m apps.control_server ADDRESS METHOD [JSON-PARAMS]")
+        return 1
+    client = ControlClient(argv[0])
+    params = json.loads(argv[2]) if len(argv) > 2 else None
+    print(json.dumps(client.call(argv[1], params), indent=4))
+    if argv[1] == 'subscribe':
+        while True:
+            print(json.dumps(client.wait_notification()))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Continuous-phase FSK (CPFSK/GFSK) modulator working at the symbol rate.
+
+``CpfskModulator`` takes one symbol (0 .. M-1) per input item and produces
+``sps`` complex samples per symbol. The frequency of a symbol period depends
+only on the last few symbols: the frequency pulse (``sps`` ones, through the
+Gaussian filter when ``BT`` is set) spans ``span`` symbol periods. Every
+combination of ``span`` symbols is turned into a phase trajectory once, when
+a parameter changes; at run time each symbol is one table lookup of ``sps``
+unit phasors, rotated by the phase accumulated so far. The per-sample cost
+is therefore one complex multiply whatever the pulse length, where a direct
+FIR costs ``2*sps`` multiply-adds per sample.
+
+The output equals the repeat -> level -> Gaussian FIR -> frequency_modulator_fc
+chain it replaces (levels ``s/(M-1) - 0.5``, taps
+``firdes.gaussian(1, sps, BT, 2*sps)``, phase advancing ``sensitivity`` rad
+per sample at level 1) once the first ``span`` symbols are out, and stays
+phase continuous across symbols and parameter changes. The second output
+is the frequency waveform (the FIR output of the old chain), for a time
+display.
+"""
+
+import itertools
+
+import numpy as np # type: ignore
+from gnuradio import gr # type: ignore
+
+from apps.utils import lazy_import
+
+filter = lazy_import('gnuradio.filter')
+
+
+def frequency_pulse(sps, BT=None):
+    """Frequency response to one symbol: ``sps`` ones, Gaussian filtered unless ``BT`` is None"""
+    pulse = np.ones(sps)
+    if BT is not None:
+        pulse = np.convolve(pulse, filter.firdes.gaussian(1, sps, BT, int(2*sps)))
+    return pulse
+
+
+def phase_tables(bitsPerSym, sps, sensitivity, BT=None):
+    """Trajectories for every run of ``span`` symbols, newest symbol most significant in the index.
+
+    Returns (span, unit phasors (M**span, sps), phase step per symbol (M**span,),
+    frequency (M**span, sps)).
+    """
+    M = 2**bitsPerSym
+    pulse = frequency_pulse(sps, BT)
+    span = -(-len(pulse) // sps)
+    # Row m: the part of the pulse falling m symbol periods after its own symbol
+    segments = np.zeros(span * sps)
+    segments[:len(pulse)] = pulse
+    segments = segments.reshape(span, sps)
+    levels = np.arange(M) / (M - 1) - 0.5
+    runs = np.array(list(itertools.product(range(M), repeat=span)))
+    freq = levels[runs] @ segments
+    phase = sensitivity * np.cumsum(freq, axis=1)
+    return span, np.exp(1j * phase).astype(np.complex64), phase[:, -1], freq.astype(np.float32)
+
+
+class CpfskModulator(gr.basic_block):
+    """Symbols in, ``sps`` phase-continuous CPFSK/GFSK samples out per symbol; frequency on output 1"""
+    def __init__(self, bitsPerSym, sps, sensitivity, BT=None):
+        gr.basic_block.__init__(self, name="cpfsk_modulator",
+                                in_sig=[np.uint8], out_sig=[np.complex64, np.float32])
+        self.bitsPerSym = bitsPerSym
+        self.sps = sps
+        self.sensitivity = sensitivity
+        self.BT = BT
+        self._phase = 0.0
+        self._history = np.zeros(0, dtype=np.intp)  # last span-1 symbols, oldest first
+        self._pending = (np.zeros(0, np.complex64), np.zeros(0, np.float32))  # rest of the last symbol
+        self._rebuild()
+
+    # ----- parameters -----
+
+    def _rebuild(self):
+        span, phasors, steps, freq = phase_tables(self.bitsPerSym, self.sps, self.sensitivity, self.BT)
+        # Published as one tuple, so work() never sees tables from two settings
+        self._tables = (2**self.bitsPerSym, span, self.sps, phasors, steps, freq)
+
+    def set_bits_per_sym(self, bitsPerSym):
+        self.bitsPerSym = bitsPerSym
+        self._rebuild()
+
+    def set_sensitivity(self, sensitivity):
+        self.sensitivity = sensitivity
+        self._rebuild()
+
+    def set_pulse(self, sps, BT=None):
+        """Samples per symbol and Gaussian BT (None: unshaped)"""
+        self.sps = sps
+        self.BT = BT
+        self._rebuild()
+
+    # ----- scheduler hooks -----
+
+    def forecast(self, noutput_items, ninputs):
+        missing = noutput_items - len(self._pending[0])
+        return [max(0, -(-missing // self._tables[2]))] * ninputs
+
+    def general_work(self, input_items, output_items):
+        out, freq = output_items[0], output_items[1]
+        pending, pending_freq = self._pending
+        done = min(len(out), len(freq), len(pending))
+        out[:done] = pending[:done]
+        freq[:done] = pending_freq[:done]
+        pending, pending_freq = pending[done:], pending_freq[done:]
+
+        wanted = min(len(out), len(freq)) - done
+        symbols = input_items[0][:max(0, -(-wanted // self._tables[2]))]
+        if len(symbols) and wanted > 0:
+            samples, samples_freq = self._modulate(symbols)
+            n = min(wanted, len(samples))
+            out[done:done + n] = samples[:n]
+            freq[done:done + n] = samples_freq[:n]
+            pending, pending_freq = samples[n:], samples_freq[n:]
+            done += n
+            self.consume(0, len(symbols))
+        self._pending = (pending, pending_freq)
+        return done
+
+    # ----- helpers -----
+
+    def _modulate(self, symbols):
+        M, span, sps, phasors, steps, freq = self._tables
+        history = self._history[len(self._history) - (span - 1):] if span > 1 else self._history[:0]
+        history = np.concatenate((np.zeros(span - 1 - len(history), dtype=np.intp), np.minimum(history, M - 1)))
+        run = np.concatenate((history, np.minimum(symbols, M - 1).astype(np.intp)))
+        n = len(symbols)
+        index = np.zeros(n, dtype=np.intp)
+        for m in range(span):  # symbol m periods ago
+            index = index * M + run[span - 1 - m:span - 1 - m + n]
+        self._history = run[n:]
+
+        symbol_steps = steps[index]
+        start = self._phase + np.concatenate(([0.0], np.cumsum(symbol_steps[:-1])))
+        self._phase = float((start[-1] + symbol_steps[-1]) % (2 * np.pi))
+        samples = phasors[index] * np.exp(1j * start).astype(np.complex64)[:, None]
+        return samples.reshape(-1), freq[index].reshape(-1)
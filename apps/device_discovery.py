@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import threading
+import time
+
+# USB vendor/product ids used to spot radios being plugged or unplugged
+USB_IDS = {
+    'hackrf': {('1d50', '6089'), ('1d50', '604b'), ('1d50', 'cc15')},
+    'usrp': {('2500', '0020'), ('2500', '0021'), ('2500', '0022'), ('fffe', '0002')},
+}
+USB_SYSFS_DIR = "/sys/bus/usb/devices"
+
+
+def enumerate_hackrf():
+    """Return the HackRF devices SoapySDR can see (blocks while USB is probed)"""
+    import SoapySDR  # type: ignore
+    return [dict(device) for device in SoapySDR.Device.enumerate({'driver': 'hackrf'})]
+
+
+def enumerate_usrp():
+    """Return the USRP devices UHD can find on USB and the local network"""
+    from gnuradio import uhd  # type: ignore
+    devices = []
+    for addr in uhd.find_devices():
+        fields = (item.split('=', 1) for item in addr.to_string().split(',') if '=' in item)
+        devices.append({key.strip(): value.strip() for key, value in fields})
+    return devices
+
+
+def usb_snapshot(sysfs_dir=USB_SYSFS_DIR):
+    """Return the set of (vendor, product) ids currently on the USB bus"""
+    ids = set()
+    try:
+        entries = os.listdir(sysfs_dir)
+    except OSError:
+        return frozenset()
+    for entry in entries:
+        try:
+            with open(os.path.join(sysfs_dir, entry, 'idVendor')) as f:
+                vendor = f.read().strip()
+            with open(os.path.join(sysfs_dir, entry, 'idProduct')) as f:
+                product = f.read().strip()
+        except OSError:
+            continue
+        ids.add((vendor, product))
+    return frozenset(ids)
+
+
+class DeviceDiscovery:
+    """Background HackRF/USRP enumeration, on demand.
+
+    A radio type is enumerated on a worker thread the first time it is
+    asked for (or on ``refresh``), and again only when one of its radios
+    appears on or disappears from the USB bus; the USB check reads sysfs
+    and loads no driver. Types never asked for are never enumerated, so
+    their driver is not imported. ``is_present`` and ``devices`` only read
+    the cache, so they are safe to call from the GUI thread.
+    """
+    def __init__(self, poll_interval=1.0, enumerators=None, snapshot=usb_snapshot):
+        self.poll_interval = poll_interval
+        self.enumerators = enumerators or {'hackrf': enumerate_hackrf, 'usrp': enumerate_usrp}
+        self.snapshot = snapshot
+        self._cache = {}  # kind -> (timestamp, devices)
+        self._pending = set()
+        self._running = set()    # kinds being enumerated right now
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="device-discovery", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def refresh(self, kind):
+        """Request a background re-enumeration of ``kind``"""
+        with self._lock:
+            self._pending.add(kind)
+        self._wake.set()
+
+    def devices(self, kind):
+        """Return the cached devices of ``kind`` (None until the first enumeration has finished)"""
+        with self._lock:
+            cached = self._cache.get(kind)
+            requested = cached is not None or kind in self._pending or kind in self._running
+        if not requested:
+            self.refresh(kind)
+        return list(cached[1]) if cached else None
+
+    def is_present(self, kind):
+        """True/False from the cache, or None if discovery has not finished yet"""
+        devices = self.devices(kind)
+        return None if devices is None else bool(devices)
+
+    def add_listener(self, callback):
+        """Call ``callback(kind, devices)`` from the worker thread after each enumeration"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _run(self):
+        last_usb = self.snapshot()
+        while not self._stop.is_set():
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+
+            usb = self.snapshot()
+            if usb != last_usb:
+                changed = usb ^ last_usb
+                with self._lock:
+                    # Only radio types already in use; the others stay unloaded
+                    for kind, ids in USB_IDS.items():
+                        if changed & ids and kind in self._cache:
+                            self._pending.add(kind)
+                last_usb = usb
+
+            with self._lock:
+                pending, self._pending = self._pending, set()
+                self._running = set(pending)
+
+            for kind in pending:
+                self._enumerate(kind)
+
+    def _enumerate(self, kind):
+        try:
+            devices = self.enumerators[kind]()
+        except Exception as e:
+            print(f"Error enumerating {kind} devices: {e}")
+            devices = []
+        with self._lock:
+            self._cache[kind] = (time.monotonic(), devices)
+            self._running.discard(kind)
+        for callback in list(self._listeners):
+            try:
+                callback(kind, devices)
+            except Exception as e:
+                print(f"Error in device discovery listener: {e}")
+
+
+_discovery = None
+
+
+def get_device_discovery():
+    """Return the shared DeviceDiscovery, starting its USB watch on first use"""
+    global _discovery
+    if _discovery is None:
+        _discovery = DeviceDiscovery()
+        _discovery.start()
+    return _discovery
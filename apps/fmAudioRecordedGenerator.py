@@ -35,12 +35,37 @@ from PyQt5 import Qt, QtCore # type: ignore
 from PyQt5.QtCore import pyqtSlot # type: ignore
 import sip # type: ignore
 
-from gnuradio import analog, blocks, filter, gr, qtgui, soapy, uhd  # type: ignore
-from gnuradio.fft import window # type: ignore
-from gnuradio.qtgui import Range, RangeWidget # type: ignore
+from gnuradio import gr # type: ignore
 
 # Local imports
-from apps.utils import apply_dark_theme, read_settings
+from apps.utils import apply_dark_theme, read_settings, lazy_import
+from apps.control_server import maybe_start_control_server
+from apps.iq_recorder import maybe_attach_iq_recorder
+from apps.graph_optimizer import recording_connections, maybe_optimize_graph
+from apps.network_audio import NetworkAudioSource
+
+# Deferred gnuradio imports: DSP blocks and the radio driver load on first use
+analog = lazy_import('gnuradio.analog')
+blocks = lazy_import('gnuradio.blocks')
+filter = lazy_import('gnuradio.filter')
+qtgui = lazy_import('gnuradio.qtgui')
+soapy = lazy_import('gnuradio.soapy')
+uhd = lazy_import('gnuradio.uhd')
+window = lazy_import('gnuradio.fft', 'window')
+Range = lazy_import('gnuradio.qtgui', 'Range')
+RangeWidget = lazy_import('gnuradio.qtgui', 'RangeWidget')
+
+# Launcher manifest: read by apps/app_index.py without importing this module
+APP_MANIFEST = {
+    'name': "FM Audio Generator",
+    'icon': "fmAudio.png",
+    'category': 'audio',
+    'order': 1,
+    'media': ['wav'],
+    'samp_rate': 2e6,
+    'cpu_cost': 'low',
+    'radios': ['hackrf', 'usrp'],
+}
 
 def get_wav_files(settings):
     """Get list of wav files from media directory"""
@@ -181,6 +206,7 @@ class ConfigDialog(Qt.QDialog):
                 self.source_combo.addItem(display_name, wav_file)
                 
             # Always add these options
+            self.source_combo.addItem("Network Audio (UDP)", "network")
             self.source_combo.addItem("Sinewave", "sinewave")
             self.source_combo.addItem("No Modulation", "none")
             
@@ -322,12 +348,17 @@ class ConfigDialog(Qt.QDialog):
         
         # Get selected source
         current_data = self.source_combo.currentData()
+        networkAudio = None
         if current_data == "sinewave":
             sourceIndex = 1
             wavFile = None
         elif current_data == "none":
             sourceIndex = 2
             wavFile = None
+        elif current_data == "network":
+            sourceIndex = 0
+            wavFile = None
+            networkAudio = {}
         else:
             sourceIndex = 0
             wavFile = current_data
@@ -341,6 +372,7 @@ class ConfigDialog(Qt.QDialog):
             'rfPwr': self.pwr_slider.value(),
             'sourceIndex': sourceIndex,
             'wavFile': wavFile,
+            'networkAudio': networkAudio,
             'freqDev': self.dev_slider.value(),
             'sineFreq': self.sine_slider.value()
         }
@@ -665,8 +697,12 @@ class fmAudioRecordedGenerator(gr.top_block, Qt.QWidget):
         for c in range(3, 6):
             self.top_grid_layout.setColumnStretch(c, 1)
         
-        # Modify wavfile source to use selected file
-        if self.wavFile and os.path.exists(self.wavFile):
+        # Modify wavfile source to use selected file, or network audio (resampled to 50 kHz)
+        self.network_audio = None
+        if values.get('networkAudio') is not None:
+            self.network_audio = NetworkAudioSource(mikePort, samp_rate/40, values['networkAudio'], "fmAudioRecordedGenerator")
+            self.blocks_wavfile_source_0 = self.network_audio
+        elif self.wavFile and os.path.exists(self.wavFile):
             self.blocks_wavfile_source_0 = blocks.wavfile_source(self.wavFile, True)
         else:
             # Create dummy source if no valid wav file
@@ -685,6 +721,7 @@ class fmAudioRecordedGenerator(gr.top_block, Qt.QWidget):
         self.connect((self.analog_frequency_modulator_fc_0, 0), (self.qtgui_const_sink_x_0, 0))
         self.connect((self.analog_frequency_modulator_fc_0, 0), (self.qtgui_freq_sink_x_0, 0))
         self.connect((self.analog_frequency_modulator_fc_0, 0), (self.radio_sink, 0))
+        self.radio_feed = (self.analog_frequency_modulator_fc_0, 0)
         self.connect((self.analog_sig_source_x_0, 0), (self.blocks_selector_0, 1))
         self.connect((self.blocks_null_source_0, 0), (self.blocks_selector_0, 2))
         self.connect((self.blocks_selector_0, 0), (self.analog_frequency_modulator_fc_0, 0))
@@ -698,6 +735,8 @@ class fmAudioRecordedGenerator(gr.top_block, Qt.QWidget):
         self.settings.setValue("geometry", self.saveGeometry())
         self.stop()
         self.wait()
+        if self.network_audio is not None:
+            self.network_audio.close()
 
         event.accept()
 
@@ -804,8 +843,11 @@ def main(top_block_cls=fmAudioRecordedGenerator, options=None, app=None, config_
             Qt.QApplication.setGraphicsSystem(style)
         app = Qt.QApplication(sys.argv)
 
-    tb = top_block_cls(config_values)
+    tb = recording_connections(top_block_cls)(config_values)
+    tb.graph_report = maybe_optimize_graph(tb, 'fmAudioRecordedGenerator')
+    tb.iq_recorder = maybe_attach_iq_recorder(tb, 'fmAudioRecordedGenerator')
     tb.start()
+    tb.control_server = maybe_start_control_server(tb, 'fmAudioRecordedGenerator')
     tb.show()
 
     def sig_handler(sig=None, frame=None):
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import math
+import random
+import threading
+import time
+
+from apps.control_server import gui_invoker
+
+NS = 1_000_000_000
+MIN_DWELL = 0.001  # seconds
+DEFAULT_LEAD = 0.02  # how far ahead of a hop timed USRP commands are issued
+
+
+def hop_frequencies(plan):
+    """Return the channel list (MHz) and an iterator of hop frequencies for ``plan``.
+
+    ``plan`` is a dict with either ``frequencies`` (a fixed list, visited in
+    order and repeated) or ``seed`` plus ``channels`` (a list) or
+    ``center``/``spacing``/``count`` (an evenly spaced channel set), visited
+    in a reproducible pseudo-random order that never repeats a channel twice
+    in a row. Raises ValueError for a plan that names none of these.
+    """
+    if plan.get('frequencies'):
+        channels = [float(f) for f in plan['frequencies']]
+
+        def fixed():
+            while True:
+                yield from channels
+        return channels, fixed()
+
+    channels = plan.get('channels')
+    if not channels:
+        if 'center' not in plan:
+            raise ValueError("Hop plan needs 'frequencies', 'channels' or a 'center' "
+                             "(with optional 'count' and 'spacing')")
+        count = int(plan.get('count', 16))
+        spacing = float(plan.get('spacing', 1.0))
+        center = float(plan['center'])
+        channels = [center + (i - (count - 1) / 2) * spacing for i in range(count)]
+    channels = [float(f) for f in channels]
+    rng = random.Random(plan.get('seed', 0))
+
+    def pseudo_random():
+        previous = None
+        while True:
+            choice = rng.choice(channels)
+            if len(channels) > 1 and choice == previous:
+                continue
+            previous = choice
+            yield choice
+    return channels, pseudo_random()
+
+
+class FrequencyHopper:
+    """Retunes a top block through a hop sequence with a fixed dwell time.
+
+    The sink is retuned from the hopper thread; the GUI's ``cf`` display is
+    updated on the Qt thread. On USRP every hop is issued ``lead`` seconds
+    early as a timed command (``set_command_time``), so the radio retunes
+    on the exact device-time boundary. ``stats()`` then reports the
+    command-arrival margin: the deadline minus the device time read right
+    after the command was issued (negative means the hop ran late). On
+    HackRF, which has no timed commands, the retune is issued as close to
+    the boundary as the host allows, and ``stats()`` reports how late it
+    completed (latency) and how much that varied (jitter).
+    """
+    def __init__(self, tb, plan):
+        self.tb = tb
+        self.plan = dict(plan)
+        self.dwell = max(float(plan.get('dwell', 0.1)), MIN_DWELL)
+        self.lead = float(plan.get('lead', DEFAULT_LEAD))
+        self.max_hops = plan.get('hops')
+        self.channels, self._sequence = hop_frequencies(plan)
+        self.timed = getattr(tb, 'radio_type', 'hackrf') == 'usrp'
+        self._gui = gui_invoker(tb)
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._latencies = []
+        self._call_times = []
+        self._margins = []
+        self._late = 0
+        self._hops = 0
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="freq-hopper", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+
+    def is_running(self):
+        return bool(self._thread and self._thread.is_alive())
+
+    def _device_ns(self):
+        """Device time of the USRP sink in integer nanoseconds"""
+        spec = self.tb.radio_sink.get_time_now()
+        return spec.get_full_secs() * NS + round(spec.get_frac_secs() * NS)
+
+    def _retune(self, frequency):
+        if self.timed:
+            self.tb.radio_sink.set_center_freq(frequency * 1e6, 0)
+        else:
+            self.tb.radio_sink.set_frequency(0, frequency * 1e6)
+
+    def _show(self, frequency):
+        """Bring the GUI in line with a hop; runs on the Qt thread"""
+        self.tb.cf = frequency
+        freq_sink = getattr(self.tb, 'qtgui_freq_sink_x_0', None)
+        if freq_sink is not None:
+            freq_sink.set_frequency_range(frequency * 1e6, self.tb.samp_rate)
+
+    def _run(self):
+        dwell_ns = round(self.dwell * NS)
+        lead_ns = round(self.lead * NS)
+        if self.timed:
+            from gnuradio import uhd # type: ignore
+            # Device time minus host time; the apps set device time from time.time()
+            try:
+                offset_ns = self._device_ns() - time.time_ns()
+            except Exception:
+                offset_ns = 0
+        start_ns = time.time_ns() + max(lead_ns, dwell_ns)
+        hop = 0
+        while not self._stop.is_set() and (self.max_hops is None or hop < self.max_hops):
+            deadline_ns = start_ns + hop * dwell_ns
+            frequency = next(self._sequence)
+            issue_at = deadline_ns - lead_ns if self.timed else deadline_ns
+            delay = (issue_at - time.time_ns()) / NS
+            if delay > 0 and self._stop.wait(delay):
+                break
+
+            issued = time.time_ns()
+            if self.timed:
+                sink = self.tb.radio_sink
+                device_deadline = deadline_ns + offset_ns
+                sink.set_command_time(uhd.time_spec(device_deadline // NS, (device_deadline % NS) / NS))
+                self._retune(frequency)
+                sink.clear_command_time()
+                done = time.time_ns()
+                margin = (device_deadline - self._device_ns()) / NS
+            else:
+                self._retune(frequency)
+                done = time.time_ns()
+            if self._gui:
+                self._gui.post(self._show, frequency)
+            else:
+                self._show(frequency)
+
+            with self._lock:
+                self._hops += 1
+                self._call_times.append((done - issued) / NS)
+                if self.timed:
+                    self._margins.append(margin)
+                    if margin < 0:
+                        self._late += 1
+                else:
+                    self._latencies.append((done - deadline_ns) / NS)
+            hop += 1
+
+    def stats(self):
+        """Command-arrival margin (timed) or retune latency/jitter (best-effort), in ms"""
+        with self._lock:
+            result = {
+                'mode': 'timed' if self.timed else 'best-effort',
+                'hops': self._hops,
+                'dwell_ms': self.dwell * 1e3,
+                'call_ms_mean': _mean(self._call_times) * 1e3,
+            }
+            if self.timed:
+                result['late_commands'] = self._late
+                result['arrival_margin_ms_mean'] = _mean(self._margins) * 1e3
+                result['arrival_margin_ms_min'] = min(self._margins, default=0.0) * 1e3
+            else:
+                latencies = list(self._latencies)
+        if not self.timed:
+            result['latency_ms_mean'] = _mean(latencies) * 1e3
+            result['latency_ms_max'] = max(latencies, default=0.0) * 1e3
+            result['jitter_ms'] = _std(latencies) * 1e3
+        return result
+
+
+def _mean(values):
+    return sum(values) / len(values) if values else 0.0
+
+
+def _std(values):
+    if len(values) < 2:
+        return 0.0
+    mean = _mean(values)
+    return math.sqrt(sum((v - mean) ** 2 for v in values) / (len(values) - 1))
@@ -31,15 +31,8 @@ import time
 from math import pi
 
 # Third party imports 
-from gnuradio import analog # type: ignore
-from gnuradio import blocks # type: ignore
 from gnuradio import eng_notation # type: ignore
-from gnuradio import filter # type: ignore
 from gnuradio import gr # type: ignore
-from gnuradio import qtgui # type: ignore
-from gnuradio import soapy, uhd  # type: ignore
-from gnuradio.fft import window # type: ignore
-from gnuradio.qtgui import Range, RangeWidget # type: ignore
 from packaging.version import Version as StrictVersion # type: ignore
 from PyQt5 import Qt # type: ignore
 from PyQt5 import QtCore # type: ignore
@@ -47,7 +40,34 @@ from PyQt5.QtCore import pyqtSlot # type: ignore
 import sip # type: ignore
 
 # Local imports
-from apps.utils import apply_dark_theme, read_settings
+from apps.utils import apply_dark_theme, read_settings, lazy_import
+from apps.control_server import maybe_start_control_server
+from apps.iq_recorder import maybe_attach_iq_recorder
+from apps.graph_optimizer import recording_connections, maybe_optimize_graph
+from apps.tx_controls import TxControls
+from apps.cpfsk import CpfskModulator
+
+# Deferred gnuradio imports: DSP blocks and the radio driver load on first use
+analog = lazy_import('gnuradio.analog')
+blocks = lazy_import('gnuradio.blocks')
+qtgui = lazy_import('gnuradio.qtgui')
+soapy = lazy_import('gnuradio.soapy')
+uhd = lazy_import('gnuradio.uhd')
+window = lazy_import('gnuradio.fft', 'window')
+Range = lazy_import('gnuradio.qtgui', 'Range')
+RangeWidget = lazy_import('gnuradio.qtgui', 'RangeWidget')
+
+# Launcher manifest: read by apps/app_index.py without importing this module
+APP_MANIFEST = {
+    'name': "FSK Signal Generator",
+    'icon': "fsk.jpg",
+    'category': 'digital',
+    'order': 2,
+    'media': [],
+    'samp_rate': 5e6,
+    'cpu_cost': 'medium',
+    'radios': ['hackrf', 'usrp'],
+}
 
 
 class ConfigDialog(Qt.QDialog):
@@ -261,7 +281,7 @@ class ConfigDialog(Qt.QDialog):
             'modNameDefault': modNameDefault
         }
 
-class fskGenerator(gr.top_block, Qt.QWidget):
+class fskGenerator(gr.top_block, Qt.QWidget, TxControls):
     def __init__(self, config_values=None):
         gr.top_block.__init__(self, "FSK Signal Generator", catch_exceptions=True)
         Qt.QWidget.__init__(self)
@@ -341,6 +361,11 @@ class fskGenerator(gr.top_block, Qt.QWidget):
         self.actualBitRate = actualBitRate = actualSymRate*bitsPerSym
         self.BT = BT = btDefault
         self.radio_type = radio_type
+        self.hopper = None
+        self.burst_gate = None
+        self.payload_source = None
+        self.payload_port = mikePort
+        self.reconfigure_ms = None  # flowgraph pause of the last live modulation change
 
         ##################################################
         # Blocks
@@ -356,6 +381,23 @@ class fskGenerator(gr.top_block, Qt.QWidget):
             self.top_grid_layout.setRowStretch(r, 1)
         for c in range(3, 6):
             self.top_grid_layout.setColumnStretch(c, 1)
+        # Modulation order is a live control: see set_bitsPerSym
+        self._bitsPerSym_options = [1, 2, 3]
+        self._bitsPerSym_labels = ['2FSK', '4FSK', '8FSK']
+        self._bitsPerSym_tool_bar = Qt.QToolBar(self)
+        self._bitsPerSym_tool_bar.addWidget(Qt.QLabel("Modulation Order" + ": "))
+        self._bitsPerSym_combo_box = Qt.QComboBox()
+        self._bitsPerSym_tool_bar.addWidget(self._bitsPerSym_combo_box)
+        for _label in self._bitsPerSym_labels: self._bitsPerSym_combo_box.addItem(_label)
+        self._bitsPerSym_callback = lambda i: Qt.QMetaObject.invokeMethod(self._bitsPerSym_combo_box, "setCurrentIndex", Qt.Q_ARG("int", self._bitsPerSym_options.index(i)))
+        self._bitsPerSym_callback(self.bitsPerSym)
+        self._bitsPerSym_combo_box.currentIndexChanged.connect(
+            lambda i: self.set_bitsPerSym(self._bitsPerSym_options[i]))
+        self.top_grid_layout.addWidget(self._bitsPerSym_tool_bar, 1, 4, 1, 3)
+        for r in range(1, 2):
+            self.top_grid_layout.setRowStretch(r, 1)
+        for c in range(4, 7):
+            self.top_grid_layout.setColumnStretch(c, 1)
         self._rfPwr_range = Range(-80, -30, 1, rfPwrDefault, 200)
         self._rfPwr_win = RangeWidget(self._rfPwr_range, self.set_rfPwr, "RF Output Power", "counter_slider", float, QtCore.Qt.Horizontal)
         self.top_grid_layout.addWidget(self._rfPwr_win, 1, 0, 1, 4)
@@ -595,8 +637,6 @@ class fskGenerator(gr.top_block, Qt.QWidget):
             self.top_grid_layout.setRowStretch(r, 1)
         for c in range(3, 6):
             self.top_grid_layout.setColumnStretch(c, 1)
-        self.fir_filter_xxx_0 = filter.fir_filter_fff(1, filter.firdes.gaussian(1,sps,BT,int(2*sps)))
-        self.fir_filter_xxx_0.declare_sample_delay(0)
         self._displayedBitsPerSym_tool_bar = Qt.QToolBar(self)
 
         if None:
@@ -627,15 +667,10 @@ class fskGenerator(gr.top_block, Qt.QWidget):
             self.top_grid_layout.setRowStretch(r, 1)
         for c in range(6, 10):
             self.top_grid_layout.setColumnStretch(c, 1)
-        self.blocks_uchar_to_float_0 = blocks.uchar_to_float()
-        self.blocks_selector_0 = blocks.selector(gr.sizeof_float*1,filterVal,0)
-        self.blocks_selector_0.set_enabled(True)
-        self.blocks_repeat_0_0 = blocks.repeat(gr.sizeof_char*1, int(samp_rate/symRate/1000))
-        self.blocks_multiply_const_vxx_1 = blocks.multiply_const_ff(1/(2**bitsPerSym-1))
         self.blocks_multiply_const_vxx_0 = blocks.multiply_const_cc(10**((rfPwr<=-50)*(rfPwr+50)/20)*0.95)
-        self.blocks_add_const_vxx_0 = blocks.add_const_ff(-0.5)
         self.analog_random_uniform_source_x_0 = analog.random_uniform_source_b(0, int(2**bitsPerSym), 0)
-        self.analog_frequency_modulator_fc_0 = analog.frequency_modulator_fc(excursion*2000*pi/samp_rate)
+        # Symbol-rate CPFSK/GFSK: Gaussian shaping and FM by table lookup (see apps/cpfsk.py)
+        self.cpfsk_modulator_0 = CpfskModulator(bitsPerSym, sps, excursion*2000*pi/samp_rate, BT if filterVal else None)
         self._actualBitRate_tool_bar = Qt.QToolBar(self)
 
         if None:
@@ -656,26 +691,39 @@ class fskGenerator(gr.top_block, Qt.QWidget):
         ##################################################
         # Connections
         ##################################################
-        self.connect((self.analog_frequency_modulator_fc_0, 0), (self.blocks_multiply_const_vxx_0, 0))
-        self.connect((self.analog_frequency_modulator_fc_0, 0), (self.qtgui_const_sink_x_0, 0))
-        self.connect((self.analog_frequency_modulator_fc_0, 0), (self.qtgui_freq_sink_x_0, 0))
-        self.connect((self.analog_random_uniform_source_x_0, 0), (self.blocks_repeat_0_0, 0))
-        self.connect((self.blocks_add_const_vxx_0, 0), (self.blocks_selector_0, 0))
-        self.connect((self.blocks_add_const_vxx_0, 0), (self.fir_filter_xxx_0, 0))
+        self.connect((self.analog_random_uniform_source_x_0, 0), (self.cpfsk_modulator_0, 0))
         self.connect((self.blocks_multiply_const_vxx_0, 0), (self.radio_sink, 0))
-        self.connect((self.blocks_multiply_const_vxx_1, 0), (self.blocks_add_const_vxx_0, 0))
-        self.connect((self.blocks_repeat_0_0, 0), (self.blocks_uchar_to_float_0, 0))
-        self.connect((self.blocks_selector_0, 0), (self.analog_frequency_modulator_fc_0, 0))
-        self.connect((self.blocks_selector_0, 0), (self.qtgui_time_sink_x_0, 0))
-        self.connect((self.blocks_uchar_to_float_0, 0), (self.blocks_multiply_const_vxx_1, 0))
-        self.connect((self.fir_filter_xxx_0, 0), (self.blocks_selector_0, 1))
+        self.radio_feed = (self.blocks_multiply_const_vxx_0, 0)
+        self.connect((self.cpfsk_modulator_0, 0), (self.blocks_multiply_const_vxx_0, 0))
+        self.connect((self.cpfsk_modulator_0, 0), (self.qtgui_const_sink_x_0, 0))
+        self.connect((self.cpfsk_modulator_0, 0), (self.qtgui_freq_sink_x_0, 0))
+        self.connect((self.cpfsk_modulator_0, 1), (self.qtgui_time_sink_x_0, 0))
+
+        # Optional frequency-hopping plan (see apps/freq_hopper.py)
+        if values.get('hopping'):
+            self.set_hopping(values['hopping'])
+
+        # Optional burst (duty-cycled) transmission (see apps/burst_gate.py)
+        if values.get('burst'):
+            self.set_burst(values['burst'])
+
+        # Optional external payload in place of the random symbol source (see apps/payload_source.py)
+        if values.get('payload'):
+            try:
+                self.set_payload(values['payload'])
+            except Exception as e:
+                print(f"Error starting payload source: {e}")
 
 
     def closeEvent(self, event):
         self.settings = Qt.QSettings("GNU Radio", "fskGenerator")
         self.settings.setValue("geometry", self.saveGeometry())
+        if self.hopper is not None:
+            self.hopper.stop()
         self.stop()
         self.wait()
+        if self.payload_source is not None:
+            self.payload_source.close()
 
         event.accept()
 
@@ -686,7 +734,6 @@ class fskGenerator(gr.top_block, Qt.QWidget):
         self.symRate = symRate
         self.set_actualSymRate(self.samp_rate/int(self.samp_rate/self.symRate/1000)/1000)
         Qt.QMetaObject.invokeMethod(self._symRate_line_edit, "setText", Qt.Q_ARG("QString", eng_notation.num_to_str(self.symRate)))
-        self.blocks_repeat_0_0.set_interpolation(int(self.samp_rate/self.symRate/1000))
 
     def get_samp_rate(self):
         return self.samp_rate
@@ -695,14 +742,15 @@ class fskGenerator(gr.top_block, Qt.QWidget):
         self.samp_rate = samp_rate
         self.set_actualSymRate(self.samp_rate/int(self.samp_rate/self.symRate/1000)/1000)
         self.set_sps(int(self.samp_rate/self.actualSymRate/1000))
-        self.analog_frequency_modulator_fc_0.set_sensitivity(self.excursion*2000*pi/self.samp_rate)
-        self.blocks_repeat_0_0.set_interpolation(int(self.samp_rate/self.symRate/1000))
+        self.cpfsk_modulator_0.set_sensitivity(self.excursion*2000*pi/self.samp_rate)
         self.qtgui_freq_sink_x_0.set_frequency_range(self.cf*1e6, self.samp_rate)
         self.qtgui_time_sink_x_0.set_samp_rate(self.samp_rate)
         if self.radio_type == 'usrp':
             self.radio_sink.set_samp_rate(self.samp_rate)
         else:
             self.radio_sink.set_sample_rate(0, self.samp_rate)
+        if self.burst_gate is not None:
+            self.burst_gate.set_samp_rate(self.samp_rate)
 
     def get_rfPwrDefault(self):
         return self.rfPwrDefault
@@ -743,10 +791,30 @@ class fskGenerator(gr.top_block, Qt.QWidget):
         return self.bitsPerSym
 
     def set_bitsPerSym(self, bitsPerSym):
-        self.bitsPerSym = bitsPerSym
+        if bitsPerSym == self.bitsPerSym:
+            return
+        # random_uniform_source_b has no setter for its range, so a new source is
+        # swapped in while the flowgraph is locked; the radio and the rest of the graph stay up
+        source = analog.random_uniform_source_b(0, int(2**bitsPerSym), 0)
+        paused = time.perf_counter()
+        self.lock()
+        try:
+            if self.payload_source is None:
+                self.disconnect((self.analog_random_uniform_source_x_0, 0), (self.cpfsk_modulator_0, 0))
+                self.connect((source, 0), (self.cpfsk_modulator_0, 0))
+            else:
+                self.payload_source.set_bits_per_sym(bitsPerSym)
+            self.analog_random_uniform_source_x_0 = source
+            self.bitsPerSym = bitsPerSym
+            self.cpfsk_modulator_0.set_bits_per_sym(self.bitsPerSym)
+        finally:
+            self.unlock()
+        self.reconfigure_ms = (time.perf_counter() - paused) * 1e3
+        print(f"fskGenerator: {2**self.bitsPerSym}FSK, flowgraph paused {self.reconfigure_ms:.1f} ms")
+        self._bitsPerSym_callback(self.bitsPerSym)
         self.set_actualBitRate(self.actualSymRate*self.bitsPerSym)
         self.set_displayedBitsPerSym(self.bitsPerSym)
-        self.blocks_multiply_const_vxx_1.set_k(1/(2**self.bitsPerSym-1))
+        self.set_modName(f"{2**self.bitsPerSym}FSK")
 
     def get_actualSymRate(self):
         return self.actualSymRate
@@ -757,12 +825,16 @@ class fskGenerator(gr.top_block, Qt.QWidget):
         self.set_displayedActSymRate(self.actualSymRate)
         self.set_sps(int(self.samp_rate/self.actualSymRate/1000))
 
+    def get_occupiedBw(self):
+        # kHz occupied by the signal; Carson's rule, the tones spanning +/- excursion/2
+        return self.excursion + self.actualSymRate
+
     def get_sps(self):
         return self.sps
 
     def set_sps(self, sps):
         self.sps = sps
-        self.fir_filter_xxx_0.set_taps(filter.firdes.gaussian(1,self.sps,self.BT,int(2*self.sps)))
+        self.cpfsk_modulator_0.set_pulse(self.sps, self.BT if self.filterVal else None)
 
     def get_rfPwr(self):
         return self.rfPwr
@@ -800,7 +872,7 @@ class fskGenerator(gr.top_block, Qt.QWidget):
     def set_filterVal(self, filterVal):
         self.filterVal = filterVal
         self._filterVal_callback(self.filterVal)
-        self.blocks_selector_0.set_input_index(self.filterVal)
+        self.cpfsk_modulator_0.set_pulse(self.sps, self.BT if self.filterVal else None)
 
     def get_excursion(self):
         return self.excursion
@@ -808,7 +880,7 @@ class fskGenerator(gr.top_block, Qt.QWidget):
     def set_excursion(self, excursion):
         self.excursion = excursion
         Qt.QMetaObject.invokeMethod(self._excursion_line_edit, "setText", Qt.Q_ARG("QString", eng_notation.num_to_str(self.excursion)))
-        self.analog_frequency_modulator_fc_0.set_sensitivity(self.excursion*2000*pi/self.samp_rate)
+        self.cpfsk_modulator_0.set_sensitivity(self.excursion*2000*pi/self.samp_rate)
 
     def get_displayedBitsPerSym(self):
         return self.displayedBitsPerSym
@@ -835,6 +907,17 @@ class fskGenerator(gr.top_block, Qt.QWidget):
         else:
             self.radio_sink.set_frequency(0, self.cf*1e6)
 
+    def tx_output(self):
+        return (self.blocks_multiply_const_vxx_0, 0)
+
+    def symbol_input(self):
+        return (self.cpfsk_modulator_0, 0)
+
+    def symbol_edges(self):
+        return [
+            ((self.analog_random_uniform_source_x_0, 0), (self.cpfsk_modulator_0, 0)),
+        ]
+
     def get_attenDefault(self):
         return self.attenDefault
 
@@ -853,7 +936,7 @@ class fskGenerator(gr.top_block, Qt.QWidget):
 
     def set_BT(self, BT):
         self.BT = BT
-        self.fir_filter_xxx_0.set_taps(filter.firdes.gaussian(1,self.sps,self.BT,int(2*self.sps)))
+        self.cpfsk_modulator_0.set_pulse(self.sps, self.BT if self.filterVal else None)
 
 
 
@@ -864,8 +947,11 @@ def main(top_block_cls=fskGenerator, options=None, app=None, config_values=None)
             style = gr.prefs().get_string('qtgui', 'style', 'raster')
             app = Qt.QApplication(sys.argv)
 
-    tb = top_block_cls(config_values)
+    tb = recording_connections(top_block_cls)(config_values)
+    tb.graph_report = maybe_optimize_graph(tb, 'fskGenerator')
+    tb.iq_recorder = maybe_attach_iq_recorder(tb, 'fskGenerator')
     tb.start()
+    tb.control_server = maybe_start_control_server(tb, 'fskGenerator')
     tb.show()
 
     def sig_handler(sig=None, frame=None):
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Fold chains of constant multiplies/adds and trivial conversions before start().
+
+Build the top block as ``recording_connections(cls)(...)`` so its edges
+are known, then call ``optimize_graph(tb)``. The pass finds runs of elementwise
+affine blocks (multiply_const, add_const, uchar_to_float, float_to_complex
+with a null_source imaginary input) in which each block's output feeds
+only the next one, and replaces every run that it shrinks with a
+``FusedAffine`` computing ``scale * x + offset`` in native blocks: the
+run's conversions, at most one multiply and one add. Runs that would not
+shrink are left alone; a Python block at full rate costs more than the
+volk kernels it would replace.
+
+An intermediate output that also feeds something else (usually a GUI
+sink) ends the run there, so displays show exactly what they did before.
+Folded blocks are replaced on the top block by ``FusedMember`` stand-ins:
+``k()``/``set_k()`` read and update the fused constants, so setters such
+as set_rfPwr keep working, and the first and last member of a run remain
+valid connection endpoints (its input and output).
+"""
+
+import functools
+
+import numpy as np # type: ignore
+from gnuradio import gr # type: ignore
+
+from apps.utils import lazy_import, read_settings
+
+blocks = lazy_import('gnuradio.blocks')
+
+ITEM_SIZES = {'b': 1, 'f': 4, 'c': 8}
+# Block type -> (item type, operation)
+AFFINE_OPS = {
+    'multiply_const_ff': ('f', 'mul'),
+    'multiply_const_cc': ('c', 'mul'),
+    'add_const_ff': ('f', 'add'),
+    'add_const_cc': ('c', 'add'),
+}
+# Block type -> (input item type, output item type); values pass through unchanged
+CONVERSIONS = {
+    'uchar_to_float': ('b', 'f'),
+    'float_to_complex': ('f', 'c'),
+}
+
+
+# ----- recording edges -----
+
+def _pairs(points):
+    ends = [(point, 0) if hasattr(point, 'to_basic_block') else tuple(point) for point in points]
+    return [src + dst for src, dst in zip(ends, ends[1:])]
+
+
+def _same_edge(a, b):
+    return a[0] is b[0] and a[1] == b[1] and a[2] is b[2] and a[3] == b[3]
+
+
+class RecordingConnections:
+    """Top block mixin that keeps the block's own connections in ``recorded_edges``"""
+    def connect(self, *points):
+        super().connect(*points)
+        vars(self).setdefault('recorded_edges', []).extend(_pairs(points))
+
+    def disconnect(self, *points):
+        super().disconnect(*points)
+        edges = vars(self).setdefault('recorded_edges', [])
+        for edge in _pairs(points):
+            edges[:] = [e for e in edges if not _same_edge(e, edge)]
+
+
+@functools.lru_cache(maxsize=None)
+def recording_connections(top_block_cls):
+    """Subclass of ``top_block_cls`` whose instances record their edges for optimize_graph"""
+    class Recording(RecordingConnections, top_block_cls):
+        pass
+    Recording.__name__ = top_block_cls.__name__
+    Recording.__qualname__ = top_block_cls.__qualname__
+    Recording.__module__ = top_block_cls.__module__
+    return Recording
+
+
+# ----- fused blocks -----
+
+class FusedAffine(gr.hier_block2):
+    """scale * x + offset with native blocks: ``conversions``, then one multiply and/or one add"""
+    def __init__(self, conversions, in_type, out_type, use_mul, use_add, scale, offset):
+        gr.hier_block2.__init__(self, "fused_affine",
+                                gr.io_signature(1, 1, ITEM_SIZES[in_type]),
+                                gr.io_signature(1, 1, ITEM_SIZES[out_type]))
+        self.out_type = out_type
+        chain = []
+        for conversion in conversions:
+            if conversion == 'uchar_to_float':
+                chain.append(blocks.uchar_to_float())
+            else:
+                to_complex = blocks.float_to_complex(1)
+                self.connect(blocks.null_source(gr.sizeof_float), (to_complex, 1))
+                chain.append(to_complex)
+        suffix = 'cc' if out_type == 'c' else 'ff'
+        self._mul = getattr(blocks, 'multiply_const_' + suffix)(self._cast(scale)) if use_mul else None
+        self._add = getattr(blocks, 'add_const_' + suffix)(self._cast(offset)) if use_add else None
+        chain += [block for block in (self._mul, self._add) if block is not None]
+        self.connect(self, *chain, self)
+
+    def _cast(self, value):
+        return complex(value) if self.out_type == 'c' else float(np.real(value))
+
+    def set_affine(self, scale, offset):
+        if self._mul is not None:
+            self._mul.set_k(self._cast(scale))
+        if self._add is not None:
+            self._add.set_k(self._cast(offset))
+
+
+class FusedRun:
+    """The folded blocks of one run and the block that replaced them"""
+    def __init__(self, names, ops, constants):
+        self.names = names
+        self.ops = ops
+        self.constants = constants
+        self.block = None
+
+    def affine(self):
+        scale, offset = 1, 0
+        for op, k in zip(self.ops, self.constants):
+            if op == 'mul':
+                scale, offset = scale * k, offset * k
+            elif op == 'add':
+                offset = offset + k
+        return scale, offset
+
+    def update(self):
+        self.block.set_affine(*self.affine())
+
+
+class FusedMember:
+    """Stands in for a block folded into ``run.block``"""
+    def __init__(self, run, index):
+        self._run = run
+        self._index = index
+
+    def k(self):
+        return self._run.constants[self._index]
+
+    def set_k(self, k):
+        self._run.constants[self._index] = k
+        self._run.update()
+
+    def to_basic_block(self):
+        # The first member's input and the last member's output are the fused block's
+        if self._index in (0, len(self._run.names) - 1):
+            return self._run.block.to_basic_block()
+        raise ValueError(f"{self._run.names[self._index]} was folded into a fused block and has no ports")
+
+
+# ----- the pass -----
+
+def _producers(edges, block, port):
+    return [e for e in edges if e[2] is block and e[3] == port]
+
+
+def _consumers(edges, block):
+    return [e for e in edges if e[0] is block]
+
+
+def _single_items(block, item_type):
+    return block.input_signature().sizeof_stream_item(0) == ITEM_SIZES[item_type]
+
+
+def _node(edges, block):
+    """(in type, out type, op, constant, extra blocks) if ``block`` can be folded, else None"""
+    kind = type(block).__name__
+    if kind in AFFINE_OPS:
+        item_type, op = AFFINE_OPS[kind]
+        if _single_items(block, item_type):
+            return item_type, item_type, op, block.k(), []
+    elif kind == 'uchar_to_float':
+        return 'b', 'f', 'conv', None, []
+    elif kind == 'float_to_complex' and _single_items(block, 'f'):
+        imag = _producers(edges, block, 1)
+        if (len(imag) == 1 and type(imag[0][0]).__name__ == 'null_source'
+                and len(_consumers(edges, imag[0][0])) == 1):
+            return 'f', 'c', 'conv', None, [imag[0][0]]
+    return None
+
+
+def find_runs(edges):
+    """Maximal chains of foldable blocks joined by single-consumer edges; returns (runs, nodes)"""
+    order = []
+    for e in edges:
+        for block in (e[0], e[2]):
+            if not any(block is b for b in order):
+                order.append(block)
+    nodes = {id(block): _node(edges, block) for block in order}
+
+    def successor(block):
+        out = _consumers(edges, block)
+        if nodes[id(block)] is None or len(out) != 1 or out[0][3] != 0:
+            return None
+        following = nodes.get(id(out[0][2]))
+        if following is None or following[0] != nodes[id(block)][1]:
+            return None
+        return out[0][2]
+
+    continued = {id(successor(block)) for block in order if successor(block) is not None}
+    runs = []
+    for block in order:
+        if nodes[id(block)] is None or id(block) in continued:
+            continue
+        run = [block]
+        while successor(run[-1]) is not None:
+            run.append(successor(run[-1]))
+        if len(run) > 1:
+            runs.append(run)
+    return runs, nodes
+
+
+def _shrinks(run, nodes):
+    """True if a FusedAffine needs fewer blocks than ``run`` and its null sources"""
+    info = [nodes[id(block)] for block in run]
+    before = len(run) + sum(len(n[4]) for n in info)
+    conversions = [type(block).__name__ for block, n in zip(run, info) if n[2] == 'conv']
+    native = (len(conversions) + conversions.count('float_to_complex')
+              + any(n[2] == 'mul' for n in info) + any(n[2] == 'add' for n in info))
+    return native < before
+
+
+def optimize_graph(tb):
+    """Fold the affine runs of ``tb``, built as recording_connections(cls)(...); return a report"""
+    edges = vars(tb).get('recorded_edges')
+    if edges is None:
+        raise ValueError("the top block was not built with recording_connections()")
+    names = {id(value): name for name, value in vars(tb).items() if hasattr(value, 'to_basic_block')}
+    runs, nodes = find_runs(edges)
+    report = {'runs': [], 'blocks_before': len({id(b) for e in edges for b in (e[0], e[2])})}
+
+    for run in runs:
+        if not _shrinks(run, nodes):
+            continue
+        info = [nodes[id(block)] for block in run]
+        fused = FusedRun([names.get(id(block), type(block).__name__) for block in run],
+                         [n[2] for n in info], [n[3] for n in info])
+        scale, offset = fused.affine()
+        in_type, out_type = info[0][0], info[-1][1]
+        conversions = [type(block).__name__ for block, n in zip(run, info) if n[2] == 'conv']
+        fused.block = FusedAffine(conversions, in_type, out_type, 'mul' in fused.ops, 'add' in fused.ops,
+                                  scale, offset)
+
+        removed = [block for n in info for block in n[4]] + run
+        old = [e for e in edges if any(e[0] is b or e[2] is b for b in removed)]
+        new = ([(e[0], e[1], fused.block, 0) for e in _producers(edges, run[0], 0)]
+               + [(fused.block, 0, e[2], e[3]) for e in _consumers(edges, run[-1])])
+        # The top block's own connect/disconnect keep ``edges`` up to date
+        for e in old:
+            tb.disconnect((e[0], e[1]), (e[2], e[3]))
+        for e in new:
+            tb.connect((e[0], e[1]), (e[2], e[3]))
+
+        # Setters and later rewiring go through the stand-ins
+        members = {id(block): FusedMember(fused, i) for i, block in enumerate(run)}
+        for name, value in list(vars(tb).items()):
+            if id(value) in members:
+                setattr(tb, name, members[id(value)])
+            elif isinstance(value, tuple) and len(value) == 2 and id(value[0]) in members:
+                setattr(tb, name, (members[id(value[0])], value[1]))
+        report['runs'].append({'blocks': fused.names, 'scale': scale, 'offset': offset})
+
+    report['blocks_after'] = len({id(b) for e in edges for b in (e[0], e[2])})
+    return report
+
+
+def format_report(name, report):
+    lines = [f"{name}: graph optimizer {report['blocks_before']} -> {report['blocks_after']} blocks"]
+    for run in report['runs']:
+        lines.append(f"  folded {' -> '.join(run['blocks'])} into one fused block")
+    return "\n".join(lines)
+
+
+def maybe_optimize_graph(tb, name):
+    """Run optimize_graph on ``tb`` if enabled in the global settings ("graph_optimizer": true).
+
+    Must be called before ``tb.start()`` and before anything else taps the graph.
+    """
+    if not read_settings().get('graph_optimizer'):
+        return None
+    try:
+        report = optimize_graph(tb)
+    except Exception as e:
+        print(f"Error optimizing flowgraph: {e}")
+        return None
+    print(format_report(name, report))
+    return report
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import glob
+import os
+
+from PyQt5.QtCore import Qt # type: ignore
+from PyQt5.QtGui import QImage, QPixmap # type: ignore
+
+ICON_CACHE_DIR = os.path.join("config", "icon_cache")
+
+
+def transparent_light_pixels(path, threshold=100, brightness=1.1):
+    """Brighten an icon and make its light pixels transparent, returning a QImage.
+
+    Pixels whose R, G and B are all >= ``threshold`` (after brightening)
+    become transparent white; the work is done on the whole pixel array at
+    once instead of one pixel at a time.
+    """
+    import numpy as np # type: ignore
+    from PIL import Image # type: ignore
+
+    with Image.open(path) as img:
+        pixels = np.asarray(img.convert("RGBA"), dtype=np.float32)
+    pixels[..., :3] *= brightness  # colour only; alpha is left as it is
+    pixels = np.clip(np.rint(pixels), 0, 255).astype(np.uint8)
+    light = (pixels[..., :3] >= threshold).all(axis=-1)
+    pixels[light] = (255, 255, 255, 0)
+
+    height, width = pixels.shape[:2]
+    pixels = np.ascontiguousarray(pixels)
+    return QImage(pixels.data, width, height, 4 * width, QImage.Format_RGBA8888).copy()
+
+
+def cached_pixmap(source, size, device_pixel_ratio=1.0, transform=None, variant="plain",
+                  cache_dir=ICON_CACHE_DIR):
+    """Return ``source`` as a pixmap at most ``size`` logical pixels square.
+
+    The processed, DPI-scaled image is cached as a PNG keyed by the source's
+    mtime, so later starts load a small ready-made file instead of decoding
+    and transforming the original. ``transform(path) -> QImage`` is applied
+    before scaling; ``variant`` names it in the cache key.
+    """
+    mtime = os.stat(source).st_mtime_ns
+    pixels = int(round(size * device_pixel_ratio))
+    stem = f"{os.path.splitext(os.path.basename(source))[0]}-{variant}"
+    cache_path = os.path.join(cache_dir, f"{stem}-{pixels}px-{mtime}.png")
+
+    pixmap = QPixmap(cache_path) if os.path.exists(cache_path) else QPixmap()
+    if pixmap.isNull():
+        image = transform(source) if transform else QImage(source)
+        if image.width() > pixels or image.height() > pixels:
+            image = image.scaled(pixels, pixels, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        _store(image, cache_path, stem, cache_dir)
+        pixmap = QPixmap.fromImage(image)
+
+    pixmap.setDevicePixelRatio(device_pixel_ratio)
+    return pixmap
+
+
+def _store(image, cache_path, stem, cache_dir):
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        for stale in glob.glob(os.path.join(cache_dir, f"{stem}-*.png")):
+            os.remove(stale)
+        tmp_path = cache_path + ".tmp"
+        if image.save(tmp_path, "PNG"):
+            os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Error caching icon {cache_path}: {e}")
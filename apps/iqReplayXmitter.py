@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#
+# SPDX-License-Identifier: GPL-3.0
+#
+# GNU Radio Python Flow Graph
+# Title: IQ Replay Xmitter
+# GNU Radio version: 3.10
+
+from packaging.version import Version as StrictVersion # type: ignore
+
+if __name__ == '__main__':
+    import ctypes
+    import sys
+    if sys.platform.startswith('linux'):
+        try:
+            x11 = ctypes.cdll.LoadLibrary('libX11.so')
+            x11.XInitThreads()
+        except:
+            print("Warning: failed to XInitThreads()")
+
+# Standard library imports
+import json
+import os
+import signal
+import sys
+import time
+
+# Third party imports
+from PyQt5 import Qt, QtCore # type: ignore
+import sip # type: ignore
+
+from gnuradio import gr # type: ignore
+
+# Local imports
+from apps.utils import apply_dark_theme, read_settings, lazy_import
+from apps.control_server import maybe_start_control_server
+from apps.iq_recorder import maybe_attach_iq_recorder
+from apps.graph_optimizer import recording_connections, maybe_optimize_graph
+from apps.sigmf_source import DATATYPES, SigmfCapture, SigmfSource, item_size
+
+# Deferred gnuradio imports: DSP blocks and the radio driver load on first use
+blocks = lazy_import('gnuradio.blocks')
+qtgui = lazy_import('gnuradio.qtgui')
+soapy = lazy_import('gnuradio.soapy')
+uhd = lazy_import('gnuradio.uhd')
+window = lazy_import('gnuradio.fft', 'window')
+
+# Launcher manifest: read by apps/app_index.py without importing this module
+APP_MANIFEST = {
+    'name': "IQ Replay",
+    'icon': "gnuradio.jpg",
+    'category': 'replay',
+    'order': 0,
+    'media': ['sigmf-meta'],
+    'samp_rate': 20e6,
+    'cpu_cost': 'low',
+    'radios': ['hackrf', 'usrp'],
+}
+
+# Sample rates each radio can stream (Hz); USRP rates are checked against the device
+RADIO_RATE_LIMITS = {'hackrf': (2e6, 20e6)}
+RATE_TOLERANCE = 1e-6  # relative sample rate mismatch accepted from the radio
+DISPLAY_FFT = 4096     # samples per spectrum update; the rest bypass the display
+
+
+def check_sample_rate(radio_type, samp_rate):
+    """Raise ValueError if ``radio_type`` cannot stream at ``samp_rate``"""
+    low, high = RADIO_RATE_LIMITS.get(radio_type, (0, float('inf')))
+    if not low <= samp_rate <= high:
+        raise ValueError(f"Recording sample rate {samp_rate / 1e6:g} Msps is outside the "
+                         f"{radio_type} range ({low / 1e6:g}-{high / 1e6:g} Msps)")
+
+
+class ConfigDialog(Qt.QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("IQ Replay Configuration")
+        self.layout = Qt.QVBoxLayout(self)
+        self.config_dir = "config"
+        self.config_file = os.path.join(self.config_dir, "iqReplayXmitter_config.json")
+
+        # Read settings from window_settings.json
+        settings = read_settings()
+        self.ipList = settings['ip_addresses']
+        self.radio_type = settings.get('radio_type', 'hackrf')
+        self.N = len(self.ipList)
+        self.search_dirs = [settings.get('media_directory', ''),
+                            (settings.get('iq_recorder') or {}).get('directory', 'recordings')]
+
+        # Add OK/Cancel buttons
+        self.button_box = Qt.QDialogButtonBox(
+            Qt.QDialogButtonBox.Ok | Qt.QDialogButtonBox.Cancel)
+        self.button_box.accepted.connect(self.accept)
+        self.button_box.rejected.connect(self.reject)
+
+        # Create all the input widgets
+        self.create_usrp_selector()
+        self.create_recording_selector()
+        self.create_frequency_control()
+        self.create_power_control()
+        self.create_playback_controls()
+
+        self.layout.addWidget(self.button_box)
+
+        # Load saved configuration
+        self.load_config()
+        self.update_recording_info()
+
+        # Apply dark theme
+        apply_dark_theme(self)
+
+    def create_usrp_selector(self):
+        if self.radio_type == 'hackrf':
+            self.layout.addWidget(Qt.QLabel("Radio: HackRF One (USB)"))
+            return
+        self.usrp_combo = Qt.QComboBox()
+        if not self.ipList:
+            self.usrp_combo.addItem("IP addr missing - Go to Settings")
+        else:
+            for i in range(self.N):
+                self.usrp_combo.addItem(f"USRP {i+1} ({self.ipList[i].strip()})")
+        self.layout.addWidget(Qt.QLabel("Select USRP:"))
+        self.layout.addWidget(self.usrp_combo)
+
+    def create_recording_selector(self):
+        self.recording_combo = Qt.QComboBox()
+        self.recordings = []
+        for directory in self.search_dirs:
+            if not directory or not os.path.isdir(directory):
+                continue
+            for file in sorted(os.listdir(directory)):
+                if file.endswith('.sigmf-meta'):
+                    self.recordings.append((file[:-len('.sigmf-meta')], os.path.join(directory, file)))
+        if self.recordings:
+            for display_name, path in self.recordings:
+                self.recording_combo.addItem(display_name, path)
+        else:
+            self.recording_combo.addItem("No SigMF recordings in media or recordings directory")
+            self.recording_combo.setEnabled(False)
+        self.recording_combo.currentIndexChanged.connect(self.update_recording_info)
+        self.recording_info = Qt.QLabel()
+        self.layout.addWidget(Qt.QLabel("Recording:"))
+        self.layout.addWidget(self.recording_combo)
+        self.layout.addWidget(self.recording_info)
+
+    def create_frequency_control(self):
+        self.file_freq_check = Qt.QCheckBox("Use recorded center frequency")
+        self.cf_layout = Qt.QHBoxLayout()
+        self.cf_slider = Qt.QSlider(QtCore.Qt.Horizontal)
+        self.cf_slider.setMinimum(50)
+        self.cf_slider.setMaximum(2200)
+        self.cf_slider.setValue(300)
+        self.cf_label = Qt.QLabel("Center Frequency: 300 MHz")
+        self.cf_slider.valueChanged.connect(
+            lambda v: self.cf_label.setText(f"Center Frequency: {v} MHz"))
+        self.file_freq_check.toggled.connect(lambda checked: self.cf_slider.setEnabled(not checked))
+        self.cf_layout.addWidget(self.cf_label)
+        self.cf_layout.addWidget(self.cf_slider)
+        self.layout.addWidget(self.file_freq_check)
+        self.layout.addLayout(self.cf_layout)
+
+    def create_power_control(self):
+        self.power_layout = Qt.QHBoxLayout()
+        self.power_slider = Qt.QSlider(QtCore.Qt.Horizontal)
+        self.power_slider.setMinimum(0)
+        self.power_slider.setMaximum(20)
+        self.power_slider.setValue(0)
+        self.power_label = Qt.QLabel("Output Power: 0 dBm")
+        self.power_slider.valueChanged.connect(
+            lambda v: self.power_label.setText(f"Output Power: {v} dBm"))
+        self.power_layout.addWidget(self.power_label)
+        self.power_layout.addWidget(self.power_slider)
+        self.layout.addLayout(self.power_layout)
+
+    def create_playback_controls(self):
+        self.playback_layout = Qt.QHBoxLayout()
+        self.loop_check = Qt.QCheckBox("Loop")
+        self.loop_check.setChecked(True)
+        self.start_spin = Qt.QDoubleSpinBox()
+        self.start_spin.setRange(0, 1e6)
+        self.start_spin.setDecimals(3)
+        self.start_spin.setSuffix(" s")
+        self.playback_layout.addWidget(self.loop_check)
+        self.playback_layout.addWidget(Qt.QLabel("Start at:"))
+        self.playback_layout.addWidget(self.start_spin)
+        self.layout.addLayout(self.playback_layout)
+
+    def update_recording_info(self):
+        # Show the recording's format and disable OK if the radio cannot play it
+        ok_button = self.button_box.button(Qt.QDialogButtonBox.Ok)
+        problem = None
+        path = self.recording_combo.currentData()
+        if self.radio_type != 'hackrf' and not self.ipList:
+            problem = "IP addr missing - Go to Settings"
+        elif not path:
+            problem = "Error - Setup Media directory in Settings"
+        else:
+            try:
+                with open(path) as f:
+                    meta = json.load(f)
+                rate = float(meta['global']['core:sample_rate'])
+                datatype = meta['global'].get('core:datatype', '')
+                data_file = path[:-len('.sigmf-meta')] + '.sigmf-data'
+                size = os.path.getsize(data_file)
+                if datatype not in DATATYPES:
+                    raise ValueError(f"Unsupported datatype '{datatype}'")
+                itemsize = item_size(datatype)
+                self.recording_info.setText(
+                    f"{rate / 1e6:g} Msps, {datatype}, {size / itemsize / rate:.2f} s")
+                self.start_spin.setMaximum(size / itemsize / rate)
+                frequency = (meta.get('captures') or [{}])[0].get('core:frequency')
+                self.file_freq_check.setEnabled(frequency is not None)
+                if frequency is None:
+                    self.file_freq_check.setChecked(False)
+                check_sample_rate(self.radio_type, rate)
+            except Exception as e:
+                problem = str(e)
+        if problem:
+            self.recording_info.setText(problem)
+        ok_button.setEnabled(problem is None)
+        if problem:
+            opacity_effect = Qt.QGraphicsOpacityEffect()
+            opacity_effect.setOpacity(0.30)
+            ok_button.setGraphicsEffect(opacity_effect)
+        else:
+            ok_button.setGraphicsEffect(None)
+
+    def load_config(self):
+        if os.path.exists(self.config_file):
+            try:
+                with open(self.config_file, 'r') as f:
+                    config = json.load(f)
+
+                if hasattr(self, 'usrp_combo'): self.usrp_combo.setCurrentIndex(config.get('usrp_index', 0))
+                self.cf_slider.setValue(config.get('center_freq', 300))
+                self.power_slider.setValue(config.get('power', 0))
+                self.file_freq_check.setChecked(config.get('use_file_freq', False))
+                self.loop_check.setChecked(config.get('loop', True))
+                self.start_spin.setValue(config.get('start_offset', 0.0))
+
+                saved_recording = config.get('recording')
+                for i, (display_name, _) in enumerate(self.recordings):
+                    if display_name == saved_recording:
+                        self.recording_combo.setCurrentIndex(i)
+                        break
+            except:
+                pass
+        else:
+            os.makedirs(self.config_dir, exist_ok=True)
+
+    def save_config(self):
+        index = self.recording_combo.currentIndex()
+        config = {
+            'usrp_index': self.usrp_combo.currentIndex() if hasattr(self, 'usrp_combo') else 0,
+            'center_freq': self.cf_slider.value(),
+            'power': self.power_slider.value(),
+            'recording': self.recordings[index][0] if 0 <= index < len(self.recordings) else None,
+            'use_file_freq': self.file_freq_check.isChecked(),
+            'loop': self.loop_check.isChecked(),
+            'start_offset': self.start_spin.value(),
+        }
+
+        with open(self.config_file, 'w') as f:
+            json.dump(config, f, indent=4)
+
+    def accept(self):
+        self.save_config()
+        super().accept()
+
+    def get_values(self):
+        if hasattr(self, 'usrp_combo') and self.ipList:
+            ipNum = self.usrp_combo.currentIndex() + 1
+            ipXmitAddr = self.ipList[self.usrp_combo.currentIndex()].strip()
+        else:
+            ipNum = 0
+            ipXmitAddr = ''
+
+        values = {
+            'radio_type': self.radio_type,
+            'ipNum': ipNum,
+            'ipXmitAddr': ipXmitAddr,
+            'centerFreq': self.cf_slider.value(),
+            'useFileFreq': self.file_freq_check.isChecked(),
+            'power': self.power_slider.value(),
+            'recordingFile': self.recording_combo.currentData(),
+            'loop': self.loop_check.isChecked(),
+            'startOffset': self.start_spin.value(),
+        }
+        return values
+
+
+class iqReplayXmitter(gr.top_block, Qt.QWidget):
+
+    def __init__(self, config_values=None):
+        gr.top_block.__init__(self, "IQ Replay Xmitter", catch_exceptions=True)
+        Qt.QWidget.__init__(self)
+        self.setWindowTitle("IQ Replay Xmitter")
+        qtgui.util.check_set_qss()
+        try:
+            self.setWindowIcon(Qt.QIcon.fromTheme('gnuradio-grc'))
+        except:
+            pass
+        self.top_scroll_layout = Qt.QVBoxLayout()
+        self.setLayout(self.top_scroll_layout)
+        self.top_scroll = Qt.QScrollArea()
+        self.top_scroll.setFrameStyle(Qt.QFrame.NoFrame)
+        self.top_scroll_layout.addWidget(self.top_scroll)
+        self.top_scroll.setWidgetResizable(True)
+        self.top_widget = Qt.QWidget()
+        self.top_scroll.setWidget(self.top_widget)
+        self.top_layout = Qt.QVBoxLayout(self.top_widget)
+        self.top_grid_layout = Qt.QGridLayout()
+        self.top_layout.addLayout(self.top_grid_layout)
+
+        self.settings = Qt.QSettings("GNU Radio", "iqReplayXmitter")
+
+        try:
+            geometry = self.settings.value("geometry")
+            if geometry:
+                self.restoreGeometry(geometry)
+        except BaseException as exc:
+            print(f"Qt GUI: Could not restore geometry: {str(exc)}", file=sys.stderr)
+
+        ##################################################
+        # Variables
+        ##################################################
+        if config_values is None:
+            config_dialog = ConfigDialog()
+            if not config_dialog.exec_():
+                sys.exit(0)
+            values = config_dialog.get_values()
+        else:
+            values = config_values
+
+        # Assign values from dialog
+        radio_type = values.get('radio_type', 'hackrf')
+        self.radio_type = radio_type
+        self.capture = capture = SigmfCapture(values['recordingFile'])
+        self.samp_rate = samp_rate = capture.sample_rate
+        check_sample_rate(radio_type, samp_rate)
+        if values.get('useFileFreq') and capture.frequency is not None:
+            self.centerFreq = capture.frequency / 1e6
+        else:
+            self.centerFreq = values['centerFreq']
+        self.power = pwr = values['power']
+        self.loop = values.get('loop', True)
+        ipXmitAddr = values['ipXmitAddr']
+
+        ##################################################
+        # Blocks
+        ##################################################
+        # The sink takes the recording's own sample format, so samples are never converted
+        if radio_type == 'usrp':
+            self.radio_sink = uhd.usrp_sink(
+                ",".join((f'addr={ipXmitAddr}', '')),
+                uhd.stream_args(cpu_format=capture.cpu_format, args='', channels=list(range(0,1))),
+                "",
+            )
+            self.radio_sink.set_samp_rate(samp_rate)
+            self.radio_sink.set_time_now(uhd.time_spec(time.time()), uhd.ALL_MBOARDS)
+            self.radio_sink.set_center_freq(self.centerFreq * 1e6, 0)
+            self.radio_sink.set_antenna("TX/RX", 0)
+            self.radio_sink.set_gain(pwr, 0)
+            actual_rate = self.radio_sink.get_samp_rate()
+        else:
+            self.radio_sink = soapy.sink('driver=hackrf', capture.cpu_format, 1, '', '', [''], [''])
+            self.radio_sink.set_sample_rate(0, samp_rate)
+            self.radio_sink.set_frequency(0, self.centerFreq * 1e6)
+            self.radio_sink.set_gain(0, 'VGA', pwr)
+            self.radio_sink.set_gain(0, 'AMP', 0)
+            actual_rate = self.radio_sink.get_sample_rate(0)
+        if abs(actual_rate - samp_rate) > RATE_TOLERANCE * samp_rate:
+            raise ValueError(f"Radio runs at {actual_rate / 1e6:.6f} Msps but the recording "
+                             f"is {samp_rate / 1e6:.6f} Msps; replay would be off-frequency and off-speed")
+
+        self.sigmf_source = SigmfSource(capture, self.loop, int(values.get('startOffset', 0) * samp_rate))
+
+        # The spectrum display sees one FFT frame per update, not the full-rate stream
+        self.blocks_keep_m_in_n_0 = blocks.keep_m_in_n(
+            capture.itemsize, DISPLAY_FFT, max(DISPLAY_FFT, int(samp_rate * 0.10)), 0)
+        if capture.cpu_format == 'sc16':
+            self.blocks_interleaved_short_to_complex_0 = blocks.interleaved_short_to_complex(True, False, 1 / 32768)
+        self.qtgui_freq_sink_x_0 = qtgui.freq_sink_c(
+            DISPLAY_FFT, #size
+            window.WIN_BLACKMAN_hARRIS, #wintype
+            self.centerFreq * 1e6, #fc
+            samp_rate, #bw
+            os.path.basename(capture.base), #name
+            1,
+            None # parent
+        )
+        self.qtgui_freq_sink_x_0.set_update_time(0.10)
+        self.qtgui_freq_sink_x_0.set_y_axis(-140, 10)
+        self.qtgui_freq_sink_x_0.set_y_label('Relative Gain', 'dB')
+        self.qtgui_freq_sink_x_0.set_trigger_mode(qtgui.TRIG_MODE_FREE, 0.0, 0, "")
+        self.qtgui_freq_sink_x_0.enable_autoscale(False)
+        self.qtgui_freq_sink_x_0.enable_grid(True)
+        self.qtgui_freq_sink_x_0.set_fft_average(1.0)
+        self.qtgui_freq_sink_x_0.enable_axis_labels(True)
+        self.qtgui_freq_sink_x_0.enable_control_panel(False)
+        self.qtgui_freq_sink_x_0.set_fft_window_normalized(False)
+        self.qtgui_freq_sink_x_0.disable_legend()
+        self.qtgui_freq_sink_x_0.set_line_label(0, "Data 0")
+        self.qtgui_freq_sink_x_0.set_line_width(0, 1)
+        self.qtgui_freq_sink_x_0.set_line_color(0, "black")
+        self.qtgui_freq_sink_x_0.set_line_alpha(0, 1.0)
+
+        # Use qwidget() for Qt compatibility
+        self._qtgui_freq_sink_x_0_win = sip.wrapinstance(self.qtgui_freq_sink_x_0.qwidget(), Qt.QWidget)
+        self.top_layout.addWidget(self._qtgui_freq_sink_x_0_win)
+
+        ##################################################
+        # Connections
+        ##################################################
+        self.connect((self.sigmf_source, 0), (self.radio_sink, 0))
+        self.connect((self.sigmf_source, 0), (self.blocks_keep_m_in_n_0, 0))
+        if capture.cpu_format == 'sc16':
+            self.connect((self.blocks_keep_m_in_n_0, 0), (self.blocks_interleaved_short_to_complex_0, 0))
+            self.connect((self.blocks_interleaved_short_to_complex_0, 0), (self.qtgui_freq_sink_x_0, 0))
+            self.radio_feed = None  # the IQ recorder takes complex float only
+        else:
+            self.connect((self.blocks_keep_m_in_n_0, 0), (self.qtgui_freq_sink_x_0, 0))
+            self.radio_feed = (self.sigmf_source, 0)
+
+
+    def closeEvent(self, event):
+        self.settings = Qt.QSettings("GNU Radio", "iqReplayXmitter")
+        self.settings.setValue("geometry", self.saveGeometry())
+        self.stop()
+        self.wait()
+        self.capture.close()
+
+        event.accept()
+
+    def get_samp_rate(self):
+        return self.samp_rate
+
+    def get_centerFreq(self):
+        return self.centerFreq
+
+    def set_centerFreq(self, centerFreq):
+        self.centerFreq = centerFreq
+        self.qtgui_freq_sink_x_0.set_frequency_range(self.centerFreq * 1e6, self.samp_rate)
+        if self.radio_type == 'usrp':
+            self.radio_sink.set_center_freq(self.centerFreq * 1e6, 0)
+        else:
+            self.radio_sink.set_frequency(0, self.centerFreq * 1e6)
+
+    def get_power(self):
+        return self.power
+
+    def set_power(self, power):
+        self.power = power
+        if self.radio_type == 'usrp':
+            self.radio_sink.set_gain(self.power, 0)
+        else:
+            self.radio_sink.set_gain(0, 'VGA', self.power)
+
+    def get_loop(self):
+        return self.loop
+
+    def set_loop(self, loop):
+        self.loop = bool(loop)
+        self.sigmf_source.loop = self.loop
+
+    def get_position(self):
+        return self.sigmf_source.position() / self.samp_rate
+
+    def set_position(self, position):
+        # Seek, in seconds from the start of the recording
+        self.sigmf_source.seek(int(float(position) * self.samp_rate))
+
+
+
+
+def main(top_block_cls=iqReplayXmitter, options=None, app=None, config_values=None):
+
+    if app is None:
+        if StrictVersion("4.5.0") <= StrictVersion(Qt.qVersion()) < StrictVersion("5.0.0"):
+            style = gr.prefs().get_string('qtgui', 'style', 'raster')
+            Qt.QApplication.setGraphicsSystem(style)
+        app = Qt.QApplication(sys.argv)
+
+    tb = recording_connections(top_block_cls)(config_values)
+    tb.graph_report = maybe_optimize_graph(tb, 'iqReplayXmitter')
+    tb.iq_recorder = maybe_attach_iq_recorder(tb, 'iqReplayXmitter')
+    tb.start()
+    tb.control_server = maybe_start_control_server(tb, 'iqReplayXmitter')
+    tb.show()
+
+    def sig_handler(*_):
+        tb.stop()
+        tb.wait()
+        Qt.QApplication.quit()
+
+    signal.signal(signal.SIGINT, sig_handler)
+    signal.signal(signal.SIGTERM, sig_handler)
+
+    timer = Qt.QTimer()
+    timer.start(500)
+    timer.timeout.connect(lambda: None)
+
+    if app.instance():
+        return tb
+    else:
+        return app.exec_()
+
+if __name__ == '__main__':
+    main()
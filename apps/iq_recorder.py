@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Record exactly what an app sends to the radio as SigMF.
+
+``IqRecorder`` is a sink connected in parallel with ``radio_sink`` (to the
+app's ``radio_feed``). Its work() only copies samples into a bounded
+in-memory ring; a background thread writes them to ``.sigmf-data``. If the
+disk falls behind, the ring fills and new samples are dropped and counted
+(and annotated in the ``.sigmf-meta``), so the transmit path is never held
+up. While armed but not recording, the ring keeps the last ``pretrigger``
+seconds, so a trigger also captures what was sent just before it.
+
+Enable it with an ``iq_recorder`` entry in the global settings::
+
+    "iq_recorder": {"enabled": true, "directory": "recordings", "mode": "armed",
+                    "pretrigger": 5, "post_trigger": 0, "buffer": 2}
+
+``mode`` is ``armed`` (wait for a trigger) or ``continuous`` (record from
+start). Trigger and stop through the ``recording`` parameter over the
+control server; ``post_trigger`` > 0 stops automatically after that many
+seconds.
+"""
+
+import datetime
+import os
+import threading
+
+import numpy as np # type: ignore
+from gnuradio import gr # type: ignore
+
+from apps.control_server import discover_parameters
+from apps.settings_store import atomic_write_json
+
+SIGMF_VERSION = "1.0.0"
+WRITE_CHUNK = 1 << 18  # samples per file write
+
+
+def radio_settings(tb):
+    """(sample rate, center frequency in Hz) the radio sink is running at"""
+    sink = tb.radio_sink
+    try:
+        if getattr(tb, 'radio_type', 'hackrf') == 'usrp':
+            return sink.get_samp_rate(), sink.get_center_freq(0)
+        return sink.get_sample_rate(0), sink.get_frequency(0)
+    except Exception:
+        return float(tb.samp_rate), float(getattr(tb, 'cf', 0)) * 1e6
+
+
+def app_parameters(tb):
+    """JSON-friendly values of the app's get_/set_ parameters"""
+    values = {}
+    for name in discover_parameters(tb):
+        if name == 'recording':
+            continue
+        try:
+            value = getattr(tb, 'get_' + name)()
+        except Exception:
+            continue
+        if isinstance(value, complex):
+            value = [value.real, value.imag]
+        elif hasattr(value, 'item'):
+            value = value.item()
+        if value is None or isinstance(value, (bool, int, float, str, list, dict)):
+            values[name] = value
+    return values
+
+
+class IqRecorder(gr.sync_block):
+    """Bounded-ring IQ sink that writes SigMF captures on a background thread.
+
+    ``metadata()`` is called at each trigger and returns a dict of extra
+    global fields (center frequency, hardware, app parameters).
+    """
+    def __init__(self, samp_rate, directory="recordings", name="capture", pretrigger=5.0,
+                 post_trigger=0.0, buffer=2.0, metadata=None, continuous=False):
+        gr.sync_block.__init__(self, name="iq_recorder", in_sig=[np.complex64], out_sig=None)
+        self.samp_rate = float(samp_rate)
+        self.directory = directory
+        self.name = name
+        self.pretrigger = int(pretrigger * self.samp_rate)
+        self.post_trigger = int(post_trigger * self.samp_rate)
+        self.metadata = metadata or (lambda: {})
+        self.continuous = continuous
+        self.capacity = self.pretrigger + max(int(buffer * self.samp_rate), WRITE_CHUNK)
+        self.ring = np.zeros(self.capacity, dtype=np.complex64)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._head = 0           # samples stored in the ring so far
+        self._tail = None        # next sample to write; None while not recording
+        self._start = 0          # ring index of the capture's first sample
+        self._stop_at = None     # ring index at which the capture ends
+        self._drops = []         # [file sample index, count] gaps in the capture
+        self._dropped = 0
+        self._total_dropped = 0
+        self._file = None
+        self._path = None
+        self._meta = None
+        self._running = False
+        self._thread = None
+
+    # ----- scheduler hooks -----
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._writer, name="iq-recorder", daemon=True)
+        self._thread.start()
+        if self.continuous:
+            self.trigger()
+        return True
+
+    def stop(self):
+        self.stop_recording()
+        self._running = False
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=10)
+        self._finish()
+        return True
+
+    def work(self, input_items, output_items):
+        samples = input_items[0]
+        with self._lock:
+            if self._tail is not None:
+                # Never overwrite unsaved samples: drop the newest and note the gap
+                keep = min(len(samples), self.capacity - (self._head - self._tail))
+                if keep < len(samples):
+                    self._note_drop(self._head + keep - self._start, len(samples) - keep)
+                samples = samples[:keep]
+            elif len(samples) > self.capacity:
+                samples = samples[-self.capacity:]
+            start = self._head % self.capacity
+            first = min(len(samples), self.capacity - start)
+            self.ring[start:start + first] = samples[:first]
+            self.ring[:len(samples) - first] = samples[first:]
+            self._head += len(samples)
+        self._wake.set()
+        return len(input_items[0])
+
+    def _note_drop(self, file_index, count):
+        self._dropped += count
+        self._total_dropped += count
+        if self._drops and self._drops[-1][0] == file_index:
+            self._drops[-1][1] += count
+        else:
+            self._drops.append([file_index, count])
+
+    # ----- capture control -----
+
+    def trigger(self):
+        """Start a capture, including up to ``pretrigger`` seconds already sent"""
+        with self._lock:
+            if self._tail is not None:
+                return self._path
+            tail = max(self._head - self.pretrigger, self._head - self.capacity, 0)
+            pre = self._head - tail
+            os.makedirs(self.directory, exist_ok=True)
+            stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+            self._path = os.path.join(self.directory, f"{self.name}-{stamp}")
+            self._file = open(self._path + ".sigmf-data", 'wb')
+            self._start = self._tail = tail
+            self._stop_at = self._head + self.post_trigger if self.post_trigger else None
+            self._drops = []
+            self._dropped = 0
+            first_sample = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=pre / self.samp_rate)
+        self._meta = self._build_meta(first_sample, pre)
+        self._write_meta()
+        self._wake.set()
+        print(f"{self.name}: recording to {self._path}.sigmf-data ({pre / self.samp_rate:.1f} s pre-trigger)")
+        return self._path
+
+    def stop_recording(self):
+        with self._lock:
+            if self._tail is not None and self._stop_at is None:
+                self._stop_at = self._head
+        self._wake.set()
+
+    def is_recording(self):
+        with self._lock:
+            return self._tail is not None
+
+    def status(self):
+        with self._lock:
+            recording = self._tail is not None
+            return {
+                'recording': recording,
+                'path': self._path + ".sigmf-data" if self._path else None,
+                'written_samples': self._tail - self._start if recording else 0,
+                'buffered_samples': self._head - self._tail if recording else 0,
+                'dropped_samples': self._dropped,
+                'total_dropped_samples': self._total_dropped,
+            }
+
+    # ----- background writer -----
+
+    def _writer(self):
+        while True:
+            with self._lock:
+                tail, file, stop_at = self._tail, self._file, self._stop_at
+                end = self._head if stop_at is None else min(self._head, stop_at)
+            if tail is None or tail >= end:
+                if tail is not None and stop_at is not None and tail >= stop_at:
+                    self._finish()
+                    continue
+                if not self._running:
+                    return
+                self._wake.wait(0.1)
+                self._wake.clear()
+                continue
+
+            count = min(end - tail, WRITE_CHUNK)
+            start = tail % self.capacity
+            count = min(count, self.capacity - start)
+            try:
+                # The producer never overwrites [tail, head), so no copy is needed
+                file.write(memoryview(self.ring[start:start + count]))
+            except (OSError, ValueError) as e:
+                print(f"Error writing IQ recording: {e}")
+                self._finish()
+                continue
+            with self._lock:
+                self._tail = tail + count
+
+    def _finish(self):
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.close()
+            self._file = None
+            written = self._tail - self._start
+            self._tail = None
+            self._stop_at = None
+            drops = [list(d) for d in self._drops]
+            dropped = self._dropped
+        if self._meta is not None:
+            self._meta['global']['launcher:dropped_samples'] = dropped
+            self._meta['annotations'] = [
+                {'core:sample_start': index, 'core:sample_count': 0,
+                 'core:comment': f"{count} samples dropped (recorder could not keep up)"}
+                for index, count in drops]
+            self._write_meta()
+        print(f"{self.name}: saved {written} samples to {self._path}.sigmf-data ({dropped} dropped)")
+
+    # ----- SigMF metadata -----
+
+    def _build_meta(self, first_sample, pre):
+        extra = {}
+        try:
+            extra = self.metadata() or {}
+        except Exception as e:
+            print(f"Error collecting recording metadata: {e}")
+        frequency = extra.pop('frequency', None)
+        capture = {'core:sample_start': 0,
+                   'core:datetime': first_sample.strftime("%Y-%m-%dT%H:%M:%S.%fZ")}
+        if frequency is not None:
+            capture['core:frequency'] = frequency
+        meta = {
+            'global': {
+                'core:datatype': 'cf32_le',
+                'core:sample_rate': self.samp_rate,
+                'core:version': SIGMF_VERSION,
+                'core:recorder': 'gnuradio_launcher iq_recorder',
+                'core:description': f"{self.name} transmit baseband",
+                'core:extensions': [{'name': 'launcher', 'version': '1.0.0', 'optional': True}],
+                'launcher:app': self.name,
+                'launcher:pretrigger_samples': pre,
+                'launcher:dropped_samples': 0,
+            },
+            'captures': [capture],
+            'annotations': [],
+        }
+        if extra.get('hardware'):
+            meta['global']['core:hw'] = extra.pop('hardware')
+        for key, value in extra.items():
+            meta['global'][f"launcher:{key}"] = value
+        return meta
+
+    def _write_meta(self):
+        try:
+            atomic_write_json(self._path + ".sigmf-meta", self._meta)
+        except Exception as e:
+            print(f"Error writing SigMF metadata: {e}")
+
+
+def maybe_attach_iq_recorder(tb, name):
+    """Tap ``tb.radio_feed`` with an IqRecorder if enabled in the global settings.
+
+    Must be called before ``tb.start()``. Adds a ``recording`` get_/set_ pair
+    to ``tb`` so captures can be triggered over the control server.
+    """
+    from apps.utils import read_settings
+    config = read_settings().get('iq_recorder') or {}
+    if not config.get('enabled') or getattr(tb, 'radio_feed', None) is None:
+        return None
+    samp_rate, _ = radio_settings(tb)
+
+    def metadata():
+        _, frequency = radio_settings(tb)
+        hardware = getattr(tb, 'radio_type', 'hackrf')
+        address = getattr(tb, 'outputIpAddr', None) or getattr(tb, 'ipXmitAddr', None)
+        return {'frequency': frequency,
+                'hardware': f"{hardware} {address}" if hardware == 'usrp' and address else hardware,
+                'parameters': app_parameters(tb)}
+
+    try:
+        recorder = IqRecorder(samp_rate, config.get('directory', 'recordings'), name,
+                              config.get('pretrigger', 5), config.get('post_trigger', 0),
+                              config.get('buffer', 2), metadata,
+                              continuous=config.get('mode', 'armed') == 'continuous')
+        tb.connect(tb.radio_feed, (recorder, 0))
+    except Exception as e:
+        print(f"Error attaching IQ recorder: {e}")
+        return None
+
+    tb.get_recording = recorder.status
+    tb.set_recording = lambda value: recorder.trigger() if value else recorder.stop_recording()
+    return recorder
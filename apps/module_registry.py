@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import importlib.util
+import os
+import threading
+
+from apps.utils import LazyModule
+
+# gnuradio driver modules; only the one matching the configured radio is preloaded
+DRIVER_MODULES = {'hackrf': 'gnuradio.soapy', 'usrp': 'gnuradio.uhd'}
+
+
+class AppModuleRegistry:
+    """Imports each app module once and hands out the cached module afterwards.
+
+    A module is re-imported only when the mtime of its source file changes,
+    so edits to an app are still picked up without restarting the launcher.
+    ``preload`` warms the cache (and the app's deferred gnuradio imports) on a
+    background thread so that opening a ConfigDialog is near-instant.
+    Each module is imported under its own lock, so a click on one app never
+    waits for the preload of another.
+    """
+    def __init__(self, apps_dir='apps'):
+        self.apps_dir = apps_dir
+        self._modules = {}  # module_name -> (mtime, module)
+        self._module_locks = {}  # module_name -> Lock held while it is imported
+        self._lock = threading.Lock()
+        self._preload_thread = None
+        self._queued = None  # (module_names, radio_type) requested while a preload was running
+
+    def module_path(self, module_name):
+        return os.path.join(self.apps_dir, f"{module_name}.py")
+
+    def get(self, module_name):
+        """Return the app module, importing it if it is new or its file changed"""
+        path = self.module_path(module_name)
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            module_lock = self._module_locks.setdefault(module_name, threading.Lock())
+        with module_lock:
+            with self._lock:
+                cached = self._modules.get(module_name)
+            if cached and cached[0] == mtime:
+                return cached[1]
+            spec = importlib.util.spec_from_file_location(module_name, path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            with self._lock:
+                self._modules[module_name] = (mtime, module)
+            return module
+
+    def is_loaded(self, module_name):
+        with self._lock:
+            return module_name in self._modules
+
+    def preload(self, module_names, radio_type=None):
+        """Import ``module_names`` and their gnuradio dependencies in the background.
+
+        A request made while a preload is running is queued (the latest one
+        wins) and runs when it finishes, so a radio-type switch is not lost.
+        """
+        with self._lock:
+            if self._preload_thread and self._preload_thread.is_alive():
+                self._queued = (list(module_names), radio_type)
+                return
+            self._preload_thread = threading.Thread(
+                target=self._preload, args=(list(module_names), radio_type),
+                name="app-preload", daemon=True)
+            self._preload_thread.start()
+
+    def _preload(self, module_names, radio_type):
+        while True:
+            self._preload_once(module_names, radio_type)
+            with self._lock:
+                if self._queued is None:
+                    self._preload_thread = None
+                    return
+                (module_names, radio_type), self._queued = self._queued, None
+
+    def _preload_once(self, module_names, radio_type):
+        skip = {name for kind, name in DRIVER_MODULES.items() if kind != radio_type}
+        for module_name in module_names:
+            try:
+                module = self.get(module_name)
+                for value in list(vars(module).values()):
+                    if isinstance(value, LazyModule) and value._module_name not in skip:
+                        value._load()
+            except Exception as e:
+                print(f"Error preloading {module_name}: {e}")
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Live network audio input for the AM/FM audio apps.
+
+``NetworkAudioSource`` receives 16-bit PCM over UDP on the app's port
+(``mikePort``), either as RTP (RFC 3551 L16, big-endian) or as raw
+little-endian datagrams, and plays it out through a ``JitterBuffer``:
+
+  * packets are reordered by sequence number; late ones are dropped and
+    missing ones concealed with silence
+  * the playout delay adapts to the measured interarrival jitter
+    (RFC 3550), between ``min_delay`` and ``max_delay`` seconds
+  * a slow control loop resamples by up to +/- 2000 ppm to hold the buffer
+    at its target, absorbing drift between the sender and radio clocks
+  * latency is measured from the sender's timestamp (an RTP header
+    extension written by the sender below) or, without one, from packet
+    arrival, to the moment the audio enters the flowgraph
+
+Config (``networkAudio`` in the app's values, all optional)::
+
+    {"format": "rtp", "sender_rate": 48000, "channels": 1,
+     "min_delay": 0.02, "max_delay": 0.25, "report": 10}
+
+Local test sender::
+
+    python -m apps.network_audio send --port 2020 --tone 1000 --jitter-ms 5 --drift-ppm 100
+    python -m apps.network_audio send --port 2020 --wav speech.wav --loss 0.01
+"""
+
+import argparse
+import collections
+import heapq
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+import wave
+
+import numpy as np # type: ignore
+from gnuradio import gr # type: ignore
+
+DEFAULT_RATE = 48000
+RTP_HEADER = struct.Struct('!BBHII')
+SEND_TIME_PROFILE = 0x5344  # header extension carrying the sender's time.time()
+MAX_DRIFT = 0.002           # largest resampling correction (2000 ppm)
+DRIFT_GAIN = 0.05           # correction per second of buffer error
+LEVEL_SMOOTHING = 0.01      # EWMA weight of each read in the buffer-level estimate
+POLL_TIMEOUT = 0.2
+
+
+# ----- RTP -----
+
+def build_rtp(seq, timestamp, ssrc, payload, sent_time=None, payload_type=96):
+    header = RTP_HEADER.pack(0x80 | (0x10 if sent_time is not None else 0), payload_type & 0x7f,
+                             seq & 0xffff, timestamp & 0xffffffff, ssrc)
+    if sent_time is not None:
+        header += struct.pack('!HHd', SEND_TIME_PROFILE, 2, sent_time)
+    return header + payload
+
+
+def parse_rtp(packet):
+    """Return (seq, timestamp, sent_time or None, payload) for an RTP packet"""
+    if len(packet) < RTP_HEADER.size:
+        raise ValueError("short RTP packet")
+    flags, _, seq, timestamp, _ = RTP_HEADER.unpack_from(packet)
+    if flags >> 6 != 2:
+        raise ValueError("not RTP version 2")
+    offset = RTP_HEADER.size + 4 * (flags & 0x0f)
+    sent_time = None
+    if flags & 0x10:
+        profile, length = struct.unpack_from('!HH', packet, offset)
+        if profile == SEND_TIME_PROFILE and length >= 2:
+            sent_time = struct.unpack_from('!d', packet, offset + 4)[0]
+        offset += 4 + 4 * length
+    end = len(packet) - (packet[-1] if flags & 0x20 else 0)
+    return seq, timestamp, sent_time, packet[offset:end]
+
+
+# ----- jitter buffer -----
+
+class JitterBuffer:
+    """Reorders audio packets and plays them out at the radio's rate.
+
+    ``push`` is called from the receiving thread, ``read`` from the
+    flowgraph; both take the lock once per packet or per read.
+    """
+    def __init__(self, sender_rate=DEFAULT_RATE, out_rate=DEFAULT_RATE, min_delay=0.02,
+                 max_delay=0.25, jitter_factor=4.0):
+        self.sender_rate = float(sender_rate)
+        self.out_rate = float(out_rate)
+        self.min_delay = float(min_delay)
+        self.max_delay = float(max_delay)
+        self.jitter_factor = float(jitter_factor)
+        self._lock = threading.Lock()
+        self._pending = {}            # seq -> (samples, time reference)
+        self._pending_samples = 0
+        self._next_seq = None
+        self._fifo = np.zeros(0, dtype=np.float32)
+        self._markers = collections.deque()  # (input sample index, time reference)
+        self._consumed = 0            # input samples consumed so far
+        self._phase = 0.0
+        self._playing = False
+        self._packet_samples = 0
+        self._jitter = 0.0            # seconds, RFC 3550 estimator
+        self._last_transit = None
+        self._level = None
+        self._correction = 0.0
+        self._latency = None
+        self._latency_max = 0.0
+        self._latency_source = 'arrival'
+        self.counts = collections.Counter()
+
+    def target_delay(self):
+        packet = self._packet_samples / self.sender_rate
+        return min(self.max_delay, max(self.min_delay, self.jitter_factor * self._jitter + packet))
+
+    def push(self, seq, samples, arrival, sent_time=None, timestamp=None):
+        with self._lock:
+            self.counts['packets'] += 1
+            if self._next_seq is None:
+                self._next_seq = seq
+            if seq < self._next_seq or seq in self._pending:
+                self.counts['late'] += 1
+                return
+            if timestamp is not None:
+                transit = arrival - timestamp / self.sender_rate
+                if self._last_transit is not None:
+                    self._jitter += (abs(transit - self._last_transit) - self._jitter) / 16
+                self._last_transit = transit
+            if sent_time is not None:
+                self._latency_source = 'sender'
+            self._packet_samples = len(samples)
+            self._pending[seq] = (samples, sent_time if sent_time is not None else arrival)
+            self._pending_samples += len(samples)
+
+    def _buffered(self):
+        return len(self._fifo) + self._pending_samples
+
+    def _fill(self, needed):
+        """Move packets into the playout FIFO in sequence order"""
+        added = []
+        available = len(self._fifo)
+        target = self.target_delay() * self.sender_rate
+        while available < needed and self._pending:
+            packet = self._pending.pop(self._next_seq, None)
+            if packet is None:
+                # Wait for a missing packet only while the later ones still fit the target delay
+                if self._pending_samples < target and available:
+                    break
+                self.counts['lost'] += 1
+                samples = np.zeros(self._packet_samples, dtype=np.float32)
+                reference = None
+                if min(self._pending) - self._next_seq > 64:
+                    self._next_seq = min(self._pending)
+                    continue
+            else:
+                samples, reference = packet
+                self._pending_samples -= len(samples)
+            if reference is not None:
+                self._markers.append((self._consumed + available, reference))
+            added.append(samples)
+            available += len(samples)
+            self._next_seq += 1
+        if added:
+            self._fifo = np.concatenate([self._fifo] + added)
+
+    def read(self, count, now=None):
+        """Return ``count`` output samples, resampled to absorb clock drift"""
+        now = time.time() if now is None else now
+        out = np.zeros(count, dtype=np.float32)
+        with self._lock:
+            if not self._playing:
+                if self._buffered() < self.target_delay() * self.sender_rate or not self._packet_samples:
+                    self.counts['silent_reads'] += 1
+                    return out
+                self._playing = True
+
+            step = self.sender_rate / self.out_rate * (1.0 + self._correction)
+            positions = self._phase + step * np.arange(count)
+            self._fill(int(positions[-1]) + 2)
+
+            usable = int(np.searchsorted(positions, len(self._fifo) - 1, side='left'))
+            if usable:
+                index = positions[:usable].astype(np.int64)
+                frac = (positions[:usable] - index).astype(np.float32)
+                out[:usable] = self._fifo[index] * (1 - frac) + self._fifo[index + 1] * frac
+            if usable < count:
+                self.counts['underruns'] += 1
+                self._playing = False
+
+            advance = min(int(self._phase + step * usable), len(self._fifo))
+            self._phase = self._phase + step * usable - advance if usable == count else 0.0
+            self._fifo = self._fifo[advance:]
+            self._consumed += advance
+
+            while self._markers and self._markers[0][0] <= self._consumed:
+                index, reference = self._markers.popleft()
+                latency = now - reference
+                self._latency = latency if self._latency is None else 0.9 * self._latency + 0.1 * latency
+                self._latency_max = max(self._latency_max, latency)
+
+            self._track_drift()
+        return out
+
+    def _track_drift(self):
+        level = self._buffered() / self.sender_rate
+        self._level = level if self._level is None else self._level + LEVEL_SMOOTHING * (level - self._level)
+        error = self._level - self.target_delay()
+        self._correction = max(-MAX_DRIFT, min(MAX_DRIFT, DRIFT_GAIN * error))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'packets': self.counts['packets'],
+                'late': self.counts['late'],
+                'lost': self.counts['lost'],
+                'underruns': self.counts['underruns'],
+                'jitter_ms': self._jitter * 1e3,
+                'target_delay_ms': self.target_delay() * 1e3,
+                'buffered_ms': self._buffered() / self.sender_rate * 1e3,
+                'drift_ppm': self._correction * 1e6,
+                'latency_ms': self._latency * 1e3 if self._latency is not None else None,
+                'latency_ms_max': self._latency_max * 1e3,
+                'latency_from': self._latency_source,
+            }
+
+
+# ----- receiver -----
+
+class AudioReceiver:
+    """Receives RTP or raw PCM datagrams into a JitterBuffer on a daemon thread"""
+    def __init__(self, buffer, port, host='0.0.0.0', fmt='rtp', channels=1, report=0, name="network audio"):
+        self.buffer = buffer
+        self.fmt = fmt
+        self.channels = max(1, int(channels))
+        self.report = report
+        self.name = name
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, int(port)))
+        self.sock.settimeout(POLL_TIMEOUT)
+        self.address = self.sock.getsockname()
+        self._raw_seq = 0
+        self._raw_samples = 0
+        self._last_seq = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="network-audio", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def close(self):
+        self.stop()
+        self.sock.close()
+
+    def _unwrap(self, seq):
+        if self._last_seq is None:
+            self._last_seq = seq
+            return seq
+        delta = (seq - self._last_seq) & 0xffff
+        if delta >= 0x8000:
+            delta -= 0x10000
+        extended = self._last_seq + delta
+        self._last_seq = max(self._last_seq, extended)
+        return extended
+
+    def handle(self, packet, arrival):
+        if self.fmt == 'rtp':
+            seq, timestamp, sent_time, payload = parse_rtp(packet)
+            samples = np.frombuffer(payload[:len(payload) & ~1], dtype='>i2')
+            seq = self._unwrap(seq)
+        else:
+            samples = np.frombuffer(packet[:len(packet) & ~1], dtype='<i2')
+            seq, timestamp, sent_time = self._raw_seq, self._raw_samples, None
+            self._raw_seq += 1
+            self._raw_samples += len(samples) // self.channels
+        samples = samples.astype(np.float32) / 32768.0
+        if self.channels > 1:
+            samples = samples[:len(samples) - len(samples) % self.channels]
+            samples = samples.reshape(-1, self.channels).mean(axis=1)
+        self.buffer.push(seq, samples, arrival, sent_time, timestamp)
+
+    def _run(self):
+        next_report = time.time() + self.report if self.report else None
+        while not self._stop.is_set():
+            try:
+                packet = self.sock.recv(65536)
+                self.handle(packet, time.time())
+            except socket.timeout:
+                pass
+            except (OSError, ValueError) as e:
+                print(f"Error receiving network audio: {e}")
+            if next_report and time.time() >= next_report:
+                next_report += self.report
+                print(f"{self.name}: {format_stats(self.buffer.stats())}")
+
+
+def format_stats(stats):
+    latency = f"{stats['latency_ms']:.1f} ms" if stats['latency_ms'] is not None else "n/a"
+    return (f"latency {latency} (max {stats['latency_ms_max']:.1f}, from {stats['latency_from']}), "
+            f"buffer {stats['buffered_ms']:.1f}/{stats['target_delay_ms']:.1f} ms, "
+            f"jitter {stats['jitter_ms']:.2f} ms, drift {stats['drift_ppm']:+.0f} ppm, "
+            f"lost {stats['lost']}, late {stats['late']}, underruns {stats['underruns']}")
+
+
+# ----- flowgraph block -----
+
+class NetworkAudioSource(gr.sync_block):
+    """Float audio at ``out_rate`` from the network, in place of a WAV file source"""
+    def __init__(self, port, out_rate=DEFAULT_RATE, config=None, name="network audio"):
+        gr.sync_block.__init__(self, name="network_audio_source", in_sig=None, out_sig=[np.float32])
+        self.config = dict(config or {})
+        self.buffer = JitterBuffer(self.config.get('sender_rate', out_rate), out_rate,
+                                   self.config.get('min_delay', 0.02), self.config.get('max_delay', 0.25))
+        self.receiver = AudioReceiver(self.buffer, self.config.get('port', port),
+                                      self.config.get('host', '0.0.0.0'), self.config.get('format', 'rtp'),
+                                      self.config.get('channels', 1), self.config.get('report', 10), name)
+        # Small output chunks keep the flowgraph from pulling far ahead of real time
+        self.set_max_noutput_items(max(64, int(out_rate * 0.005)))
+
+    def start(self):
+        self.receiver.start()
+        return True
+
+    def stop(self):
+        self.receiver.stop()
+        return True
+
+    def close(self):
+        self.receiver.close()
+
+    def work(self, input_items, output_items):
+        out = output_items[0]
+        out[:] = self.buffer.read(len(out))
+        return len(out)
+
+    def stats(self):
+        return self.buffer.stats()
+
+
+# ----- local test sender -----
+
+def read_wav_mono(path):
+    with wave.open(path, 'rb') as f:
+        if f.getsampwidth() != 2:
+            raise ValueError("only 16-bit WAV files are supported")
+        data = np.frombuffer(f.readframes(f.getnframes()), dtype='<i2')
+        channels, rate = f.getnchannels(), f.getframerate()
+    if channels > 1:
+        data = data[:len(data) - len(data) % channels].reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return data, rate
+
+
+def send(host, port, samples, rate, packet_ms=10, jitter_ms=0.0, loss=0.0, drift_ppm=0.0,
+         seconds=None, raw=False):
+    """Stream ``samples`` (int16, looped) as RTP or raw PCM with simulated network impairments"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    per_packet = max(1, int(rate * packet_ms / 1000))
+    interval = per_packet / rate / (1 + drift_ppm * 1e-6)
+    ssrc = random.getrandbits(32)
+    start = time.time()
+    queue = []  # (send time, seq, packet)
+    seq = sent = 0
+    try:
+        while seconds is None or seq * interval < seconds:
+            nominal = start + seq * interval
+            offset = (seq * per_packet) % len(samples)
+            chunk = np.take(samples, np.arange(offset, offset + per_packet), mode='wrap')
+            if random.random() >= loss:
+                payload = chunk.astype('<i2').tobytes() if raw else chunk.astype('>i2').tobytes()
+                heapq.heappush(queue, (nominal + random.uniform(0, jitter_ms / 1000), seq, payload))
+            seq += 1
+            # Release everything due before the next packet is generated
+            while queue and queue[0][0] <= start + seq * interval:
+                due, number, payload = heapq.heappop(queue)
+                delay = due - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                if not raw:
+                    payload = build_rtp(number, number * per_packet, ssrc, payload, time.time())
+                sock.sendto(payload, (host, port))
+                sent += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.close()
+    return sent
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Network audio test sender")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sender = sub.add_parser('send', help="send a tone or WAV file as RTP (or raw PCM)")
+    sender.add_argument('--host', default='127.0.0.1')
+    sender.add_argument('--port', type=int, default=2020)
+    source = sender.add_mutually_exclusive_group()
+    source.add_argument('--wav', help="16-bit WAV file (looped)")
+    source.add_argument('--tone', type=float, default=1000.0, help="sine tone frequency in Hz")
+    sender.add_argument('--rate', type=int, default=DEFAULT_RATE, help="tone sample rate")
+    sender.add_argument('--packet-ms', type=float, default=10.0)
+    sender.add_argument('--jitter-ms', type=float, default=0.0, help="random extra delay per packet")
+    sender.add_argument('--loss', type=float, default=0.0, help="packet loss probability")
+    sender.add_argument('--drift-ppm', type=float, default=0.0, help="sender clock offset")
+    sender.add_argument('--seconds', type=float)
+    sender.add_argument('--raw', action='store_true', help="raw little-endian PCM instead of RTP")
+    args = parser.parse_args(argv)
+
+    if args.wav:
+        samples, rate = read_wav_mono(args.wav)
+    else:
+        rate = args.rate
+        t = np.arange(rate) / rate
+        samples = (0.5 * 32767 * np.sin(2 * np.pi * args.tone * t)).astype(np.int16)
+    print(f"Sending {'raw PCM' if args.raw else 'RTP'} at {rate} Hz to {args.host}:{args.port} (Ctrl-C to stop)")
+    sent = send(args.host, args.port, samples, rate, args.packet_ms, args.jitter_ms, args.loss,
+                args.drift_ppm, args.seconds, args.raw)
+    print(f"Sent {sent} packets")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -27,25 +27,43 @@ import os
 import signal
 import sys
 import time
-from math import pi
 
 # Third party imports
-from gnuradio import analog #type: ignore
-from gnuradio import blocks #type: ignore
-from gnuradio import filter #type: ignore
 from gnuradio import gr #type: ignore
-from gnuradio import qtgui #type: ignore
-from gnuradio import soapy, uhd  # type: ignore
-from gnuradio.fft import window #type: ignore
-from gnuradio.filter import firdes #type: ignore
-from gnuradio.qtgui import Range, RangeWidget #type: ignore
 import pmt #type: ignore
 from PyQt5 import Qt, QtCore #type: ignore
 from PyQt5.QtCore import pyqtSlot #type: ignore
 import sip #type: ignore
 
 # Local imports 
-from apps.utils import apply_dark_theme, read_settings
+from apps.utils import apply_dark_theme, read_settings, lazy_import
+from apps.control_server import maybe_start_control_server
+from apps.iq_recorder import maybe_attach_iq_recorder
+from apps.graph_optimizer import recording_connections, maybe_optimize_graph
+from apps.vsb import AuralModulator, InterpolateShift, vsb_taps
+from apps.ntsc_synth import IMAGE_EXTENSIONS, NtscSource, is_frame_directory
+
+# Deferred gnuradio imports: DSP blocks and the radio driver load on first use
+blocks = lazy_import('gnuradio.blocks')
+filter = lazy_import('gnuradio.filter')
+qtgui = lazy_import('gnuradio.qtgui')
+soapy = lazy_import('gnuradio.soapy')
+uhd = lazy_import('gnuradio.uhd')
+window = lazy_import('gnuradio.fft', 'window')
+Range = lazy_import('gnuradio.qtgui', 'Range')
+RangeWidget = lazy_import('gnuradio.qtgui', 'RangeWidget')
+
+# Launcher manifest: read by apps/app_index.py without importing this module
+APP_MANIFEST = {
+    'name': "NTSC Analog Video",
+    'icon': "ntsc.jpg",
+    'category': 'video',
+    'order': 1,
+    'media': ['dat', 'png', 'jpg', 'wav'],
+    'samp_rate': 10e6,
+    'cpu_cost': 'high',
+    'radios': ['hackrf', 'usrp'],
+}
 
 class ConfigDialog(Qt.QDialog):
     def __init__(self, parent=None):
@@ -148,13 +166,15 @@ class ConfigDialog(Qt.QDialog):
             if not self.media_dir or not os.path.exists(self.media_dir):
                 raise FileNotFoundError("Error - Setup Media directory in Settings")
                 
-            # Search for .dat files in media directory
+            # Search for pre-rendered .dat files, images and directories of frames in media directory
             self.video_files = []
             for file in os.listdir(self.media_dir):
-                if file.endswith('.dat'):
-                    full_path = os.path.join(self.media_dir, file)
+                full_path = os.path.join(self.media_dir, file)
+                if file.endswith('.dat') or file.lower().endswith(IMAGE_EXTENSIONS):
                     display_name = os.path.splitext(file)[0].replace('-', ' ')
                     self.video_files.append((display_name, file))
+                elif is_frame_directory(full_path):
+                    self.video_files.append((file.replace('-', ' ') + " (frames)", file))
                     
             if not self.video_files:
                 raise FileNotFoundError("No video files found in media directory")
@@ -442,16 +462,10 @@ class ntscAnalogVideoRecorded(gr.top_block, Qt.QWidget):
             self.top_grid_layout.setRowStretch(r, 1)
         for c in range(1, 5):
             self.top_grid_layout.setColumnStretch(c, 1)
-        self.rational_resampler_xxx_2 = filter.rational_resampler_ccc(
-                interpolation=2,
-                decimation=1,
-                taps=[],
-                fractional_bw=0)
-        self.rational_resampler_xxx_1 = filter.rational_resampler_fff(
-                interpolation=625,
-                decimation=3,
-                taps=[],
-                fractional_bw=0)
+        # 2x interpolation and the move of the visual carrier to -7.75 MHz (the radio is tuned 6 MHz above cf)
+        self.vsb_interpolate_shift_0 = InterpolateShift(samp_rate, -7.75e6)
+        # Aural FM generated at 240 kHz from the 48 kHz audio, then interpolated in stages to 4.5 MHz at samp_rate
+        self.vsb_aural_modulator_0 = AuralModulator(48e3, samp_rate)
         self.rational_resampler_xxx_0 = filter.rational_resampler_fff(
                 interpolation=9,
                 decimation=10,
@@ -603,57 +617,49 @@ class ntscAnalogVideoRecorded(gr.top_block, Qt.QWidget):
             self.top_grid_layout.setRowStretch(r, 1)
         for c in range(7, 10):
             self.top_grid_layout.setColumnStretch(c, 1)
-        self.filter_fft_low_pass_filter_0 = filter.fft_filter_ccc(1, firdes.low_pass(1, samp_rate, 2.475e6, 300e3, window.WIN_HAMMING, 6.76), 1)
+        # Vestigial sideband in one complex band-pass with the visual carrier at 0 Hz (see apps/vsb.py);
+        # its gain of 1/0.8 stands in for the 0.8 the aural carrier used to be scaled by
+        self.filter_fft_vsb_filter_0 = filter.fft_filter_ccc(1, vsb_taps(samp_rate, 1/0.8), 1)
         self.blocks_wavfile_source_0 = blocks.wavfile_source(audioFileName, True)
         self.blocks_null_source_0 = blocks.null_source(gr.sizeof_float*1)
-        self.blocks_multiply_xx_1 = blocks.multiply_vcc(1)
-        self.blocks_multiply_xx_0_0_0 = blocks.multiply_vcc(1)
-        self.blocks_multiply_xx_0_0 = blocks.multiply_vcc(1)
-        self.blocks_multiply_xx_0 = blocks.multiply_vcc(1)
         self.blocks_multiply_const_vxx_2 = blocks.multiply_const_cc(10**((rfPwr<=-50)*(rfPwr+50)/20)*0.95)
-        self.blocks_multiply_const_vxx_1 = blocks.multiply_const_cc(0.25)
+        self.blocks_multiply_const_vxx_1 = blocks.multiply_const_cc(0.25*0.8)
         self.blocks_multiply_const_vxx_0 = blocks.multiply_const_ff(videoInvert*0.9)
         self.blocks_float_to_complex_0 = blocks.float_to_complex(1)
-        self.blocks_file_source_0 = blocks.file_source(gr.sizeof_float*1, videoFileName, True, 0, 0)
-        self.blocks_file_source_0.set_begin_tag(pmt.PMT_NIL)
+        self.video_source_0 = self.make_video_source(videoFileName)
         self.blocks_add_xx_0 = blocks.add_vcc(1)
         self.blocks_add_const_vxx_0 = blocks.add_const_ff(1)
-        self.analog_sig_source_x_1 = analog.sig_source_c(samp_rate*2, analog.GR_COS_WAVE, -6e6, 1, 0, 0)
-        self.analog_sig_source_x_0_0_0 = analog.sig_source_c(samp_rate, analog.GR_COS_WAVE, 2.75e6, 0.8, 0, 0)
-        self.analog_sig_source_x_0_0 = analog.sig_source_c(samp_rate, analog.GR_COS_WAVE, -25e3, 1, 0, 0)
-        self.analog_sig_source_x_0 = analog.sig_source_c(samp_rate, analog.GR_COS_WAVE, -1.725e6, 1, 0, 0)
-        self.analog_frequency_modulator_fc_0 = analog.frequency_modulator_fc(2*pi*25e3/samp_rate)
 
 
         ##################################################
         # Connections
         ##################################################
-        self.connect((self.analog_frequency_modulator_fc_0, 0), (self.blocks_multiply_xx_0_0_0, 0))
-        self.connect((self.analog_sig_source_x_0, 0), (self.blocks_multiply_xx_0, 1))
-        self.connect((self.analog_sig_source_x_0_0, 0), (self.blocks_multiply_xx_0_0, 1))
-        self.connect((self.analog_sig_source_x_0_0_0, 0), (self.blocks_multiply_xx_0_0_0, 1))
-        self.connect((self.analog_sig_source_x_1, 0), (self.blocks_multiply_xx_1, 1))
         self.connect((self.blocks_add_const_vxx_0, 0), (self.blocks_float_to_complex_0, 0))
         self.connect((self.blocks_add_xx_0, 0), (self.blocks_multiply_const_vxx_1, 0))
-        self.connect((self.blocks_file_source_0, 0), (self.blocks_multiply_const_vxx_0, 0))
-        self.connect((self.blocks_float_to_complex_0, 0), (self.blocks_multiply_xx_0, 0))
+        self.connect((self.video_source_0, 0), (self.blocks_multiply_const_vxx_0, 0))
+        self.connect((self.blocks_float_to_complex_0, 0), (self.filter_fft_vsb_filter_0, 0))
         self.connect((self.blocks_multiply_const_vxx_0, 0), (self.blocks_add_const_vxx_0, 0))
         self.connect((self.blocks_multiply_const_vxx_0, 0), (self.rational_resampler_xxx_0, 0))
         self.connect((self.blocks_multiply_const_vxx_1, 0), (self.blocks_multiply_const_vxx_2, 0))
         self.connect((self.blocks_multiply_const_vxx_1, 0), (self.qtgui_const_sink_x_0, 0))
         self.connect((self.blocks_multiply_const_vxx_1, 0), (self.qtgui_freq_sink_x_0, 0))
-        self.connect((self.blocks_multiply_const_vxx_2, 0), (self.rational_resampler_xxx_2, 0))
-        self.connect((self.blocks_multiply_xx_0, 0), (self.filter_fft_low_pass_filter_0, 0))
-        self.connect((self.blocks_multiply_xx_0_0, 0), (self.blocks_add_xx_0, 0))
-        self.connect((self.blocks_multiply_xx_0_0_0, 0), (self.blocks_add_xx_0, 1))
-        self.connect((self.blocks_multiply_xx_1, 0), (self.radio_sink, 0))
+        self.connect((self.blocks_multiply_const_vxx_2, 0), (self.vsb_interpolate_shift_0, 0))
+        self.connect((self.vsb_interpolate_shift_0, 0), (self.radio_sink, 0))
+        self.radio_feed = (self.vsb_interpolate_shift_0, 0)
         self.connect((self.blocks_null_source_0, 0), (self.blocks_float_to_complex_0, 1))
-        self.connect((self.blocks_wavfile_source_0, 0), (self.rational_resampler_xxx_1, 0))
-        self.connect((self.filter_fft_low_pass_filter_0, 0), (self.blocks_multiply_xx_0_0, 0))
+        self.connect((self.blocks_wavfile_source_0, 0), (self.vsb_aural_modulator_0, 0))
+        self.connect((self.filter_fft_vsb_filter_0, 0), (self.blocks_add_xx_0, 0))
         self.connect((self.rational_resampler_xxx_0, 0), (self.qtgui_time_sink_x_0, 0))
-        self.connect((self.rational_resampler_xxx_1, 0), (self.analog_frequency_modulator_fc_0, 0))
-        self.connect((self.rational_resampler_xxx_2, 0), (self.blocks_multiply_xx_1, 0))
+        self.connect((self.vsb_aural_modulator_0, 0), (self.blocks_add_xx_0, 1))
+
 
+    def make_video_source(self, videoFileName):
+        # .dat files hold pre-rendered composite video; images and frame directories are synthesized
+        if videoFileName.endswith('.dat'):
+            source = blocks.file_source(gr.sizeof_float*1, videoFileName, True, 0, 0)
+            source.set_begin_tag(pmt.PMT_NIL)
+            return source
+        return NtscSource(self.samp_rate, videoFileName)
 
     def closeEvent(self, event):
         self.settings = Qt.QSettings("GNU Radio", "ntscAnalogVideoRecorded")
@@ -690,7 +696,22 @@ class ntscAnalogVideoRecorded(gr.top_block, Qt.QWidget):
 
     def set_videoFileName(self, videoFileName):
         self.videoFileName = videoFileName
-        self.blocks_file_source_0.open(self.videoFileName, True)
+        synthesized = not self.videoFileName.endswith('.dat')
+        if synthesized and isinstance(self.video_source_0, NtscSource):
+            self.video_source_0.set_path(self.videoFileName)
+            return
+        if not synthesized and not isinstance(self.video_source_0, NtscSource):
+            self.video_source_0.open(self.videoFileName, True)
+            return
+        # Switching between a .dat file and synthesized video swaps the source block
+        source = self.make_video_source(self.videoFileName)
+        self.lock()
+        try:
+            self.disconnect((self.video_source_0, 0), (self.blocks_multiply_const_vxx_0, 0))
+            self.connect((source, 0), (self.blocks_multiply_const_vxx_0, 0))
+            self.video_source_0 = source
+        finally:
+            self.unlock()
 
     def get_usrpNum(self):
         return self.usrpNum
@@ -711,12 +732,11 @@ class ntscAnalogVideoRecorded(gr.top_block, Qt.QWidget):
 
     def set_samp_rate(self, samp_rate):
         self.samp_rate = samp_rate
-        self.analog_frequency_modulator_fc_0.set_sensitivity(2*pi*25e3/self.samp_rate)
-        self.analog_sig_source_x_0.set_sampling_freq(self.samp_rate)
-        self.analog_sig_source_x_0_0.set_sampling_freq(self.samp_rate)
-        self.analog_sig_source_x_0_0_0.set_sampling_freq(self.samp_rate)
-        self.analog_sig_source_x_1.set_sampling_freq(self.samp_rate*2)
-        self.filter_fft_low_pass_filter_0.set_taps(firdes.low_pass(1, self.samp_rate, 2.475e6, 300e3, window.WIN_HAMMING, 6.76))
+        self.vsb_aural_modulator_0.set_samp_rate(self.samp_rate)
+        self.filter_fft_vsb_filter_0.set_taps(vsb_taps(self.samp_rate, 1/0.8))
+        self.vsb_interpolate_shift_0.set_samp_rate(self.samp_rate)
+        if isinstance(self.video_source_0, NtscSource):
+            self.video_source_0.set_samp_rate(self.samp_rate)
         self.qtgui_freq_sink_x_0.set_frequency_range(0, self.samp_rate)
         if self.radio_type == 'usrp':
             self.radio_sink.set_samp_rate(self.samp_rate*2)
@@ -767,10 +787,14 @@ def main(top_block_cls=ntscAnalogVideoRecorded, options=None, app=None, config_v
             Qt.QApplication.setGraphicsSystem(style)
         app = Qt.QApplication(sys.argv)
 
-    tb = top_block_cls(config_values)
+    tb = recording_connections(top_block_cls)(config_values)
+    tb.graph_report = maybe_optimize_graph(tb, 'ntscAnalogVideoRecorded')
+    tb.iq_recorder = maybe_attach_iq_recorder(tb, 'ntscAnalogVideoRecorded')
 
     tb.start()
 
+    tb.control_server = maybe_start_control_server(tb, 'ntscAnalogVideoRecorded')
+
     tb.show()
 
     def sig_handler(sig=None, frame=None):
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""NTSC composite video synthesized from still images and frame directories.
+
+``NtscRaster`` works out, once per sample rate, where every output sample
+of a frame falls in the 525-line raster: sync, equalizing and serrated
+vertical pulses, the colour burst, and for active video the picture pixel
+and colour subcarrier phase. Rendering a picture is then a vectorized
+gather from a (Y, I, Q) array plus the precomputed blanking template.
+
+At most sample rates a frame is not a whole number of samples, and the
+subcarrier inverts from frame to frame, so the raster repeats only after
+``loop_frames`` frames (6 at 10 Msps). ``NtscSource`` renders frames ahead
+of playback on a worker thread and caches them by (picture, frame in the
+loop): a still image is rendered ``loop_frames`` times and then looped
+from memory.
+
+Levels follow the app's chain, which makes the carrier envelope
+``1 + 0.9*v`` from a sample ``v``: sync tip is the 1.9 peak, blanking 75 %
+and white 12.5 % of it (negative modulation, Invert Video off).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from fractions import Fraction
+from math import ceil, lcm, pi
+
+import numpy as np # type: ignore
+from gnuradio import gr # type: ignore
+
+OUTPUT_BUFFER = 1 << 16  # samples per output buffer; keeps Python work() calls rare at 10 Msps
+CACHE_BYTES = 256 << 20  # rendered frames kept in memory
+RENDER_AHEAD = 4         # frames rendered ahead of playback
+MAX_LOOP_FRAMES = 60
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tif', '.tiff', '.ppm', '.pgm')
+
+# Raster (times in microseconds, levels in IRE)
+LINES = 525
+FRAME_PERIOD = Fraction(1001, 30000)      # seconds
+SUBCARRIER_CYCLES = Fraction(455, 2) * LINES  # per frame: 119437.5, so the phase inverts every frame
+LINE_US = 1e6 * float(FRAME_PERIOD) / LINES   # 63.556
+SUBCARRIER = float(SUBCARRIER_CYCLES / FRAME_PERIOD)  # 3.579545 MHz
+HSYNC_US = 4.7
+EQUALIZING_US = 2.3
+SERRATION_US = 4.7
+BURST_START_US = 5.3
+BURST_US = 9e6 / SUBCARRIER   # 9 cycles
+ACTIVE_START_US = 9.4
+ACTIVE_END_US = LINE_US - 1.5
+ACTIVE_ROWS = 485             # picture rows over both fields
+SYNC_IRE = -40
+SETUP_IRE = 7.5
+BURST_IRE = 20
+MAX_IRE = 120                 # zero carrier; brighter saturated colours are clipped here
+
+# Half-line ranges (0 = start of line 1) of the vertical interval of each field
+EQUALIZING = ((0, 6), (12, 18), (525, 531), (537, 543))
+VSYNC = ((6, 12), (531, 537))
+NO_PICTURE = ((0, 42), (525, 565))  # lines 1-21 and 263.5-283.5
+
+
+def ire_to_level(ire):
+    """Sample value the app's chain turns into the NTSC carrier envelope for ``ire``"""
+    return (1.9 * (0.75 - 0.00625 * np.asarray(ire)) - 1) / 0.9
+
+
+def frame_paths(path):
+    """The image itself, or the sorted images of a frame directory"""
+    if os.path.isdir(path):
+        paths = sorted(os.path.join(path, f) for f in os.listdir(path) if f.lower().endswith(IMAGE_EXTENSIONS))
+        if not paths:
+            raise FileNotFoundError(f"No images in {path}")
+        return paths
+    return [path]
+
+
+def is_frame_directory(path):
+    return os.path.isdir(path) and any(f.lower().endswith(IMAGE_EXTENSIONS) for f in os.listdir(path))
+
+
+def load_picture(path, width):
+    """(3, ACTIVE_ROWS*width) array of Y, I, Q in IRE, resized to the active raster"""
+    from PIL import Image # type: ignore
+    with Image.open(path) as image:
+        rgb = np.asarray(image.convert('RGB').resize((width, ACTIVE_ROWS), Image.BILINEAR), dtype=np.float32)
+    yiq = rgb.reshape(-1, 3) @ np.array([[0.299, 0.596, 0.211],
+                                          [0.587, -0.274, -0.523],
+                                          [0.114, -0.322, 0.312]], dtype=np.float32) * (100 - SETUP_IRE) / 255
+    yiq[:, 0] += SETUP_IRE
+    return np.ascontiguousarray(yiq.T)
+
+
+def _in_ranges(h, ranges):
+    return np.logical_or.reduce([(h >= a) & (h < b) for a, b in ranges])
+
+
+class NtscRaster:
+    """Per-frame sample geometry of the NTSC raster at ``samp_rate``"""
+    def __init__(self, samp_rate):
+        self.samp_rate = samp_rate
+        self.frame_samples = Fraction(samp_rate).limit_denominator(1000) * FRAME_PERIOD
+        self.loop_frames = lcm(self.frame_samples.denominator, SUBCARRIER_CYCLES.denominator)
+        if self.loop_frames > MAX_LOOP_FRAMES:
+            raise ValueError(f"NTSC raster at {samp_rate/1e6:g} Msps repeats only every "
+                             f"{self.loop_frames} frames")
+        self.width = ceil((ACTIVE_END_US - ACTIVE_START_US) * samp_rate / 1e6)
+        self._geometry = {}
+
+    def frame_bounds(self, phase):
+        """First and end sample of frame ``phase`` of the loop"""
+        return ceil(phase * self.frame_samples), ceil((phase + 1) * self.frame_samples)
+
+    def geometry(self, phase):
+        """(template, active, pixel, frac, cos, sin) for frame ``phase`` of the loop"""
+        if phase not in self._geometry:
+            self._geometry[phase] = self._build(phase)
+        return self._geometry[phase]
+
+    def _build(self, phase):
+        start, end = self.frame_bounds(phase)
+        n = np.arange(start, end)
+        halves = (n - float(phase * self.frame_samples)) * (2 * LINES / float(self.frame_samples))
+        h = np.clip(np.floor(halves).astype(np.int64), 0, 2 * LINES - 1)
+        in_half = (halves - h) * (LINE_US / 2)
+        in_line = in_half + (h % 2) * (LINE_US / 2)
+        line = h // 2
+        # Whole cycles per loop, so the subcarrier runs on across the loop boundary
+        carrier = 2 * pi * ((n * (SUBCARRIER / self.samp_rate)) % 1)
+
+        template = np.zeros(len(n), np.float32)
+        equalizing = _in_ranges(h, EQUALIZING)
+        vsync = _in_ranges(h, VSYNC)
+        normal = ~(equalizing | vsync)
+        template[equalizing & (in_half < EQUALIZING_US)] = SYNC_IRE
+        template[vsync & (in_half < LINE_US / 2 - SERRATION_US)] = SYNC_IRE
+        line_start = normal & (h % 2 == 0)
+        template[line_start & (in_line < HSYNC_US)] = SYNC_IRE
+        burst = line_start & (in_line >= BURST_START_US) & (in_line < BURST_START_US + BURST_US)
+        template[burst] = -BURST_IRE * np.sin(carrier[burst])
+
+        active = np.flatnonzero(normal & ~_in_ranges(h, NO_PICTURE)
+                                & (in_line >= ACTIVE_START_US) & (in_line < ACTIVE_END_US))
+        field_line = line[active]
+        row = np.where(field_line < LINES // 2, 2 * (field_line - 21) + 1, 2 * (field_line - 282))
+        x = (in_line[active] - ACTIVE_START_US) / (ACTIVE_END_US - ACTIVE_START_US) * self.width - 0.5
+        x = np.clip(x, 0, self.width - 1)
+        x0 = np.minimum(x.astype(np.int64), self.width - 2)
+        pixel = (np.clip(row, 0, ACTIVE_ROWS - 1) * self.width + x0).astype(np.int32)
+        # I on cos and Q on sin of the subcarrier advanced 33 degrees; the burst sits at 180 degrees on B-Y
+        angle = carrier[active] + 33 * pi / 180
+        return (template, active.astype(np.int32), pixel, (x - x0).astype(np.float32),
+                np.cos(angle).astype(np.float32), np.sin(angle).astype(np.float32))
+
+    def render(self, picture, phase):
+        """float32 samples of frame ``phase`` of the loop showing ``picture`` (from load_picture)"""
+        template, active, pixel, frac, cos, sin = self.geometry(phase)
+        left = picture[:, pixel]
+        yiq = left + frac * (picture[:, pixel + 1] - left)
+        ire = template.copy()
+        ire[active] = np.minimum(yiq[0] + yiq[1] * cos + yiq[2] * sin, MAX_IRE)
+        return ire_to_level(ire).astype(np.float32)
+
+
+class NtscSource(gr.sync_block):
+    """Composite video at ``samp_rate`` from an image or a directory of frames (one image per frame).
+
+    A renderer thread keeps the next ``RENDER_AHEAD`` frames in the cache;
+    work() only copies. If a frame is not ready in time, the previous
+    picture is repeated at the same raster position (counted as ``late``).
+    """
+    def __init__(self, samp_rate, path):
+        gr.sync_block.__init__(self, name="ntsc_source", in_sig=None, out_sig=[np.float32])
+        self.set_min_output_buffer(OUTPUT_BUFFER)
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+        self._generation = 0     # bumped when the raster changes, so stale renders are discarded
+        self._rendered = 0
+        self._render_s = 0.0
+        self._played = 0
+        self._late = 0
+        self._running = False
+        self._thread = None
+        self.raster = self._prepared_raster(samp_rate)
+        self._paths = None
+        self._pending = None     # frame paths to switch to at the next frame boundary
+        self._first = 0          # frame at which the current picture sequence started
+        self._frame = -1
+        self._key = None         # (picture, loop position) now playing
+        self._samples = np.zeros(0, np.float32)
+        self._pos = 0
+        self.set_path(path)
+
+    # ----- scheduler hooks -----
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._renderer, name="ntsc-render", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        with self._ready:
+            self._running = False
+            self._ready.notify_all()
+        if self._thread:
+            self._thread.join(timeout=2)
+        return True
+
+    def work(self, input_items, output_items):
+        out = output_items[0]
+        with self._ready:
+            produced = 0
+            while produced < len(out):
+                if self._pos >= len(self._samples) and not self._next_frame():
+                    break
+                n = min(len(out) - produced, len(self._samples) - self._pos)
+                out[produced:produced + n] = self._samples[self._pos:self._pos + n]
+                produced += n
+                self._pos += n
+        return produced
+
+    def set_path(self, path):
+        """Play another image or frame directory, from the start of its next frame"""
+        paths = frame_paths(path)
+        with self._ready:
+            self.path = path
+            self._pending = paths
+            self._ready.notify_all()
+
+    def set_samp_rate(self, samp_rate):
+        raster = self._prepared_raster(samp_rate)
+        with self._ready:
+            self.raster = raster
+            self._generation += 1
+            self._cache.clear()
+            self._cached_bytes = 0
+            self._first -= self._frame + 1
+            self._frame = -1
+            self._key = None
+            self._samples = np.zeros(0, np.float32)
+            self._pos = 0
+            self._ready.notify_all()
+
+    def stats(self):
+        with self._lock:
+            return {'frames': self._played, 'rendered': self._rendered,
+                    'cache_hits': max(self._played - self._rendered, 0), 'late': self._late,
+                    'render_ms': 1e3 * self._render_s / max(self._rendered, 1),
+                    'cached_mb': self._cached_bytes / 2**20, 'loop_frames': self.raster.loop_frames}
+
+    @staticmethod
+    def _prepared_raster(samp_rate):
+        # Build the geometry of the whole loop up front so the first frames don't stall the stream
+        raster = NtscRaster(samp_rate)
+        for phase in range(raster.loop_frames):
+            raster.geometry(phase)
+        return raster
+
+    def _frame_key(self, frame, paths, first):
+        return paths[(frame - first) % len(paths)], frame % self.raster.loop_frames
+
+    def _upcoming(self):
+        """Keys of the next RENDER_AHEAD frames, taking a pending path switch into account"""
+        paths, first = self._paths, self._first
+        if self._pending is not None:
+            paths, first = self._pending, self._frame + 1
+        frames = range(self._frame + 1, self._frame + 1 + RENDER_AHEAD)
+        return [self._frame_key(frame, paths, first) for frame in frames]
+
+    def _next_frame(self):
+        """Move to the next frame (called with the lock held); False if stopped before it was rendered"""
+        frame = self._frame + 1
+        if self._pending is not None:
+            self._paths, self._first, self._pending = self._pending, frame, None
+        key = self._frame_key(frame, self._paths, self._first)
+        if key not in self._cache and self._key is not None and (self._key[0], key[1]) in self._cache:
+            key = (self._key[0], key[1])
+            self._late += 1
+        else:
+            self._ready.wait_for(lambda: key in self._cache or not self._running)
+            if key not in self._cache:
+                return False
+        self._cache.move_to_end(key)
+        self._frame, self._key, self._samples, self._pos = frame, key, self._cache[key], 0
+        self._played += 1
+        self._ready.notify_all()
+        return True
+
+    def _renderer(self):
+        while True:
+            with self._ready:
+                while self._running and not (missing := [k for k in self._upcoming() if k not in self._cache]):
+                    self._ready.wait()
+                if not self._running:
+                    return
+                key, raster, generation = missing[0], self.raster, self._generation
+            started = time.perf_counter()
+            try:
+                samples = raster.render(load_picture(key[0], raster.width), key[1])
+            except Exception as e:
+                print(f"Error rendering {key[0]}: {e}")
+                samples = ire_to_level(raster.geometry(key[1])[0]).astype(np.float32)  # blank frame
+            elapsed = time.perf_counter() - started
+            with self._ready:
+                if generation != self._generation:
+                    continue
+                self._render_s += elapsed
+                self._rendered += 1
+                self._cache[key] = samples
+                self._cached_bytes += samples.nbytes
+                while self._cached_bytes > CACHE_BYTES and len(self._cache) > RENDER_AHEAD + 1:
+                    self._cached_bytes -= self._cache.popitem(last=False)[1].nbytes
+                self._ready.notify_all()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""External payload for the digital generators.
+
+``PayloadSource`` replaces the PRBS/random symbol source with bytes received
+from a ZeroMQ PULL socket, a UDP port or a named pipe. Receivers write
+straight into a bounded ``ByteRing`` (``recv_into``/``readv`` on a view of
+the ring, no intermediate buffers); the block turns whole chunks of bytes
+into symbols with NumPy, MSB first, and fills any shortfall with PRBS so
+the transmitter never stalls. Payload config::
+
+    {"source": "udp",  "address": "0.0.0.0:2021"}
+    {"source": "zmq",  "address": "tcp://*:2021", "bind": true}
+    {"source": "pipe", "address": "/tmp/pskGenerator.payload"}
+
+``address`` defaults to the app's port (``mikePort``); ``buffer`` sets the
+ring size in bytes.
+"""
+
+import functools
+import os
+import select
+import socket
+import threading
+
+import numpy as np # type: ignore
+from gnuradio import gr # type: ignore
+
+DEFAULT_CAPACITY = 1 << 20  # bytes
+MAX_DATAGRAM = 65536
+POLL_TIMEOUT = 0.2  # seconds; how often receivers check for stop()
+
+
+class ByteRing:
+    """Bounded single-producer/single-consumer byte ring over one NumPy array"""
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = int(capacity)
+        self.buf = np.zeros(self.capacity, dtype=np.uint8)
+        self._view = memoryview(self.buf)
+        self._head = 0  # total bytes written
+        self._tail = 0  # total bytes read
+        self._cond = threading.Condition()
+
+    def available(self):
+        with self._cond:
+            return self._head - self._tail
+
+    def writable(self):
+        """Contiguous free region as a memoryview, for recv_into/readv"""
+        with self._cond:
+            free = self.capacity - (self._head - self._tail)
+            start = self._head % self.capacity
+            return self._view[start:start + min(free, self.capacity - start)]
+
+    def commit(self, count):
+        """Mark ``count`` bytes written into the view from writable()"""
+        with self._cond:
+            self._head += count
+
+    def wait_writable(self, timeout):
+        with self._cond:
+            if self._head - self._tail < self.capacity:
+                return True
+            return self._cond.wait_for(lambda: self._head - self._tail < self.capacity, timeout)
+
+    def free(self):
+        with self._cond:
+            return self.capacity - (self._head - self._tail)
+
+    def write(self, data):
+        """Copy as much of ``data`` (uint8 array) as fits; return the count written"""
+        data = np.frombuffer(data, dtype=np.uint8)
+        written = 0
+        while written < len(data):
+            view = self.writable()
+            count = min(len(view), len(data) - written)
+            if not count:
+                break
+            np.frombuffer(view, dtype=np.uint8)[:count] = data[written:written + count]
+            self.commit(count)
+            written += count
+        return written
+
+    def peek(self, count):
+        """Up to ``count`` unread bytes as a uint8 array, without removing them.
+
+        Contiguous data comes back as a view of ``buf`` (valid until consume());
+        only data that wraps around the end of the ring is copied.
+        """
+        with self._cond:
+            count = min(count, self._head - self._tail)
+            start = self._tail % self.capacity
+        first = min(count, self.capacity - start)
+        if first == count:
+            return self.buf[start:start + count]
+        return np.concatenate((self.buf[start:], self.buf[:count - first]))
+
+    def consume(self, count):
+        """Release ``count`` bytes returned by peek() to the writer"""
+        with self._cond:
+            self._tail += count
+            self._cond.notify_all()
+
+
+# ----- receivers -----
+
+class _Receiver:
+    def __init__(self, ring):
+        self.ring = ring
+        self.received = 0
+        self.dropped = 0
+        self.dropped_datagrams = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._guarded_run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def close(self):
+        self.stop()
+
+    def _guarded_run(self):
+        try:
+            self._run()
+        except Exception as e:
+            print(f"Error receiving payload: {e}")
+
+    def _wait_for_space(self):
+        while not self._stop.is_set():
+            if self.ring.wait_writable(POLL_TIMEOUT):
+                return True
+        return False
+
+
+class UdpReceiver(_Receiver):
+    """Datagrams land directly in the ring; a datagram that does not fit whole is dropped"""
+    def __init__(self, ring, address):
+        super().__init__(ring)
+        host, _, port = address.rpartition(':')
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * MAX_DATAGRAM)
+        self.sock.bind((host or '0.0.0.0', int(port)))
+        self.sock.settimeout(POLL_TIMEOUT)
+        self._scratch = bytearray(MAX_DATAGRAM)
+
+    def _run(self):
+        while not self._stop.is_set():
+            view = self.ring.writable()
+            try:
+                if len(view) >= MAX_DATAGRAM:
+                    count = self.sock.recv_into(view)
+                    self.ring.commit(count)
+                    written = count
+                else:
+                    # Near the wrap point or nearly full: take the copy, and keep
+                    # the datagram only if all of it fits so no partial one is queued
+                    count = self.sock.recv_into(self._scratch)
+                    written = 0
+                    if count <= self.ring.free():
+                        written = self.ring.write(memoryview(self._scratch)[:count])
+            except socket.timeout:
+                continue
+            self.received += count
+            if written < count:
+                self.dropped += count
+                self.dropped_datagrams += 1
+
+    def close(self):
+        super().close()
+        self.sock.close()
+
+
+class ZmqReceiver(_Receiver):
+    """ZeroMQ PULL; the ring applies backpressure through the socket's HWM"""
+    def __init__(self, ring, address, bind=True):
+        super().__init__(ring)
+        import zmq # type: ignore
+        self._zmq = zmq
+        self.context = zmq.Context.instance()
+        self.sock = self.context.socket(zmq.PULL)
+        self.sock.setsockopt(zmq.LINGER, 0)
+        if bind:
+            self.sock.bind(address)
+        else:
+            self.sock.connect(address)
+
+    def _run(self):
+        zmq = self._zmq
+        while not self._stop.is_set():
+            if not self.sock.poll(int(POLL_TIMEOUT * 1000), zmq.POLLIN):
+                continue
+            frame = self.sock.recv(copy=False)
+            data = np.frombuffer(frame.buffer, dtype=np.uint8)
+            self.received += len(data)
+            while len(data) and self._wait_for_space():
+                data = data[self.ring.write(data):]
+
+    def close(self):
+        super().close()
+        self.sock.close()
+
+
+class PipeReceiver(_Receiver):
+    """Named pipe (created if missing), read straight into the ring"""
+    def __init__(self, ring, path):
+        super().__init__(ring)
+        if not os.path.exists(path):
+            os.mkfifo(path)
+        # O_RDWR keeps a writer reference open, so writers may come and go without EOF
+        self.fd = os.open(path, os.O_RDWR | os.O_NONBLOCK)
+
+    def _run(self):
+        while not self._stop.is_set():
+            if not self._wait_for_space():
+                break
+            ready, _, _ = select.select([self.fd], [], [], POLL_TIMEOUT)
+            if not ready:
+                continue
+            try:
+                count = os.readv(self.fd, [self.ring.writable()])
+            except BlockingIOError:
+                continue
+            self.ring.commit(count)
+            self.received += count
+
+    def close(self):
+        super().close()
+        os.close(self.fd)
+
+
+def make_receiver(config, ring, default_port=2020):
+    kind = config.get('source', 'udp')
+    if kind == 'udp':
+        return UdpReceiver(ring, config.get('address', f"0.0.0.0:{default_port}"))
+    if kind == 'zmq':
+        return ZmqReceiver(ring, config.get('address', f"tcp://*:{default_port}"), config.get('bind', True))
+    if kind == 'pipe':
+        return PipeReceiver(ring, config['address'])
+    raise ValueError(f"Unknown payload source: {kind}")
+
+
+# ----- symbol source -----
+
+@functools.lru_cache(maxsize=None)
+def prbs_bits(order=15):
+    """One period of a maximal-length PRBS (x^15 + x^14 + 1) as a uint8 bit array"""
+    state = (1 << order) - 1
+    bits = np.empty((1 << order) - 1, dtype=np.uint8)
+    for i in range(len(bits)):
+        bit = ((state >> (order - 1)) ^ (state >> (order - 2))) & 1
+        state = ((state << 1) | bit) & ((1 << order) - 1)
+        bits[i] = bit
+    return bits
+
+
+class PayloadSource(gr.sync_block):
+    """Symbols (0 .. 2**bits_per_sym - 1, one per byte) from an external payload.
+
+    Every work() call runs np.unpackbits straight on a view of the ring
+    (copying only bytes that wrap around its end) and folds each group of
+    bits into a symbol with a single matrix product, so cost scales with
+    calls, not bytes. When the ring runs dry the rest of the output is PRBS and the
+    shortfall is counted as an underflow.
+    """
+    def __init__(self, bits_per_sym, config, default_port=2020):
+        gr.sync_block.__init__(self, name="payload_source", in_sig=None, out_sig=[np.uint8])
+        self.config = dict(config)
+        self.ring = ByteRing(int(config.get('buffer', DEFAULT_CAPACITY)))
+        self.receiver = make_receiver(config, self.ring, default_port)
+        self.set_bits_per_sym(bits_per_sym)
+        self._carry = np.zeros(0, dtype=np.uint8)  # bits left over from the last call
+        self._prbs = prbs_bits()
+        self._prbs_pos = 0
+        self._lock = threading.Lock()
+        self._underflows = 0
+        self._payload_symbols = 0
+        self._fill_symbols = 0
+
+    def set_bits_per_sym(self, bits_per_sym):
+        self.bits_per_sym = int(bits_per_sym)
+        self._weights = (1 << np.arange(self.bits_per_sym - 1, -1, -1)).astype(np.uint8)
+
+    def start(self):
+        self.receiver.start()
+        return True
+
+    def stop(self):
+        self.receiver.stop()
+        return True
+
+    def close(self):
+        """Release the socket or pipe once the block has left the flowgraph"""
+        self.receiver.close()
+
+    def work(self, input_items, output_items):
+        out = output_items[0]
+        k = self.bits_per_sym
+        wanted_bits = len(out) * k - len(self._carry)
+        raw = self.ring.peek(max(0, -(-wanted_bits // 8)))
+        bits = np.concatenate((self._carry, np.unpackbits(raw))) if len(self._carry) else np.unpackbits(raw)
+        self.ring.consume(len(raw))
+
+        count = min(len(bits) // k, len(out))
+        out[:count] = bits[:count * k].reshape(count, k) @ self._weights
+        self._carry = bits[count * k:]
+
+        fill = len(out) - count
+        if fill:
+            idx = (self._prbs_pos + np.arange(fill * k)) % len(self._prbs)
+            out[count:] = self._prbs[idx].reshape(fill, k) @ self._weights
+            self._prbs_pos = (self._prbs_pos + fill * k) % len(self._prbs)
+        with self._lock:
+            self._payload_symbols += count
+            self._fill_symbols += fill
+            self._underflows += fill > 0
+        return len(out)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'source': self.config.get('source', 'udp'),
+                'bytes_received': self.receiver.received,
+                'bytes_dropped': self.receiver.dropped,
+                'datagrams_dropped': self.receiver.dropped_datagrams,
+                'buffered_bytes': self.ring.available(),
+                'payload_symbols': self._payload_symbols,
+                'fill_symbols': self._fill_symbols,
+                'underflows': self._underflows,
+            }
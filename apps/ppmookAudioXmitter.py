@@ -19,22 +19,29 @@ import time
 
 # Third party imports
 import numpy as np # type: ignore  
-from gnuradio import blocks # type: ignore
-from gnuradio import digital # type: ignore
 from gnuradio import eng_notation # type: ignore
-from gnuradio import filter # type: ignore
-from gnuradio.filter import firdes # type: ignore  
 from gnuradio import gr # type: ignore
-from gnuradio import qtgui # type: ignore
-from gnuradio import soapy, uhd  # type: ignore
-from gnuradio.fft import window  # type: ignore
 from packaging.version import Version as StrictVersion # type: ignore
 from PyQt5 import Qt # type: ignore
 from PyQt5 import QtCore # type: ignore
 from PyQt5.QtCore import QObject, pyqtSlot # type: ignore
 
 # Local imports
-from apps.utils import apply_dark_theme, read_settings
+from apps.utils import apply_dark_theme, read_settings, lazy_import
+from apps.control_server import maybe_start_control_server
+from apps.iq_recorder import maybe_attach_iq_recorder
+from apps.graph_optimizer import recording_connections, maybe_optimize_graph
+
+# Deferred gnuradio imports: DSP blocks and the radio driver load on first use
+blocks = lazy_import('gnuradio.blocks')
+digital = lazy_import('gnuradio.digital')
+filter = lazy_import('gnuradio.filter')
+firdes = lazy_import('gnuradio.filter', 'firdes')
+qtgui = lazy_import('gnuradio.qtgui')
+soapy = lazy_import('gnuradio.soapy')
+uhd = lazy_import('gnuradio.uhd')
+window = lazy_import('gnuradio.fft', 'window')
+
 import glob
 
 if __name__ == '__main__':
@@ -47,6 +54,19 @@ if __name__ == '__main__':
         except:
             print("Warning: failed to XInitThreads()")
 
+# Launcher manifest: read by apps/app_index.py without importing this module
+APP_MANIFEST = {
+    'name': "PPM-OOK Generator",
+    'icon': "ppm-ook.png",
+    'category': 'digital',
+    'order': 4,
+    'media': ['wav'],
+    'samp_rate': 20e6,
+    'cpu_cost': 'high',
+    'radios': ['hackrf', 'usrp'],
+}
+
+
 class ConfigDialog(Qt.QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -608,6 +628,7 @@ class ppmookLiveAudioXmitter(gr.top_block, Qt.QWidget):
         self.connect((self.blocks_float_to_complex_0, 0), (self.qtgui_freq_sink_x_1, 0))
         self.connect((self.blocks_multiply_const_vxx_0, 0), (self.digital_binary_slicer_fb_0, 0))
         self.connect((self.blocks_multiply_const_vxx_1, 0), (self.radio_sink, 0))
+        self.radio_feed = (self.blocks_multiply_const_vxx_1, 0)
         self.connect((self.blocks_multiply_xx_0, 0), (self.blocks_multiply_const_vxx_0, 0))
         self.connect((self.blocks_multiply_xx_1, 0), (self.blocks_selector_0, 0))
         self.connect((self.blocks_multiply_xx_2, 0), (self.blocks_multiply_xx_1, 1))
@@ -761,8 +782,11 @@ def main(top_block_cls=ppmookLiveAudioXmitter, options=None, app=None, config_va
             Qt.QApplication.setGraphicsSystem(style)
         app = Qt.QApplication(sys.argv)
 
-    tb = top_block_cls(config_values)
+    tb = recording_connections(top_block_cls)(config_values)
+    tb.graph_report = maybe_optimize_graph(tb, 'ppmookAudioXmitter')
+    tb.iq_recorder = maybe_attach_iq_recorder(tb, 'ppmookAudioXmitter')
     tb.start()
+    tb.control_server = maybe_start_control_server(tb, 'ppmookAudioXmitter')
     tb.show()
 
     def sig_handler(sig=None, frame=None):
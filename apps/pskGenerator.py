@@ -33,23 +33,56 @@ from math import pi
 # Third party imports 
 import numpy as np #type: ignore
 import sip #type: ignore
-from gnuradio import analog #type: ignore
-from gnuradio import blocks #type: ignore
-from gnuradio import digital #type: ignore
 from gnuradio import eng_notation #type: ignore
-from gnuradio import filter #type: ignore
 from gnuradio import gr #type: ignore
-from gnuradio import qtgui #type: ignore
-from gnuradio import soapy, uhd  # type: ignore
-from gnuradio.fft import window #type: ignore
-from gnuradio.filter import firdes #type: ignore
-from gnuradio.qtgui import Range, RangeWidget #type: ignore
 from PyQt5 import Qt #type: ignore
 from PyQt5 import QtCore #type: ignore
 from PyQt5.QtCore import pyqtSlot #type: ignore
 
 # Local imports
-from apps.utils import apply_dark_theme, read_settings
+from apps.utils import apply_dark_theme, read_settings, lazy_import
+from apps.control_server import maybe_start_control_server
+from apps.iq_recorder import maybe_attach_iq_recorder
+from apps.graph_optimizer import recording_connections, maybe_optimize_graph
+from apps.tx_controls import TxControls
+
+# Deferred gnuradio imports: DSP blocks and the radio driver load on first use
+blocks = lazy_import('gnuradio.blocks')
+digital = lazy_import('gnuradio.digital')
+filter = lazy_import('gnuradio.filter')
+qtgui = lazy_import('gnuradio.qtgui')
+soapy = lazy_import('gnuradio.soapy')
+uhd = lazy_import('gnuradio.uhd')
+window = lazy_import('gnuradio.fft', 'window')
+firdes = lazy_import('gnuradio.filter', 'firdes')
+Range = lazy_import('gnuradio.qtgui', 'Range')
+RangeWidget = lazy_import('gnuradio.qtgui', 'RangeWidget')
+
+# Launcher manifest: read by apps/app_index.py without importing this module
+APP_MANIFEST = {
+    'name': "PSK Signal Generator",
+    'icon': "psk.jpg",
+    'category': 'digital',
+    'order': 3,
+    'media': [],
+    'samp_rate': 5e6,
+    'cpu_cost': 'medium',
+    'radios': ['hackrf', 'usrp'],
+}
+
+def psk_table(bitsPerSym, grayCode=False):
+    """Constellation point for each symbol value 0..2**bitsPerSym-1.
+
+    Points are exp(j*2*pi*n/M) with the generator's 0.9*exp(j*pi/M) rotation
+    applied; with ``grayCode`` adjacent points differ in one bit.
+    """
+    M = 2**bitsPerSym
+    points = 0.9*np.exp(1j*pi/M)*np.exp(2j*pi*np.arange(M)/M)
+    if grayCode:
+        symbols = np.arange(M)
+        points = points[np.argsort(symbols ^ (symbols >> 1))]
+    return [complex(p) for p in points]
+
 
 class ConfigDialog(Qt.QDialog):
     def __init__(self, parent=None):
@@ -143,6 +176,8 @@ class ConfigDialog(Qt.QDialog):
         self.psk_combo.addItems(["BPSK", "QPSK", "8PSK"])
         self.layout.addWidget(Qt.QLabel("PSK Mode:"))
         self.layout.addWidget(self.psk_combo)
+        self.gray_check = Qt.QCheckBox("Gray-coded symbol mapping")
+        self.layout.addWidget(self.gray_check)
         
         # Symbol rate control
         self.sym_rate = Qt.QSpinBox()
@@ -163,6 +198,7 @@ class ConfigDialog(Qt.QDialog):
                 self.cf_slider.setValue(config.get('center_freq', 300))
                 self.pwr_slider.setValue(config.get('power_level', -50))
                 self.psk_combo.setCurrentIndex(config.get('psk_mode', 0))
+                self.gray_check.setChecked(config.get('gray_code', False))
                 self.sym_rate.setValue(config.get('symbol_rate', 100))
             except:
                 # If loading fails, keep default values
@@ -177,6 +213,7 @@ class ConfigDialog(Qt.QDialog):
             'center_freq': self.cf_slider.value(),
             'power_level': self.pwr_slider.value(),
             'psk_mode': self.psk_combo.currentIndex(),
+            'gray_code': self.gray_check.isChecked(),
             'symbol_rate': self.sym_rate.value()
         }
         
@@ -204,10 +241,11 @@ class ConfigDialog(Qt.QDialog):
             'cf': self.cf_slider.value(),
             'pwr': self.pwr_slider.value(),
             'pskMode': self.psk_combo.currentIndex() + 1,  # 1=BPSK, 2=QPSK, 3=8PSK
+            'grayCode': self.gray_check.isChecked(),
             'symRate': self.sym_rate.value()
         }
 
-class pskGenerator(gr.top_block, Qt.QWidget):
+class pskGenerator(gr.top_block, Qt.QWidget, TxControls):
 
     def __init__(self, config_values=None):
         gr.top_block.__init__(self, "PSK Signal Generator", catch_exceptions=True)
@@ -271,7 +309,9 @@ class pskGenerator(gr.top_block, Qt.QWidget):
         self.samp_rate = samp_rate = 5e6
         self.rfPwrDefault = rfPwrDefault = pwr
         self.cfDefault = cfDefault = cf
+        self.pskMode = pskMode
         self.bitsPerSym = bitsPerSym
+        self.grayCode = grayCode = values.get('grayCode', False)
         self.alphaDefault = alphaDefault = 0.35  # Add default alpha value
         self.rrcOption = rrcOption = 1  # Add default RRC filter option
         self.actualSymRate = actualSymRate = samp_rate/int(samp_rate/symRate/1000)/1000
@@ -283,6 +323,11 @@ class pskGenerator(gr.top_block, Qt.QWidget):
         self.bitRate = bitRate = samp_rate/int(samp_rate/symRate/1000)/1000*bitsPerSym
         self.alphaVal = alphaVal = alphaDefault
         self.radio_type = radio_type
+        self.hopper = None
+        self.burst_gate = None
+        self.payload_source = None
+        self.payload_port = mikePort
+        self.reconfigure_ms = None  # flowgraph pause of the last live modulation change
 
         ##################################################
         # Blocks
@@ -327,6 +372,23 @@ class pskGenerator(gr.top_block, Qt.QWidget):
             self.top_grid_layout.setRowStretch(r, 1)
         for c in range(7, 10):
             self.top_grid_layout.setColumnStretch(c, 1)
+        # Modulation order is a live control: see set_bitsPerSym
+        self._pskMode_options = [1, 2, 3]
+        self._pskMode_labels = ['BPSK', 'QPSK', '8PSK']
+        self._pskMode_tool_bar = Qt.QToolBar(self)
+        self._pskMode_tool_bar.addWidget(Qt.QLabel("PSK Mode" + ": "))
+        self._pskMode_combo_box = Qt.QComboBox()
+        self._pskMode_tool_bar.addWidget(self._pskMode_combo_box)
+        for _label in self._pskMode_labels: self._pskMode_combo_box.addItem(_label)
+        self._pskMode_callback = lambda i: Qt.QMetaObject.invokeMethod(self._pskMode_combo_box, "setCurrentIndex", Qt.Q_ARG("int", self._pskMode_options.index(i)))
+        self._pskMode_callback(self.pskMode)
+        self._pskMode_combo_box.currentIndexChanged.connect(
+            lambda i: self.set_pskMode(self._pskMode_options[i]))
+        self.top_grid_layout.addWidget(self._pskMode_tool_bar, 1, 4, 1, 3)
+        for r in range(1, 2):
+            self.top_grid_layout.setRowStretch(r, 1)
+        for c in range(4, 7):
+            self.top_grid_layout.setColumnStretch(c, 1)
         self._rfPwr_range = Range(-80, -30, 1, rfPwrDefault, 200)
         self._rfPwr_win = RangeWidget(self._rfPwr_range, self.set_rfPwr, "RF Output Power", "counter_slider", float, QtCore.Qt.Horizontal)
         self.top_grid_layout.addWidget(self._rfPwr_win, 1, 0, 1, 4)
@@ -545,13 +607,13 @@ class pskGenerator(gr.top_block, Qt.QWidget):
             self.top_grid_layout.setColumnStretch(c, 1)
         self.filter_fft_rrc_filter_0 = filter.fft_filter_ccc(1, firdes.root_raised_cosine(1, samp_rate, actualSymRate*1000, alphaVal, int(11*sps)), 1)
         self.digital_glfsr_source_x_0 = digital.glfsr_source_b(31, True, 0b1100000000010000000000010000000, 1001)
-        self.blocks_uchar_to_float_0 = blocks.uchar_to_float()
+        # Symbols are mapped to rotated constellation points by table lookup at the symbol rate
+        self.digital_chunks_to_symbols_xx_0 = digital.chunks_to_symbols_bc(psk_table(bitsPerSym, grayCode), 1)
         self.blocks_selector_0 = blocks.selector(gr.sizeof_gr_complex*1,int(rrcOption),0)
         self.blocks_selector_0.set_enabled(True)
-        self.blocks_repeat_0 = blocks.repeat(gr.sizeof_float*1, int(samp_rate/symRate/1000))
+        self.blocks_repeat_0 = blocks.repeat(gr.sizeof_gr_complex*1, int(samp_rate/symRate/1000))
         self.blocks_pack_k_bits_bb_0 = blocks.pack_k_bits_bb(bitsPerSym)
         self.blocks_multiply_const_vxx_2 = blocks.multiply_const_cc(10**((rfPwr<=-50)*(rfPwr+50)/20)*0.95)
-        self.blocks_multiply_const_vxx_1 = blocks.multiply_const_cc(0.9*np.exp(1j*pi/(2**(bitsPerSym-0))))
         self.blocks_multiply_const_vxx_0 = blocks.multiply_const_cc(1/np.sqrt(2))
         self._bitRate_tool_bar = Qt.QToolBar(self)
 
@@ -568,33 +630,50 @@ class pskGenerator(gr.top_block, Qt.QWidget):
             self.top_grid_layout.setRowStretch(r, 1)
         for c in range(6, 8):
             self.top_grid_layout.setColumnStretch(c, 1)
-        self.analog_phase_modulator_fc_0 = analog.phase_modulator_fc(2*pi/(2**bitsPerSym))
 
 
         ##################################################
         # Connections
         ##################################################
-        self.connect((self.analog_phase_modulator_fc_0, 0), (self.blocks_selector_0, 0))
-        self.connect((self.analog_phase_modulator_fc_0, 0), (self.filter_fft_rrc_filter_0, 0))
         self.connect((self.blocks_multiply_const_vxx_0, 0), (self.blocks_multiply_const_vxx_2, 0))
         self.connect((self.blocks_multiply_const_vxx_0, 0), (self.qtgui_freq_sink_x_0, 0))
         self.connect((self.blocks_multiply_const_vxx_0, 0), (self.qtgui_time_sink_x_0, 0))
-        self.connect((self.blocks_multiply_const_vxx_1, 0), (self.blocks_multiply_const_vxx_0, 0))
-        self.connect((self.blocks_multiply_const_vxx_1, 0), (self.qtgui_const_sink_x_0, 0))
         self.connect((self.blocks_multiply_const_vxx_2, 0), (self.radio_sink, 0))
-        self.connect((self.blocks_pack_k_bits_bb_0, 0), (self.blocks_uchar_to_float_0, 0))
-        self.connect((self.blocks_repeat_0, 0), (self.analog_phase_modulator_fc_0, 0))
-        self.connect((self.blocks_selector_0, 0), (self.blocks_multiply_const_vxx_1, 0))
-        self.connect((self.blocks_uchar_to_float_0, 0), (self.blocks_repeat_0, 0))
+        self.radio_feed = (self.blocks_multiply_const_vxx_2, 0)
+        self.connect((self.blocks_pack_k_bits_bb_0, 0), (self.digital_chunks_to_symbols_xx_0, 0))
+        self.connect((self.blocks_repeat_0, 0), (self.blocks_selector_0, 0))
+        self.connect((self.blocks_repeat_0, 0), (self.filter_fft_rrc_filter_0, 0))
+        self.connect((self.blocks_selector_0, 0), (self.blocks_multiply_const_vxx_0, 0))
+        self.connect((self.blocks_selector_0, 0), (self.qtgui_const_sink_x_0, 0))
+        self.connect((self.digital_chunks_to_symbols_xx_0, 0), (self.blocks_repeat_0, 0))
         self.connect((self.digital_glfsr_source_x_0, 0), (self.blocks_pack_k_bits_bb_0, 0))
         self.connect((self.filter_fft_rrc_filter_0, 0), (self.blocks_selector_0, 1))
 
+        # Optional frequency-hopping plan (see apps/freq_hopper.py)
+        if values.get('hopping'):
+            self.set_hopping(values['hopping'])
+
+        # Optional burst (duty-cycled) transmission (see apps/burst_gate.py)
+        if values.get('burst'):
+            self.set_burst(values['burst'])
+
+        # Optional external payload in place of the PRBS generator (see apps/payload_source.py)
+        if values.get('payload'):
+            try:
+                self.set_payload(values['payload'])
+            except Exception as e:
+                print(f"Error starting payload source: {e}")
+
 
     def closeEvent(self, event):
         self.settings = Qt.QSettings("GNU Radio", "pskGenerator")
         self.settings.setValue("geometry", self.saveGeometry())
+        if self.hopper is not None:
+            self.hopper.stop()
         self.stop()
         self.wait()
+        if self.payload_source is not None:
+            self.payload_source.close()
 
         event.accept()
 
@@ -624,6 +703,8 @@ class pskGenerator(gr.top_block, Qt.QWidget):
             self.radio_sink.set_samp_rate(self.samp_rate)
         else:
             self.radio_sink.set_sample_rate(0, self.samp_rate)
+        if self.burst_gate is not None:
+            self.burst_gate.set_samp_rate(self.samp_rate)
 
     def get_rfPwrDefault(self):
         return self.rfPwrDefault
@@ -639,14 +720,49 @@ class pskGenerator(gr.top_block, Qt.QWidget):
         self.cfDefault = cfDefault
         self.set_cf(self.cfDefault)
 
+    def get_pskMode(self):
+        return self.pskMode
+
+    def set_pskMode(self, pskMode):
+        self.set_bitsPerSym(pskMode if pskMode <= 2 else 3)
+
     def get_bitsPerSym(self):
         return self.bitsPerSym
 
     def set_bitsPerSym(self, bitsPerSym):
-        self.bitsPerSym = bitsPerSym
+        if bitsPerSym == self.bitsPerSym:
+            return
+        # pack_k_bits_bb has no setter for k, so a new packer is swapped in while
+        # the flowgraph is locked; the radio and the rest of the graph stay up
+        packer = blocks.pack_k_bits_bb(bitsPerSym)
+        paused = time.perf_counter()
+        self.lock()
+        try:
+            if self.payload_source is None:
+                self.disconnect((self.digital_glfsr_source_x_0, 0), (self.blocks_pack_k_bits_bb_0, 0))
+                self.disconnect((self.blocks_pack_k_bits_bb_0, 0), (self.digital_chunks_to_symbols_xx_0, 0))
+                self.connect((self.digital_glfsr_source_x_0, 0), (packer, 0))
+                self.connect((packer, 0), (self.digital_chunks_to_symbols_xx_0, 0))
+            else:
+                self.payload_source.set_bits_per_sym(bitsPerSym)
+            self.blocks_pack_k_bits_bb_0 = packer
+            self.bitsPerSym = bitsPerSym
+            self.digital_chunks_to_symbols_xx_0.set_symbol_table(psk_table(self.bitsPerSym, self.grayCode))
+        finally:
+            self.unlock()
+        self.reconfigure_ms = (time.perf_counter() - paused) * 1e3
+        print(f"pskGenerator: {2**self.bitsPerSym}PSK, flowgraph paused {self.reconfigure_ms:.1f} ms")
+        self.pskMode = self.bitsPerSym
+        self._pskMode_callback(self.pskMode)
+        self.set_modName(f"{2**self.bitsPerSym}PSK")
         self.set_bitRate(self.samp_rate/int(self.samp_rate/self.symRate/1000)/1000*self.bitsPerSym)
-        self.analog_phase_modulator_fc_0.set_sensitivity(2*pi/(2**self.bitsPerSym))
-        self.blocks_multiply_const_vxx_1.set_k(0.9*np.exp(1j*pi/(2**(self.bitsPerSym-0))))
+
+    def get_grayCode(self):
+        return self.grayCode
+
+    def set_grayCode(self, grayCode):
+        self.grayCode = grayCode
+        self.digital_chunks_to_symbols_xx_0.set_symbol_table(psk_table(self.bitsPerSym, self.grayCode))
 
     def get_alphaDefault(self):
         return self.alphaDefault
@@ -664,6 +780,10 @@ class pskGenerator(gr.top_block, Qt.QWidget):
         self.set_sps(self.samp_rate/self.actualSymRate/1000)
         self.filter_fft_rrc_filter_0.set_taps(firdes.root_raised_cosine(1, self.samp_rate, self.actualSymRate*1000, self.alphaVal, int(11*self.sps)))
 
+    def get_occupiedBw(self):
+        # kHz occupied by the signal; RRC: symbol rate * (1 + alpha); unfiltered: the main lobe
+        return self.actualSymRate*(1 + self.alphaVal) if self.rrcOption else 2*self.actualSymRate
+
     def get_sps(self):
         return self.sps
 
@@ -714,6 +834,18 @@ class pskGenerator(gr.top_block, Qt.QWidget):
         else:
             self.radio_sink.set_frequency(0, self.cf*1e6)
 
+    def tx_output(self):
+        return (self.blocks_multiply_const_vxx_2, 0)
+
+    def symbol_input(self):
+        return (self.digital_chunks_to_symbols_xx_0, 0)
+
+    def symbol_edges(self):
+        return [
+            ((self.digital_glfsr_source_x_0, 0), (self.blocks_pack_k_bits_bb_0, 0)),
+            ((self.blocks_pack_k_bits_bb_0, 0), (self.digital_chunks_to_symbols_xx_0, 0)),
+        ]
+
     def get_bitRate(self):
         return self.bitRate
 
@@ -738,10 +870,14 @@ def main(top_block_cls=pskGenerator, options=None, app=None, config_values=None)
             Qt.QApplication.setGraphicsSystem(style)
         app = Qt.QApplication(sys.argv)
 
-    tb = top_block_cls(config_values)
+    tb = recording_connections(top_block_cls)(config_values)
+    tb.graph_report = maybe_optimize_graph(tb, 'pskGenerator')
+    tb.iq_recorder = maybe_attach_iq_recorder(tb, 'pskGenerator')
 
     tb.start()
 
+    tb.control_server = maybe_start_control_server(tb, 'pskGenerator')
+
     tb.show()
 
     def sig_handler(sig=None, frame=None):
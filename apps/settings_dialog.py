@@ -1,16 +1,24 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import os
-import json
 import re
-from PyQt5.QtWidgets import QDialog, QGroupBox, QHBoxLayout, QVBoxLayout, QPushButton, QLineEdit, QListWidget, QFileDialog, QMessageBox, QRadioButton, QComboBox, QLabel # type: ignore
-from PyQt5.QtCore import Qt # type: ignore
+import threading
+from PyQt5.QtWidgets import QDialog, QGroupBox, QHBoxLayout, QVBoxLayout, QPushButton, QLineEdit, QListWidget, QListWidgetItem, QFileDialog, QMessageBox, QRadioButton, QComboBox, QLabel, QCheckBox # type: ignore
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal # type: ignore
+
+from apps.device_discovery import get_device_discovery
+from apps.usrp_probe import probe_addresses_sync, format_result
+from apps.settings_store import get_settings_store
+from apps.utils import SettingsFollower
 
 class SettingsDialog(QDialog):
+    # Emitted from the probe thread; Qt delivers it on the GUI thread
+    probe_finished = pyqtSignal(list)
+
     def __init__(self, settings_file, parent=None):
         super().__init__(parent)
         self.settings_file = settings_file
+        self.store = get_settings_store(settings_file)
         self.setWindowTitle("Settings")
         self.setWindowFlags(Qt.Window)
         self.setMinimumSize(500, 600)
@@ -57,7 +65,22 @@ class SettingsDialog(QDialog):
         
         mode_layout.addWidget(self.single_mode)
         mode_layout.addWidget(self.multi_mode)
-        mode_group.setLayout(mode_layout)
+
+        # Multi mode on USRPs: start the app on every radio with a common timed start
+        sync_layout = QHBoxLayout()
+        self.sync_launch = QCheckBox("Time-synchronized launch on all USRPs")
+        self.sync_launch.setChecked(self.settings.get('sync_launch', False))
+        self.time_source_combo = QComboBox()
+        self.time_source_combo.addItem("Host (network)", "host")
+        self.time_source_combo.addItem("External PPS + 10 MHz", "external")
+        self.time_source_combo.setCurrentIndex(1 if self.settings.get('time_source') == 'external' else 0)
+        sync_layout.addWidget(self.sync_launch)
+        sync_layout.addWidget(self.time_source_combo)
+
+        mode_outer = QVBoxLayout()
+        mode_outer.addLayout(mode_layout)
+        mode_outer.addLayout(sync_layout)
+        mode_group.setLayout(mode_outer)
         
         # Radio Hardware Section
         radio_hw_group = QGroupBox("Radio Hardware")
@@ -77,8 +100,21 @@ class SettingsDialog(QDialog):
                 border: 1px solid #5c5c5c;
             }
         """)
+        self.time_source_combo.view().setStyleSheet(self.radio_hw_combo.view().styleSheet())
         radio_hw_layout.addWidget(self.radio_hw_combo)
-        radio_hw_group.setLayout(radio_hw_layout)
+
+        # Detected device status, read from the background discovery cache
+        self.discovery = get_device_discovery()
+        self.radio_status = QLabel()
+        radio_hw_outer = QVBoxLayout()
+        radio_hw_outer.addLayout(radio_hw_layout)
+        radio_hw_outer.addWidget(self.radio_status)
+        radio_hw_group.setLayout(radio_hw_outer)
+        self.radio_hw_combo.currentIndexChanged.connect(self.update_radio_status)
+        self.status_timer = QTimer(self)
+        self.status_timer.timeout.connect(self.update_radio_status)
+        self.status_timer.start(1000)
+        self.update_radio_status()
 
         # IP Addresses Section
         ip_group = QGroupBox("Software Defined Radio IP Addresses:")
@@ -103,17 +139,25 @@ class SettingsDialog(QDialog):
         ip_input_layout.addWidget(self.ip_input)
         ip_input_layout.addWidget(add_ip_btn)
         
-        # IP list
+        # IP list (item text shows probe status, the address is kept in UserRole)
         self.ip_list = QListWidget()
-        self.ip_list.addItems(self.settings['ip_addresses'])  # Now safe since we initialized it
+        for ip_address in self.settings['ip_addresses']:  # Now safe since we initialized it
+            self.add_ip_item(ip_address)
         
-        # Remove IP button
+        # Remove IP and probe buttons
+        ip_button_layout = QHBoxLayout()
         remove_ip_btn = QPushButton("Remove Selected")
         remove_ip_btn.clicked.connect(self.remove_ip)
+        self.probe_btn = QPushButton("Probe")
+        self.probe_btn.setAutoDefault(False)
+        self.probe_btn.clicked.connect(self.probe_ips)
+        ip_button_layout.addWidget(remove_ip_btn)
+        ip_button_layout.addWidget(self.probe_btn)
+        self.probe_finished.connect(self.show_probe_results)
         
         ip_layout.addLayout(ip_input_layout)
         ip_layout.addWidget(self.ip_list)
-        ip_layout.addWidget(remove_ip_btn)
+        ip_layout.addLayout(ip_button_layout)
         ip_group.setLayout(ip_layout)
         
         # Add groups to main layout
@@ -124,13 +168,10 @@ class SettingsDialog(QDialog):
 
         # Restore saved position and size
         try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r') as f:
-                    saved = json.load(f)
-                pos = saved.get('settings_dialog_position')
-                if pos:
-                    self.move(pos['x'], pos['y'])
-                    self.resize(pos['width'], pos['height'])
+            pos = self.settings.get('settings_dialog_position')
+            if pos:
+                self.move(pos['x'], pos['y'])
+                self.resize(pos['width'], pos['height'])
         except Exception as e:
             print(f"Error restoring settings dialog geometry: {e}")
         
@@ -146,6 +187,13 @@ class SettingsDialog(QDialog):
         button_layout.addWidget(cancel_btn)
         button_layout.addWidget(save_btn)
         layout.addLayout(button_layout)
+
+        # Show changes made elsewhere (control server, another window) while open
+        SettingsFollower(self, self.settings_changed, self.store)
+
+        # Check the configured USRPs as soon as the dialog opens
+        if current_radio == 'usrp':
+            self.probe_ips()
     
     def browse_media_dir(self):
         directory = QFileDialog.getExistingDirectory(
@@ -160,9 +208,10 @@ class SettingsDialog(QDialog):
         ip_address = self.ip_input.text().strip()
         if self.validate_ip(ip_address):
             if ip_address not in self.settings['ip_addresses']:  # Check for duplicates
-                self.ip_list.addItem(ip_address)
+                self.add_ip_item(ip_address)
                 self.settings['ip_addresses'].append(ip_address)
                 self.ip_input.clear()
+                self.probe_ips([ip_address])
             else:
                 QMessageBox.warning(self, "Duplicate IP", "This IP address is already in the list.")
         else:
@@ -185,20 +234,82 @@ class SettingsDialog(QDialog):
         
         return True
     
+    def update_radio_status(self):
+        kind = self.radio_hw_combo.currentData()
+        devices = self.discovery.devices(kind)
+        name = "HackRF" if kind == 'hackrf' else "USRP"
+        if devices is None:
+            self.radio_status.setText(f"Searching for {name} devices...")
+        elif devices:
+            self.radio_status.setText(f"Detected: {len(devices)} {name} device(s)")
+        else:
+            self.radio_status.setText(f"No {name} detected")
+
+    def add_ip_item(self, ip_address):
+        item = QListWidgetItem(ip_address)
+        item.setData(Qt.UserRole, ip_address)
+        self.ip_list.addItem(item)
+
+    def probe_ips(self, addresses=None):
+        """Probe USRP addresses concurrently on a worker thread"""
+        addresses = list(addresses or self.settings['ip_addresses'])
+        if not addresses:
+            return
+        for i in range(self.ip_list.count()):
+            item = self.ip_list.item(i)
+            if item.data(Qt.UserRole) in addresses:
+                item.setText(f"{item.data(Qt.UserRole)}    probing...")
+
+        def run():
+            try:
+                results = probe_addresses_sync(addresses)
+            except Exception as e:
+                print(f"Error probing USRP addresses: {e}")
+                results = [{'address': a, 'status': 'error', 'latency': None, 'device': None}
+                           for a in addresses]
+            self.probe_finished.emit(results)
+
+        threading.Thread(target=run, name="usrp-probe", daemon=True).start()
+
+    def show_probe_results(self, results):
+        by_address = {r['address']: r for r in results}
+        for i in range(self.ip_list.count()):
+            item = self.ip_list.item(i)
+            result = by_address.get(item.data(Qt.UserRole))
+            if result:
+                item.setText(f"{result['address']}    {format_result(result)}")
+
     def remove_ip(self):
         for item in self.ip_list.selectedItems():
-            ip_address = item.text()
+            ip_address = item.data(Qt.UserRole)
             self.settings['ip_addresses'].remove(ip_address)  # Remove from settings
             self.ip_list.takeItem(self.ip_list.row(item))
     
     def load_settings(self):
-        try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r') as f:
-                    return json.load(f)
-        except Exception as e:
-            print(f"Error loading settings: {e}")
-        return {'media_directory': '', 'ip_addresses': []}  # Initialize with empty list
+        return self.store.all()
+
+    def settings_changed(self, changed):
+        """Reload the fields whose settings changed in the store"""
+        for key in changed:
+            self.settings[key] = self.store.get(key)
+        if 'media_directory' in changed:
+            self.media_path.setText(self.settings['media_directory'] or '')
+        if 'radio_mode' in changed:
+            self.single_mode.setChecked(self.settings['radio_mode'] != 'multi')
+            self.multi_mode.setChecked(self.settings['radio_mode'] == 'multi')
+        if 'sync_launch' in changed:
+            self.sync_launch.setChecked(bool(self.settings['sync_launch']))
+        if 'time_source' in changed:
+            self.time_source_combo.setCurrentIndex(1 if self.settings['time_source'] == 'external' else 0)
+        if 'radio_type' in changed:
+            self.radio_hw_combo.setCurrentIndex(0 if self.settings['radio_type'] == 'hackrf' else 1)
+        if 'ip_addresses' in changed:
+            self.settings['ip_addresses'] = self.settings['ip_addresses'] or []
+            self.ip_list.clear()
+            for ip_address in self.settings['ip_addresses']:
+                self.add_ip_item(ip_address)
+            if self.radio_hw_combo.currentData() == 'usrp':
+                self.probe_ips()
     
     def validate_mode(self):
         if self.multi_mode.isChecked() and len(self.settings['ip_addresses']) < 2:
@@ -212,33 +323,27 @@ class SettingsDialog(QDialog):
         if not self.validate_mode():
             return
             
-        existing_settings = {}
-        try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r') as f:
-                    existing_settings = json.load(f)
-        except Exception as e:
-            print(f"Error loading existing settings: {e}")
-
-        existing_settings.update({
+        # Update the shared store; it notifies listeners and writes the file atomically
+        self.store.update({
             'media_directory': self.media_path.text(),
             'ip_addresses': self.settings['ip_addresses'],
             'radio_mode': 'multi' if self.multi_mode.isChecked() else 'single',
-            'radio_type': self.radio_hw_combo.currentData()
+            'radio_type': self.radio_hw_combo.currentData(),
+            'sync_launch': self.sync_launch.isChecked(),
+            'time_source': self.time_source_combo.currentData()
         })
-
-        # Save the combined settings
-        try:
-            with open(self.settings_file, 'w') as f:
-                json.dump(existing_settings, f, indent=4)
-        except Exception as e:
-            print(f"Error saving settings: {e}")
+        self.store.flush()
 
         super().accept()
 
     def reject(self):
         super().reject()
 
+    def done(self, result):
+        # Stop polling the discovery cache once the dialog is closed either way
+        self.status_timer.stop()
+        super().done(result)
+
     def closeEvent(self, event):
         super().closeEvent(event)
     
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import atexit
+import copy
+import json
+import os
+import tempfile
+import threading
+
+SETTINGS_FILE = os.path.join("config", "window_settings.json")
+DEFAULT_SETTINGS = {'media_directory': '', 'ip_addresses': [], 'radio_type': 'hackrf'}
+
+
+def atomic_write_json(path, data):
+    """Write ``data`` to ``path`` via a temp file and rename so readers never see a partial file"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class SettingsStore:
+    """In-memory view of window_settings.json.
+
+    The file is read once; reads are served from memory and return copies.
+    Writes update memory immediately and are flushed to disk after
+    ``flush_delay`` seconds, so a burst of changes costs a single atomic
+    write. Listeners are called with the set of changed keys.
+    """
+    def __init__(self, path=SETTINGS_FILE, flush_delay=0.5):
+        self.path = path
+        self.flush_delay = flush_delay
+        self._lock = threading.RLock()
+        self._listeners = []
+        self._timer = None
+        self._dirty = False
+        self._data = self._load()
+
+    def _load(self):
+        settings = copy.deepcopy(DEFAULT_SETTINGS)
+        try:
+            if os.path.exists(self.path):
+                with open(self.path) as f:
+                    settings.update(json.load(f))
+        except Exception as e:
+            print(f"Error reading settings: {e}")
+        return settings
+
+    def get(self, key, default=None):
+        with self._lock:
+            return copy.deepcopy(self._data.get(key, default))
+
+    def all(self):
+        with self._lock:
+            return copy.deepcopy(self._data)
+
+    def set(self, key, value):
+        self.update({key: value})
+
+    def update(self, values):
+        with self._lock:
+            changed = {k for k, v in values.items() if self._data.get(k) != v}
+            if not changed:
+                return
+            for key in changed:
+                self._data[key] = copy.deepcopy(values[key])
+            self._dirty = True
+            self._schedule_flush()
+        for callback in list(self._listeners):
+            try:
+                callback(changed)
+            except Exception as e:
+                print(f"Error in settings listener: {e}")
+
+    def _schedule_flush(self):
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Write pending changes to disk now"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            try:
+                atomic_write_json(self.path, self._data)
+                self._dirty = False
+            except Exception as e:
+                print(f"Error saving settings: {e}")
+
+    def add_listener(self, callback):
+        """Call ``callback(changed_keys)`` whenever a value changes"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+
+_stores = {}
+
+
+def get_settings_store(path=SETTINGS_FILE):
+    """Return the shared SettingsStore for ``path``"""
+    key = os.path.abspath(path)
+    if key not in _stores:
+        _stores[key] = SettingsStore(path)
+        atexit.register(_stores[key].flush)
+    return _stores[key]
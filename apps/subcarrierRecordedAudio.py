@@ -20,22 +20,43 @@ from math import pi  # Add this import
 
 # Third party imports
 import numpy as np # type: ignore  
-from gnuradio import analog  # type: ignore
-from gnuradio import blocks  # type: ignore
-from gnuradio import filter  # type: ignore
-from gnuradio.filter import firdes # type: ignore  
 from gnuradio import gr  # type: ignore
-from gnuradio import qtgui  # type: ignore
-from gnuradio import soapy, uhd  # type: ignore
-from gnuradio.fft import window  # type: ignore
-from gnuradio.qtgui import Range, RangeWidget  # type: ignore
 from packaging.version import Version as StrictVersion  # type: ignore
 from PyQt5 import Qt  # type: ignore
 from PyQt5 import QtCore  # type: ignore
 from PyQt5.QtCore import pyqtSlot  # type: ignore
 
 # Local imports
-from apps.utils import apply_dark_theme, read_settings
+from apps.utils import apply_dark_theme, read_settings, lazy_import
+from apps.control_server import maybe_start_control_server
+from apps.iq_recorder import maybe_attach_iq_recorder
+from apps.graph_optimizer import recording_connections, maybe_optimize_graph
+from apps.network_audio import NetworkAudioSource
+
+# Deferred gnuradio imports: DSP blocks and the radio driver load on first use
+analog = lazy_import('gnuradio.analog')
+blocks = lazy_import('gnuradio.blocks')
+filter = lazy_import('gnuradio.filter')
+firdes = lazy_import('gnuradio.filter', 'firdes')
+qtgui = lazy_import('gnuradio.qtgui')
+soapy = lazy_import('gnuradio.soapy')
+uhd = lazy_import('gnuradio.uhd')
+window = lazy_import('gnuradio.fft', 'window')
+Range = lazy_import('gnuradio.qtgui', 'Range')
+RangeWidget = lazy_import('gnuradio.qtgui', 'RangeWidget')
+
+# Launcher manifest: read by apps/app_index.py without importing this module
+APP_MANIFEST = {
+    'name': "FM Subcarrier",
+    'icon': "fmSubcarrier.jpg",
+    'category': 'audio',
+    'order': 2,
+    'media': ['wav'],
+    'samp_rate': 2e6,
+    'cpu_cost': 'low',
+    'radios': ['hackrf', 'usrp'],
+}
+
 import glob
 
 
@@ -141,6 +162,7 @@ class ConfigDialog(Qt.QDialog):
                 # Get just the filename without extension and replace hyphens with spaces
                 display_name = os.path.splitext(os.path.basename(wav_file))[0].replace('-', ' ')
                 self.audio_combo.addItem(display_name, wav_file)
+            self.audio_combo.addItem("Network Audio (UDP)", "network")
                 
             # Only enable OK button if we have both IP addresses and media files
             ok_button.setEnabled(self.radio_type == 'hackrf' or bool(self.ipList))
@@ -274,9 +296,11 @@ class ConfigDialog(Qt.QDialog):
             'radio_type': self.radio_type,
             'ipNum': ipNum,
             'ipXmitAddr': ipXmitAddr,
+            'mikePort': 2020 + ipNum,
             'cf': self.cf_slider.value(),
             'rfPwr': self.pwr_slider.value(),
             'audio_file': self.audio_combo.currentData(),
+            'networkAudio': {} if self.audio_combo.currentData() == "network" else None,
             'submod': self.submod_combo.currentIndex(),
             'scfreq': self.scfreq_slider.value(),
             'carrier': 1 if self.carrier_on_radio.isChecked() else 0,  # Modified
@@ -580,7 +604,12 @@ class subcarrierRecordedAudio(gr.top_block, Qt.QWidget):
         self.filter_fft_low_pass_filter_0 = filter.fft_filter_fff(1, firdes.low_pass(1, 48000, noiseFreq, 200, window.WIN_HAMMING, 6.76), 1)
         self.fft_filter_xxx_0 = filter.fft_filter_fff(1, firdes.low_pass(1,48000,3500,500), 1)
         self.fft_filter_xxx_0.declare_sample_delay(0)
-        self.blocks_wavfile_source_0 = blocks.wavfile_source(values['audio_file'], True)
+        self.network_audio = None
+        if values.get('networkAudio') is not None:
+            self.network_audio = NetworkAudioSource(values.get('mikePort', 2020), 48000, values['networkAudio'], "subcarrierRecordedAudio")
+            self.blocks_wavfile_source_0 = self.network_audio
+        else:
+            self.blocks_wavfile_source_0 = blocks.wavfile_source(values['audio_file'], True)
         self.blocks_selector_0 = blocks.selector(gr.sizeof_gr_complex*1,subMod,0)
         self.blocks_selector_0.set_enabled(True)
         self.blocks_multiply_xx_0 = blocks.multiply_vcc(1)
@@ -603,6 +632,7 @@ class subcarrierRecordedAudio(gr.top_block, Qt.QWidget):
         self.connect((self.analog_frequency_modulator_fc_0, 0), (self.blocks_selector_0, 0))
         self.connect((self.analog_frequency_modulator_fc_1, 0), (self.qtgui_freq_sink_x_1, 0))
         self.connect((self.analog_frequency_modulator_fc_1, 0), (self.radio_sink, 0))
+        self.radio_feed = (self.analog_frequency_modulator_fc_1, 0)
         self.connect((self.analog_noise_source_x_0, 0), (self.filter_fft_low_pass_filter_0, 0))
         self.connect((self.analog_sig_source_x_0, 0), (self.blocks_multiply_xx_0, 1))
         self.connect((self.blocks_add_const_vxx_0, 0), (self.blocks_float_to_complex_0, 0))
@@ -632,6 +662,8 @@ class subcarrierRecordedAudio(gr.top_block, Qt.QWidget):
         self.settings.setValue("geometry", self.saveGeometry())
         self.stop()
         self.wait()
+        if self.network_audio is not None:
+            self.network_audio.close()
 
         event.accept()
 
@@ -756,8 +788,11 @@ def main(top_block_cls=subcarrierRecordedAudio, options=None, app=None, config_v
     if app is None:
         app = Qt.QApplication(sys.argv)
 
-    tb = top_block_cls(config_values)
+    tb = recording_connections(top_block_cls)(config_values)
+    tb.graph_report = maybe_optimize_graph(tb, 'subcarrierRecordedAudio')
+    tb.iq_recorder = maybe_attach_iq_recorder(tb, 'subcarrierRecordedAudio')
     tb.start()
+    tb.control_server = maybe_start_control_server(tb, 'subcarrierRecordedAudio')
     tb.show()
 
     def sig_handler(sig=None, frame=None):
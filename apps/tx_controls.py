@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from apps.burst_gate import BurstGate
+from apps.freq_hopper import FrequencyHopper
+from apps.payload_source import PayloadSource
+
+
+class TxControls:
+    """get_/set_hopping, get_/set_burst and get_/set_payload for a generator top block.
+
+    The generator sets ``hopper``, ``burst_gate``, ``payload_source`` (all
+    None), ``payload_port`` and ``radio_feed`` in its constructor and
+    provides the endpoints these setters rewire:
+
+    * ``tx_output()`` - the block output that drives ``radio_sink``
+    * ``symbol_input()`` - the block input that takes one symbol per byte
+    * ``symbol_edges()`` - the edges from its own symbol source to
+      ``symbol_input()``, replaced by a ``PayloadSource`` when one is set
+    """
+    def get_hopping(self):
+        if self.hopper is None:
+            return None
+        return {'plan': self.hopper.plan, 'running': self.hopper.is_running(), 'stats': self.hopper.stats()}
+
+    def set_hopping(self, hopping):
+        if self.hopper is not None:
+            self.hopper.stop()
+            self.hopper = None
+        if hopping:
+            self.hopper = FrequencyHopper(self, hopping)
+            self.hopper.start()
+
+    def get_burst(self):
+        if self.burst_gate is None:
+            return None
+        return {'plan': self.burst_gate.plan, 'stats': self.burst_gate.stats()}
+
+    def set_burst(self, burst):
+        # Route the radio feed directly, or through a BurstGate for a burst plan
+        source = self.tx_output()
+        gate = BurstGate(self.samp_rate, burst, timed=self.radio_type == 'usrp',
+                         fill_idle=self.radio_type != 'usrp') if burst else None
+        self.lock()
+        try:
+            if self.burst_gate is not None:
+                self.disconnect(source, (self.burst_gate, 0))
+                self.disconnect((self.burst_gate, 0), (self.radio_sink, 0))
+            else:
+                self.disconnect(source, (self.radio_sink, 0))
+            if gate is not None:
+                self.connect(source, (gate, 0))
+                self.connect((gate, 0), (self.radio_sink, 0))
+            else:
+                self.connect(source, (self.radio_sink, 0))
+            feed = (gate, 0) if gate is not None else source
+            recorder = getattr(self, 'iq_recorder', None)
+            if recorder is not None:
+                # The recorder taps whatever actually reaches the radio
+                self.disconnect(self.radio_feed, (recorder, 0))
+                self.connect(feed, (recorder, 0))
+            self.radio_feed = feed
+            self.burst_gate = gate
+        finally:
+            self.unlock()
+
+    def get_payload(self):
+        if self.payload_source is None:
+            return None
+        return {'config': self.payload_source.config, 'stats': self.payload_source.stats()}
+
+    def set_payload(self, payload):
+        # Feed the symbol input from the built-in symbol source, or from an external payload
+        sink = self.symbol_input()
+        source = PayloadSource(self.bitsPerSym, payload, self.payload_port) if payload else None
+        previous = self.payload_source
+        self.lock()
+        try:
+            if previous is not None:
+                self.disconnect((previous, 0), sink)
+            else:
+                for edge in self.symbol_edges():
+                    self.disconnect(*edge)
+            if source is not None:
+                self.connect((source, 0), sink)
+            else:
+                for edge in self.symbol_edges():
+                    self.connect(*edge)
+            self.payload_source = source
+        finally:
+            self.unlock()
+        if previous is not None:
+            previous.close()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Concurrent USRP reachability probing using UHD's UDP discovery packets.
+
+Two discovery exchanges are sent to every address at once:
+
+  * USRP2/N2xx/X3xx firmware: a control packet with id 'a' (WAZZUP_BRO) on
+    UDP port 49152, answered with id 'A' (WAZZUP_DUDE)
+  * MPM devices (N3xx, E3xx, X4xx): "MPM-DISC" on UDP port 49600, answered
+    with a "USRP-MPM|..." string
+
+Run ``python -m apps.usrp_probe --standin`` to start a local responder that
+answers both, then ``python -m apps.usrp_probe 127.0.0.1`` to probe it.
+"""
+
+import argparse
+import asyncio
+import struct
+import time
+
+USRP2_CTRL_PORT = 49152
+MPM_DISCOVERY_PORT = 49600
+USRP2_FW_COMPAT_NUM = 12
+USRP2_CTRL_ID_WAZZUP_BRO = ord('a')
+USRP2_CTRL_ID_WAZZUP_DUDE = ord('A')
+USRP2_CTRL_PACKET_LEN = 36  # proto_ver, id, seq + the largest data union member
+MPM_DISCOVERY_REQUEST = b"MPM-DISC"
+MPM_DISCOVERY_REPLY = b"USRP-MPM"
+
+
+def usrp2_request(seq=0):
+    header = struct.pack(">III", USRP2_FW_COMPAT_NUM, USRP2_CTRL_ID_WAZZUP_BRO, seq)
+    return header.ljust(USRP2_CTRL_PACKET_LEN, b"\0")
+
+
+def is_usrp2_reply(data):
+    return len(data) >= 12 and struct.unpack(">I", data[4:8])[0] == USRP2_CTRL_ID_WAZZUP_DUDE
+
+
+def is_mpm_reply(data):
+    return data.startswith(MPM_DISCOVERY_REPLY)
+
+
+class _ProbeProtocol(asyncio.DatagramProtocol):
+    def __init__(self, request, is_reply, done):
+        self.request = request
+        self.is_reply = is_reply
+        self.done = done
+        self.sent = None
+
+    def connection_made(self, transport):
+        self.sent = time.perf_counter()
+        transport.sendto(self.request)
+
+    def datagram_received(self, data, addr):
+        if not self.done.done() and self.is_reply(data):
+            self.done.set_result(time.perf_counter() - self.sent)
+
+    def error_received(self, exc):
+        if not self.done.done():
+            self.done.set_exception(exc)
+
+
+async def _exchange(address, port, request, is_reply, timeout):
+    loop = asyncio.get_running_loop()
+    done = loop.create_future()
+    transport, _ = await loop.create_datagram_endpoint(
+        lambda: _ProbeProtocol(request, is_reply, done), remote_addr=(address, port))
+    try:
+        return await asyncio.wait_for(done, timeout)
+    finally:
+        transport.close()
+
+
+async def probe_address(address, timeout=1.0, usrp2_port=USRP2_CTRL_PORT, mpm_port=MPM_DISCOVERY_PORT):
+    """Probe one address and return a dict with its status and latency.
+
+    ``status`` is 'ok' when a USRP answered, 'refused' when the host answered
+    with ICMP port-unreachable (host is up, no USRP service), 'timeout' when
+    nothing came back and 'error' for anything else.
+    """
+    exchanges = {
+        'usrp2': _exchange(address, usrp2_port, usrp2_request(), is_usrp2_reply, timeout),
+        'mpm': _exchange(address, mpm_port, MPM_DISCOVERY_REQUEST, is_mpm_reply, timeout),
+    }
+    results = await asyncio.gather(*exchanges.values(), return_exceptions=True)
+    replies = [(latency, kind) for kind, latency in zip(exchanges, results)
+               if not isinstance(latency, BaseException)]
+    if replies:
+        latency, kind = min(replies)
+        return {'address': address, 'status': 'ok', 'latency': latency, 'device': kind}
+    if any(isinstance(r, ConnectionRefusedError) for r in results):
+        status = 'refused'
+    elif all(isinstance(r, asyncio.TimeoutError) for r in results):
+        status = 'timeout'
+    else:
+        status = 'error'
+    return {'address': address, 'status': status, 'latency': None, 'device': None}
+
+
+async def probe_addresses(addresses, timeout=1.0, **ports):
+    """Probe all ``addresses`` concurrently; results keep the input order"""
+    return await asyncio.gather(*(probe_address(a, timeout, **ports) for a in addresses))
+
+
+def probe_addresses_sync(addresses, timeout=1.0, **ports):
+    """Blocking wrapper around probe_addresses for use from worker threads"""
+    return asyncio.run(probe_addresses(addresses, timeout, **ports))
+
+
+def format_result(result):
+    if result['status'] == 'ok':
+        return f"reachable ({result['latency']*1e3:.1f} ms, {result['device']})"
+    return {'refused': "host up, no USRP", 'timeout': "no response"}.get(result['status'], "error")
+
+
+class StandInResponder(asyncio.DatagramProtocol):
+    """Answers both discovery requests like a USRP would, for local testing"""
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if data.startswith(MPM_DISCOVERY_REQUEST):
+            self.transport.sendto(MPM_DISCOVERY_REPLY + b"|type=n3xx,product=standin", addr)
+        elif len(data) >= 12 and struct.unpack(">I", data[4:8])[0] == USRP2_CTRL_ID_WAZZUP_BRO:
+            seq = data[8:12]
+            reply = struct.pack(">II", USRP2_FW_COMPAT_NUM, USRP2_CTRL_ID_WAZZUP_DUDE) + seq
+            self.transport.sendto(reply.ljust(USRP2_CTRL_PACKET_LEN, b"\0"), addr)
+
+
+async def serve_standin(host="127.0.0.1", usrp2_port=USRP2_CTRL_PORT, mpm_port=MPM_DISCOVERY_PORT):
+    """Start stand-in responders and return their transports"""
+    loop = asyncio.get_running_loop()
+    transports = []
+    for port in (usrp2_port, mpm_port):
+        transport, _ = await loop.create_datagram_endpoint(StandInResponder, local_addr=(host, port))
+        transports.append(transport)
+    return transports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Probe USRP addresses over UDP")
+    parser.add_argument('addresses', nargs='*')
+    parser.add_argument('--timeout', type=float, default=1.0)
+    parser.add_argument('--standin', action='store_true', help="run a local stand-in responder")
+    parser.add_argument('--usrp2-port', type=int, default=USRP2_CTRL_PORT)
+    parser.add_argument('--mpm-port', type=int, default=MPM_DISCOVERY_PORT)
+    args = parser.parse_args()
+    ports = {'usrp2_port': args.usrp2_port, 'mpm_port': args.mpm_port}
+
+    if args.standin:
+        async def serve():
+            await serve_standin(**ports)
+            print(f"Stand-in USRP answering on 127.0.0.1:{args.usrp2_port} and :{args.mpm_port}")
+            await asyncio.Event().wait()
+        asyncio.run(serve())
+        return
+
+    for result in probe_addresses_sync(args.addresses, args.timeout, **ports):
+        print(f"{result['address']:16} {format_result(result)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,8 @@
-import json
-import os
+import importlib
 from PyQt5 import Qt  #type: ignore
-from PyQt5.QtCore import QObject, QEvent  #type: ignore
+from PyQt5.QtCore import QObject, QEvent, pyqtSignal  #type: ignore
+
+from apps.settings_store import get_settings_store
 
 
 class DialogGeometryTracker(QObject):
@@ -27,6 +28,96 @@ class DialogGeometryTracker(QObject):
         return False
 
 
+class SettingsFollower(QObject):
+    """Calls ``callback(changed_keys)`` on the GUI thread while ``dialog`` is open.
+
+    Store listeners run on whichever thread wrote the change; the signal
+    carries it to the dialog's thread. The listener is removed when the
+    dialog finishes or is destroyed.
+    """
+    changed = pyqtSignal(object)
+
+    def __init__(self, dialog, callback, store=None):
+        super().__init__(dialog)
+        self.store = store or get_settings_store()
+        self.changed.connect(callback)
+        self.store.add_listener(self.on_settings_changed)
+        dialog.finished.connect(self.stop)
+        # This follower is deleted with the dialog, so do not rely on its slot
+        listener, store = self.on_settings_changed, self.store
+        dialog.destroyed.connect(lambda: store.remove_listener(listener))
+
+    def on_settings_changed(self, changed):
+        self.changed.emit(set(changed))
+
+    def stop(self):
+        self.store.remove_listener(self.on_settings_changed)
+
+
+def refresh_usrp_selector(dialog, changed):
+    """Repopulate an open ConfigDialog's USRP list after ip_addresses changed in Settings"""
+    if 'ip_addresses' not in changed or not hasattr(dialog, 'usrp_combo'):
+        return
+    index = dialog.usrp_combo.currentIndex()
+    selected = dialog.ipList[index] if 0 <= index < len(dialog.ipList) else None
+    dialog.ipList = get_settings_store().get('ip_addresses', [])
+    dialog.N = len(dialog.ipList)
+    ok_button = dialog.button_box.button(Qt.QDialogButtonBox.Ok)
+    dialog.usrp_combo.clear()
+    if not dialog.ipList:
+        dialog.usrp_combo.addItem("IP addr missing - Go to Settings")
+        ok_button.setEnabled(False)
+        opacity_effect = Qt.QGraphicsOpacityEffect()
+        opacity_effect.setOpacity(0.30)
+        ok_button.setGraphicsEffect(opacity_effect)
+    else:
+        for i, ip in enumerate(dialog.ipList):
+            dialog.usrp_combo.addItem(f"USRP {i+1} ({ip.strip()})")
+        if selected in dialog.ipList:
+            dialog.usrp_combo.setCurrentIndex(dialog.ipList.index(selected))
+        ok_button.setEnabled(True)
+        ok_button.setGraphicsEffect(None)
+
+
+class LazyModule:
+    """Stand-in for a module (or one of its attributes) that is imported on first use.
+
+    Apps declare their gnuradio dependencies with ``lazy_import`` so that
+    opening a ConfigDialog does not pay for DSP and radio driver modules, and a
+    flowgraph only loads the driver for the radio it actually opens.
+    """
+    def __init__(self, module_name, attr=None):
+        self._module_name = module_name
+        self._attr = attr
+        self._target = None
+
+    def _load(self):
+        if self._target is None:
+            target = importlib.import_module(self._module_name)
+            if self._attr:
+                target = getattr(target, self._attr)
+            self._target = target
+        return self._target
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self._load(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+    def __repr__(self):
+        name = f"{self._module_name}.{self._attr}" if self._attr else self._module_name
+        state = "loaded" if self._target is not None else "deferred"
+        return f"<LazyModule {name} ({state})>"
+
+
+def lazy_import(module_name, attr=None):
+    """Return a LazyModule for ``module_name`` (or ``module_name.attr``)"""
+    return LazyModule(module_name, attr)
+
+
 #This function is called to apply the theme to the launcher
 def apply_launcher_theme(widget):
     stylesheet = """
@@ -138,22 +229,5 @@ def apply_dark_theme(widget):
     widget.setStyleSheet(stylesheet)
 
 def read_settings():
-    """Read settings from window_settings.json and ensure required fields exist"""
-    settings_file = os.path.join("config", "window_settings.json")
-    settings = {'media_directory': '', 'ip_addresses': [], 'radio_type': 'hackrf'}
-    
-    try:
-        if os.path.exists(settings_file):
-            with open(settings_file) as f:
-                saved_settings = json.load(f)
-                settings.update(saved_settings)
-                
-                # If any defaults were missing, write them back
-                if 'media_directory' not in saved_settings or 'ip_addresses' not in saved_settings:
-                    with open(settings_file, 'w') as f:
-                        json.dump(settings, f, indent=4)
-                        
-    except Exception as e:
-        print(f"Error reading settings:", e)
-        
-    return settings
+    """Return the global settings (served from the shared in-memory SettingsStore)"""
+    return get_settings_store().all()
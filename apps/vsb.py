@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Vestigial-sideband channel building blocks for the NTSC transmitters.
+
+The channel is built with the visual carrier at 0 Hz:
+
+* ``vsb_taps`` - one complex band-pass filter passing the video from
+  ``VSB_LOW`` to ``VSB_HIGH`` around the carrier. It is the app's 2.475 MHz
+  low-pass with its taps modulated to the band, so it equals mixing down,
+  low-pass filtering and mixing back up without the two oscillators.
+* ``AuralModulator`` - generates the aural FM at a low rate (5x the audio
+  rate) and brings it up to the channel rate in short polyphase stages,
+  then moves it to ``AURAL_CARRIER`` with a rotator.
+* ``InterpolateShift`` - doubles the sample rate and moves 0 Hz to
+  ``shift`` in one stage: a rotator at the input rate followed by an
+  interpolating filter whose complex taps keep only the image of the
+  channel that lands at ``shift``.
+"""
+
+from fractions import Fraction
+from math import pi
+
+import numpy as np # type: ignore
+from gnuradio import gr # type: ignore
+
+from apps.utils import lazy_import
+
+analog = lazy_import('gnuradio.analog')
+blocks = lazy_import('gnuradio.blocks')
+filter = lazy_import('gnuradio.filter')
+window = lazy_import('gnuradio.fft', 'window')
+
+VSB_LOW = -0.75e6   # lower (vestigial) sideband edge, from the visual carrier
+VSB_HIGH = 4.2e6    # upper sideband edge
+AURAL_CARRIER = 4.5e6  # aural carrier above the visual carrier
+FM_DEVIATION = 25e3    # peak deviation of the aural FM (Hz per unit audio)
+AURAL_BANDWIDTH = 150e3  # kept around the aural carrier; Carson's rule gives 2*(25 + 21.6) kHz
+FM_INTERPOLATION = 5     # audio rate -> rate of the frequency modulator
+CHANNEL_LOW = -1.25e6  # 6 MHz channel edges, from the visual carrier
+CHANNEL_HIGH = 4.75e6
+EDGE_MARGIN = 0.25e6   # interpolator passband beyond the channel edges
+
+
+def vsb_taps(samp_rate, gain=1.0):
+    """Complex band-pass from VSB_LOW to VSB_HIGH, with the transition band of the app's low-pass"""
+    half = (VSB_HIGH - VSB_LOW) / 2
+    center = (VSB_HIGH + VSB_LOW) / 2
+    taps = np.array(filter.firdes.low_pass(gain, samp_rate, half, 300e3, window.WIN_HAMMING, 6.76))
+    k = np.arange(len(taps))
+    return [complex(t) for t in taps * np.exp(2j * pi * center / samp_rate * k)]
+
+
+def interpolate_shift_taps(samp_rate, shift, low=CHANNEL_LOW, high=CHANNEL_HIGH):
+    """2x interpolation taps passing [shift+low, shift+high] at 2*samp_rate and stopping the other image"""
+    half = (high - low) / 2
+    pass_edge = half + EDGE_MARGIN
+    stop_edge = samp_rate - half - EDGE_MARGIN  # where the other image of the channel begins
+    # A Kaiser design reaches its stopband well inside the nominal transition
+    # band, so ask for less than the gap to keep the image below -70 dB
+    taps = np.array(filter.firdes.low_pass(2, 2 * samp_rate, (pass_edge + stop_edge) / 2,
+                                           0.4 * (stop_edge - pass_edge), window.WIN_KAISER, 7.0))
+    k = np.arange(len(taps))
+    return [complex(t) for t in taps * np.exp(2j * pi * (shift + low + half) / (2 * samp_rate) * k)]
+
+
+class InterpolateShift(gr.hier_block2):
+    """Complex input at ``samp_rate`` to 2*``samp_rate``, with 0 Hz moved to ``shift``"""
+    def __init__(self, samp_rate, shift, low=CHANNEL_LOW, high=CHANNEL_HIGH):
+        gr.hier_block2.__init__(self, "interpolate_shift",
+                                gr.io_signature(1, 1, gr.sizeof_gr_complex),
+                                gr.io_signature(1, 1, gr.sizeof_gr_complex))
+        self.shift = shift
+        self.low = low
+        self.high = high
+        self.samp_rate = samp_rate
+        self.rotator = blocks.rotator_cc(self._phase_inc())
+        self.interpolator = filter.rational_resampler_ccc(
+                interpolation=2,
+                decimation=1,
+                taps=interpolate_shift_taps(samp_rate, shift, low, high),
+                fractional_bw=0)
+        self.connect(self, self.rotator, self.interpolator, self)
+
+    def _phase_inc(self):
+        # After 2x zero-stuffing a tone at f also appears at f - samp_rate; rotating
+        # by shift (mod samp_rate) puts one of those images exactly at shift
+        return 2 * pi * (self.shift % self.samp_rate) / self.samp_rate
+
+    def set_samp_rate(self, samp_rate):
+        self.samp_rate = samp_rate
+        self.rotator.set_phase_inc(self._phase_inc())
+        self.interpolator.set_taps(interpolate_shift_taps(samp_rate, self.shift, self.low, self.high))
+
+
+def _prime_factors(n):
+    factors, p = [], 2
+    while n > 1:
+        while n % p == 0:
+            factors.append(p)
+            n //= p
+        p += 1
+    return factors
+
+
+def aural_stages(fm_rate, samp_rate):
+    """[(interpolation, decimation, taps)] bringing the aural FM from fm_rate up to samp_rate.
+
+    One stage per prime factor of the rate ratio, smallest rates first; the
+    first stage also takes the decimation. Each stage passes
+    AURAL_BANDWIDTH and stops the images of its input.
+    """
+    ratio = Fraction(samp_rate / fm_rate).limit_denominator(1000)
+    factors = _prime_factors(ratio.numerator)
+    first = 1
+    while factors and first <= ratio.denominator:
+        first *= factors.pop(0)
+    if first <= ratio.denominator:
+        raise ValueError(f"Aural FM at {fm_rate/1e3:g} kHz cannot be interpolated to {samp_rate/1e6:g} Msps")
+    half = AURAL_BANDWIDTH / 2
+    stages, rate = [], fm_rate
+    for interpolation, decimation in [(first, ratio.denominator)] + [(f, 1) for f in factors]:
+        out_rate = rate * interpolation / decimation
+        stop = min(rate, out_rate) - half  # nearest image (or alias) of the band
+        # As for the interpolate-shift taps, ask for less than the gap to reach the stopband in it
+        taps = filter.firdes.low_pass(interpolation, rate * interpolation, (half + stop) / 2,
+                                      0.6 * (stop - half), window.WIN_KAISER, 7.0)
+        stages.append((interpolation, decimation, taps))
+        rate = out_rate
+    return stages
+
+
+def aural_macs(audio_rate, samp_rate):
+    """Real multiply-accumulates per output sample of AuralModulator, per stage"""
+    fm_rate = audio_rate * FM_INTERPOLATION
+    # Length of GR's default resampler design (fractional_bw 0.4, Kaiser beta 7)
+    audio_taps = len(filter.firdes.low_pass(FM_INTERPOLATION, FM_INTERPOLATION, 0.45, 0.1, window.WIN_KAISER, 7.0))
+    macs = [(f'audio x{FM_INTERPOLATION}', audio_taps / FM_INTERPOLATION * fm_rate / samp_rate)]
+    rate = fm_rate
+    for interpolation, decimation, taps in aural_stages(fm_rate, samp_rate):
+        rate = rate * interpolation / decimation
+        # complex samples through real taps: two MACs per tap
+        macs.append((f'FM x{interpolation}/{decimation}', 2 * len(taps) / interpolation * rate / samp_rate))
+    return macs
+
+
+class AuralModulator(gr.hier_block2):
+    """Float audio at ``audio_rate`` to the aural FM carrier at ``carrier``, complex at ``samp_rate``"""
+    def __init__(self, audio_rate, samp_rate, carrier=AURAL_CARRIER):
+        gr.hier_block2.__init__(self, "aural_modulator",
+                                gr.io_signature(1, 1, gr.sizeof_float),
+                                gr.io_signature(1, 1, gr.sizeof_gr_complex))
+        self.audio_rate = audio_rate
+        self.samp_rate = samp_rate
+        self.carrier = carrier
+        fm_rate = audio_rate * FM_INTERPOLATION
+        # GR's default design, as in the single-stage resampler this replaces: same audio bandwidth
+        self.audio_interpolator = filter.rational_resampler_fff(
+                interpolation=FM_INTERPOLATION,
+                decimation=1,
+                taps=[],
+                fractional_bw=0)
+        self.modulator = analog.frequency_modulator_fc(2 * pi * FM_DEVIATION / fm_rate)
+        self.stages = [filter.rational_resampler_ccf(interpolation=i, decimation=d, taps=taps, fractional_bw=0)
+                       for i, d, taps in aural_stages(fm_rate, samp_rate)]
+        self.rotator = blocks.rotator_cc(2 * pi * carrier / samp_rate)
+        self.connect(self, self.audio_interpolator, self.modulator, *self.stages, self.rotator, self)
+
+    def set_samp_rate(self, samp_rate):
+        stages = aural_stages(self.audio_rate * FM_INTERPOLATION, samp_rate)
+        if [(i, d) for i, d, _ in stages] != [(s.interpolation(), s.decimation()) for s in self.stages]:
+            raise ValueError(f"Aural FM stages for {samp_rate/1e6:g} Msps differ; rebuild the flowgraph")
+        self.samp_rate = samp_rate
+        for stage, (_, _, taps) in zip(self.stages, stages):
+            stage.set_taps(taps)
+        self.rotator.set_phase_inc(2 * pi * self.carrier / samp_rate)
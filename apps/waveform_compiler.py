@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Render an app's transmit signal to SigMF files, offline and unthrottled.
+
+The app's top block is built exactly as the launcher would build it, except
+that its radio driver is swapped for ``FileRadioSink``: a sink that writes
+the first N samples to ``.sigmf-data`` and remembers the sample rate and
+frequency the app programmed. Nothing paces the graph, so it runs as fast
+as the DSP allows. Parameters start from the app's saved dialog settings
+(``config/<app>_config.json``, through its ConfigDialog) or a JSON file of
+config values, with ``--set`` overrides; every ``--sweep`` combination
+becomes one job, and jobs run in parallel in a process pool::
+
+    python -m apps.waveform_compiler pskGenerator --seconds 2 \\
+        --sweep pskMode=1,2,3 --sweep symRate=50,100 --output renders
+
+Apps fed by a real-time input (network audio) still run at that input's
+pace.
+"""
+
+import argparse
+import concurrent.futures
+import datetime
+import importlib
+import inspect
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import types
+
+import numpy as np # type: ignore
+from gnuradio import gr # type: ignore
+
+from apps.iq_recorder import SIGMF_VERSION, app_parameters
+from apps.settings_store import atomic_write_json
+
+# Radio sink cpu format -> (input signature, SigMF datatype)
+SINK_FORMATS = {
+    'fc32': (np.complex64, 'cf32_le'),
+    'sc16': ((np.int16, 2), 'ci16_le'),
+}
+
+
+class StandInRadio:
+    """The soapy.sink setters and getters the apps call, recorded in ``settings``.
+
+    Mixed into blocks that take a radio sink's place; ``on_frequency`` is
+    called when the app retunes.
+    """
+    on_frequency = None
+
+    def set_sample_rate(self, channel, rate):
+        self.settings['sample_rate'] = float(rate)
+
+    def get_sample_rate(self, channel):
+        return self.settings.get('sample_rate', 0.0)
+
+    def set_frequency(self, channel, frequency):
+        self.settings['frequency'] = float(frequency)
+        if self.on_frequency:
+            self.on_frequency(float(frequency))
+
+    def get_frequency(self, channel):
+        return self.settings.get('frequency', 0.0)
+
+    def set_gain(self, channel, *args):
+        name = args[0] if len(args) > 1 else 'gain'
+        self.settings.setdefault('gains', {})[name] = args[-1]
+
+    def set_bandwidth(self, channel, bandwidth):
+        self.settings['bandwidth'] = float(bandwidth)
+
+
+class FileRadioSink(StandInRadio, gr.sync_block):
+    """Stands in for soapy.sink: writes ``count`` samples to ``path``.
+
+    Radio settings (``set_sample_rate``, ``set_frequency``, gains) are kept
+    in ``settings`` for the SigMF metadata. ``done`` is set once ``count``
+    samples have been written.
+    """
+    def __init__(self, path, count, cpu_format='fc32'):
+        sig, self.datatype = SINK_FORMATS[cpu_format]
+        gr.sync_block.__init__(self, name="file_radio_sink", in_sig=[sig], out_sig=None)
+        self.count = int(count)
+        self.written = 0
+        self.settings = {}
+        self.done = threading.Event()
+        self._file = open(path, 'wb')
+
+    def work(self, input_items, output_items):
+        samples = input_items[0][:self.count - self.written]
+        if len(samples):
+            self._file.write(memoryview(samples))
+            self.written += len(samples)
+            if self.written >= self.count:
+                self._file.flush()
+                self.done.set()
+        return len(input_items[0])
+
+    def close(self):
+        self._file.close()
+
+
+def top_block_class(module):
+    """The top block class an app's main() builds"""
+    return inspect.signature(module.main).parameters['top_block_cls'].default
+
+
+def default_values(module_name):
+    """Config values from the app's ConfigDialog with its saved settings"""
+    module = importlib.import_module(f"apps.{module_name}")
+    dialog = module.ConfigDialog()
+    values = dialog.get_values()
+    dialog.deleteLater()
+    return values
+
+
+def expand_jobs(module_name, base, sweeps):
+    """One (name, values) job per combination of the ``sweeps`` values"""
+    keys = list(sweeps)
+    jobs = []
+    for combo in itertools.product(*(sweeps[key] for key in keys)):
+        values = dict(base)
+        values.update(zip(keys, combo))
+        suffix = "".join(f"-{key}={value}" for key, value in zip(keys, combo))
+        jobs.append((f"{module_name}{suffix}".replace('/', '_'), values))
+    return jobs
+
+
+def _json_safe(values):
+    safe = {}
+    for key, value in values.items():
+        try:
+            json.dumps(value)
+        except (TypeError, ValueError):
+            value = str(value)
+        safe[key] = value
+    return safe
+
+
+# ----- worker process -----
+
+def _init_worker():
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5 import Qt # type: ignore
+    if Qt.QApplication.instance() is None:
+        _init_worker.app = Qt.QApplication([sys.argv[0]])
+
+
+def render(module_name, name, values, output_dir, seconds=None, samples=None, timeout=None):
+    """Build the app with a FileRadioSink, run it, and write ``name``.sigmf-*"""
+    _init_worker()
+    module = importlib.import_module(f"apps.{module_name}")
+    base = os.path.join(output_dir, name)
+    holder = {}
+
+    def make_sink(device, cpu_format, *args):
+        holder['sink'] = FileRadioSink(base + '.sigmf-data', 0, cpu_format)
+        return holder['sink']
+
+    module.soapy = types.SimpleNamespace(sink=make_sink)
+    values = dict(values, radio_type='hackrf')
+    tb = top_block_class(module)(values)
+    sink = holder['sink']
+    samp_rate = sink.get_sample_rate(0) or float(tb.samp_rate)
+    sink.count = int(samples) if samples else int(round(seconds * samp_rate))
+
+    started = datetime.datetime.now(datetime.timezone.utc)
+    wall = time.perf_counter()
+    tb.start()
+    finished = sink.done.wait(timeout)
+    tb.stop()
+    tb.wait()
+    wall = time.perf_counter() - wall
+    sink.close()
+    if not finished:
+        raise TimeoutError(f"only {sink.written} of {sink.count} samples rendered in {timeout} s")
+
+    capture = {'core:sample_start': 0, 'core:datetime': started.strftime("%Y-%m-%dT%H:%M:%S.%fZ")}
+    if 'frequency' in sink.settings:
+        capture['core:frequency'] = sink.settings['frequency']
+    atomic_write_json(base + '.sigmf-meta', {
+        'global': {
+            'core:datatype': sink.datatype,
+            'core:sample_rate': samp_rate,
+            'core:version': SIGMF_VERSION,
+            'core:recorder': 'gnuradio_launcher waveform_compiler',
+            'core:description': f"{module_name} transmit baseband, rendered offline",
+            'core:extensions': [{'name': 'launcher', 'version': '1.0.0', 'optional': True}],
+            'launcher:app': module_name,
+            'launcher:config_values': _json_safe(values),
+            'launcher:parameters': app_parameters(tb),
+        },
+        'captures': [capture],
+        'annotations': [],
+    })
+    for attr in ('payload_source', 'network_audio'):
+        block = getattr(tb, attr, None)
+        if block is not None and hasattr(block, 'close'):
+            block.close()
+    return {'name': name, 'samples': sink.written, 'samp_rate': samp_rate, 'wall': wall}
+
+
+def _render_job(args):
+    try:
+        return render(*args)
+    except Exception as e:
+        return {'name': args[1], 'error': str(e)}
+
+
+def compile_waveforms(module_name, jobs, output_dir, seconds=None, samples=None, workers=1, timeout=None):
+    """Render ``jobs`` ([(name, values)]) in a spawn-based process pool; yield results as they finish"""
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = [(module_name, name, values, output_dir, seconds, samples, timeout) for name, values in jobs]
+    # GNU Radio and Qt are not fork-safe, so every worker starts from a clean interpreter
+    context = multiprocessing.get_context('spawn')
+    with concurrent.futures.ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker) as pool:
+        futures = [pool.submit(_render_job, task) for task in tasks]
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
+
+
+def _parse_assignment(text):
+    key, sep, value = text.partition('=')
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected key=value, got '{text}'")
+    return key, value
+
+
+def _parse_value(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('app', help="app module in apps/, e.g. pskGenerator")
+    length = parser.add_mutually_exclusive_group()
+    length.add_argument('--seconds', type=float, default=1.0, help="signal length to render per job")
+    length.add_argument('--samples', type=int, help="samples to render per job")
+    parser.add_argument('--values', help="JSON file of config values (default: the app's saved dialog settings)")
+    parser.add_argument('--set', type=_parse_assignment, action='append', default=[], metavar='KEY=VALUE',
+                        help="override a config value (JSON or plain string)")
+    parser.add_argument('--sweep', type=_parse_assignment, action='append', default=[], metavar='KEY=V1,V2',
+                        help="render every listed value (combined with other sweeps)")
+    parser.add_argument('--output', default='renders', help="output directory")
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument('--timeout', type=float, default=600.0, help="seconds allowed per job")
+    args = parser.parse_args(argv)
+
+    if args.values:
+        with open(args.values) as f:
+            base = json.load(f)
+    else:
+        _init_worker()
+        base = default_values(args.app)
+    base.update((key, _parse_value(value)) for key, value in args.set)
+    sweeps = {key: [_parse_value(v) for v in value.split(',')] for key, value in args.sweep}
+    jobs = expand_jobs(args.app, base, sweeps)
+
+    print(f"Rendering {len(jobs)} job(s) of {args.app} with {min(args.workers, len(jobs))} worker(s)")
+    failed = 0
+    wall = time.perf_counter()
+    for result in compile_waveforms(args.app, jobs, args.output, None if args.samples else args.seconds,
+                                    args.samples, args.workers, args.timeout):
+        if 'error' in result:
+            failed += 1
+            print(f"Error rendering {result['name']}: {result['error']}")
+            continue
+        duration = result['samples'] / result['samp_rate']
+        print(f"{result['name']}: {result['samples']} samples ({duration:.2f} s at "
+              f"{result['samp_rate'] / 1e6:g} Msps) in {result['wall']:.2f} s, "
+              f"{duration / result['wall']:.1f}x real time")
+    print(f"Done in {time.perf_counter() - wall:.1f} s, {len(jobs) - failed} written to {args.output}/")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Measure how long each app module takes to import.
+
+Every app is imported in a fresh interpreter, the same way the launcher does
+before showing its ConfigDialog. The script then reports:
+
+  * import   - time to import the app module (gnuradio DSP/driver modules deferred)
+  * deferred - extra time to import the gnuradio modules the app declares lazily,
+               i.e. what every click used to pay before they were deferred
+  * loaded   - gnuradio submodules actually present after the app import
+
+Run from the repository root:
+
+    python benchmarks/app_import_time.py [app ...]
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r"""
+import json, sys, time
+sys.path.insert(0, {root!r})
+t0 = time.perf_counter()
+import gnuradio.gr
+t1 = time.perf_counter()
+module = __import__('apps.{name}', fromlist=['ConfigDialog'])
+t2 = time.perf_counter()
+from apps.utils import LazyModule
+loaded = sorted(m for m in sys.modules if m.startswith('gnuradio.'))
+deferred = [v for v in vars(module).values() if isinstance(v, LazyModule)]
+for proxy in deferred:
+    proxy._load()
+t3 = time.perf_counter()
+print(json.dumps({{'gr': t1 - t0, 'import': t2 - t1, 'deferred': t3 - t2, 'loaded': loaded}}))
+"""
+
+
+def app_names():
+    sys.path.insert(0, REPO_ROOT)
+    from apps.app_index import build_app_index
+    return [m['module'] for m in build_app_index(os.path.join(REPO_ROOT, 'apps'))]
+
+
+def measure(name):
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE.format(root=REPO_ROOT, name=name)],
+        cwd=REPO_ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv):
+    names = argv or app_names()
+    print(f"{'app':32} {'import':>10} {'deferred':>10}  loaded")
+    total_import = total_deferred = 0.0
+    for name in names:
+        try:
+            r = measure(name)
+        except Exception as e:
+            print(f"{name:32} error: {e}")
+            continue
+        total_import += r['import']
+        total_deferred += r['deferred']
+        loaded = ', '.join(m.split('.', 1)[1] for m in r['loaded'] if m.count('.') == 1)
+        print(f"{name:32} {r['import']*1e3:8.1f}ms {r['deferred']*1e3:8.1f}ms  {loaded}")
+    print(f"{'total':32} {total_import*1e3:8.1f}ms {total_deferred*1e3:8.1f}ms")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
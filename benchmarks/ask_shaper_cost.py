@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Compare the ASK shapers: float chain + float_to_complex vs one symbol-rate stage.
+
+The old askGenerator chain repeated each symbol to 10 Msps, mapped it to a
+level, ran fft_filter_fff with the RRC taps, added the carrier offset and
+paired the result with a null_source in float_to_complex before scaling.
+apps/ask_shaper.py does all of that in one polyphase stage at the symbol
+rate. For each samples-per-symbol value, with the filter on and off, the
+script checks that both produce the same samples and reports CPU seconds
+per second of 10 Msps output.
+
+Run from the repository root (needs GNU Radio, no radio hardware):
+
+    python benchmarks/ask_shaper_cost.py [--seconds 2] [--bits 2] [--carrier 1] [--sps 20 100 1000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np # type: ignore
+from gnuradio import blocks, filter, gr # type: ignore
+from gnuradio.filter import firdes # type: ignore
+
+from apps.ask_shaper import AskShaper
+
+SAMP_RATE = 10e6
+ALPHA = 0.35
+GAIN = 0.475
+CHECK_SYMBOLS = 2000
+
+
+class Shaper(gr.top_block):
+    def __init__(self, bitsPerSym, sps, shaped, carrier, samples, single_stage, sink=None):
+        gr.top_block.__init__(self, "ask_shaper_cost")
+        taps = firdes.root_raised_cosine(1, SAMP_RATE, SAMP_RATE/sps, ALPHA, 11*sps)
+        symbols = np.random.default_rng(1).integers(0, 2**bitsPerSym, CHECK_SYMBOLS).tolist()
+        source = blocks.vector_source_b(symbols, True)
+        self.sink = sink or blocks.null_sink(gr.sizeof_gr_complex)
+        head = blocks.head(gr.sizeof_gr_complex, samples)
+        if single_stage:
+            shaper = AskShaper(bitsPerSym, sps, taps if shaped else None, carrier, GAIN)
+            self.connect(source, shaper, head, self.sink)
+            self.connect((shaper, 1), blocks.null_sink(gr.sizeof_float))
+        else:
+            chain = [blocks.repeat(gr.sizeof_char, sps), blocks.uchar_to_float(),
+                     blocks.multiply_const_ff(1/(2**bitsPerSym-1)), blocks.add_const_ff(-0.5)]
+            if shaped:
+                chain.append(filter.fft_filter_fff(1, taps, 1))
+            to_complex = blocks.float_to_complex(1)
+            self.connect(blocks.null_source(gr.sizeof_float), (to_complex, 1))
+            self.connect(source, *chain, blocks.add_const_ff(carrier), to_complex,
+                         blocks.multiply_const_cc(GAIN), head, self.sink)
+
+
+def run(bitsPerSym, sps, shaped, carrier, samples, single_stage):
+    tb = Shaper(bitsPerSym, sps, shaped, carrier, samples, single_stage)
+    cpu = time.process_time()
+    tb.run()
+    return time.process_time() - cpu
+
+
+def output(bitsPerSym, sps, shaped, carrier, single_stage):
+    tb = Shaper(bitsPerSym, sps, shaped, carrier, CHECK_SYMBOLS * sps, single_stage, blocks.vector_sink_c())
+    tb.run()
+    return np.array(tb.sink.data())
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=2.0, help="seconds of 10 Msps output per run")
+    parser.add_argument('--bits', type=int, default=2, choices=[1, 2, 3], help="bits per symbol")
+    parser.add_argument('--carrier', type=int, default=1, choices=[0, 1], help="carrier offset")
+    parser.add_argument('--sps', type=int, nargs='+', default=[20, 100, 1000], help="samples per symbol")
+    args = parser.parse_args(argv)
+    samples = int(args.seconds * SAMP_RATE)
+
+    print(f"{'sps':>5} {'filter':>6} {'max error':>10} {'chain':>8} {'shaper':>8} {'speedup':>8}   "
+          f"({2**args.bits}ASK, CPU s per output s)")
+    for sps in args.sps:
+        for shaped in (False, True):
+            error = np.max(np.abs(output(args.bits, sps, shaped, args.carrier, False)
+                                  - output(args.bits, sps, shaped, args.carrier, True)))
+            old = run(args.bits, sps, shaped, args.carrier, samples, False) / args.seconds
+            new = run(args.bits, sps, shaped, args.carrier, samples, True) / args.seconds
+            print(f"{sps:5d} {'on' if shaped else 'off':>6} {error:10.2e} {old:8.3f} {new:8.3f} {old / new:7.1f}x")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Compare the NTSC aural FM paths: one 625/3 resampler vs FM at 240 kHz plus short stages.
+
+The old ntscAnalogVideoRecorded path resampled the 48 kHz audio straight
+to 10 Msps with rational_resampler_fff(625, 3) and its default taps, then
+ran analog.frequency_modulator_fc at 10 Msps. apps/vsb.py's
+AuralModulator interpolates the audio 5x, modulates at 240 kHz and brings
+the complex FM up in stages of 5/3, 5 and 5 before a rotator puts it at
+4.5 MHz. The script prints the filter multiply-accumulates per output
+sample of both, checks that the peak deviation for audio tones is the
+same, and reports CPU seconds per second of 10 Msps output.
+
+Run from the repository root (needs GNU Radio, no radio hardware):
+
+    python benchmarks/aural_fm_cost.py [--seconds 5] [--tones 1000 10000 15000 19000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from math import pi
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np # type: ignore
+from gnuradio import analog, blocks, filter, gr # type: ignore
+from gnuradio.fft import window # type: ignore
+
+from apps.vsb import AURAL_CARRIER, FM_DEVIATION, AuralModulator, aural_macs
+
+SAMP_RATE = 10e6
+AUDIO_RATE = 48e3
+AMPLITUDE = 0.9
+CHECK_SAMPLES = 2000000
+
+
+class Aural(gr.top_block):
+    def __init__(self, tone, samples, staged, sink=None):
+        gr.top_block.__init__(self, "aural_fm_cost")
+        audio = AMPLITUDE * np.sin(2 * pi * tone * np.arange(480) / AUDIO_RATE)
+        source = blocks.vector_source_f(audio.tolist(), True)
+        self.sink = sink or blocks.null_sink(gr.sizeof_gr_complex)
+        head = blocks.head(gr.sizeof_gr_complex, samples)
+        if staged:
+            self.connect(source, AuralModulator(AUDIO_RATE, SAMP_RATE), head, self.sink)
+        else:
+            resampler = filter.rational_resampler_fff(interpolation=625, decimation=3, taps=[], fractional_bw=0)
+            self.connect(source, resampler, blocks.add_const_ff(AURAL_CARRIER / FM_DEVIATION),
+                         analog.frequency_modulator_fc(2*pi*FM_DEVIATION/SAMP_RATE), head, self.sink)
+
+
+def run(samples, staged):
+    tb = Aural(1e3, samples, staged)
+    cpu = time.process_time()
+    tb.run()
+    return time.process_time() - cpu
+
+
+def deviation(tone, staged):
+    """Amplitude of the demodulated tone, in Hz, past the filter start-up"""
+    tb = Aural(tone, CHECK_SAMPLES, staged, blocks.vector_sink_c())
+    tb.run()
+    x = np.array(tb.sink.data())[CHECK_SAMPLES // 4:]
+    frequency = np.angle(x[1:] * np.conj(x[:-1])) * SAMP_RATE / (2 * pi) - AURAL_CARRIER
+    t = 2 * pi * tone / SAMP_RATE * np.arange(len(frequency))
+    fit = np.linalg.lstsq(np.stack([np.sin(t), np.cos(t)], 1), frequency, rcond=None)[0]
+    return np.hypot(*fit)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5.0, help="seconds of 10 Msps output per run")
+    parser.add_argument('--tones', type=float, nargs='+', default=[1e3, 10e3, 15e3, 19e3], help="audio tones (Hz)")
+    args = parser.parse_args(argv)
+    samples = int(args.seconds * SAMP_RATE)
+
+    # GR's default design for the 625/3 resampler (fractional_bw 0.4, Kaiser beta 7)
+    single = len(filter.firdes.low_pass(625, 625, 0.45, 0.1, window.WIN_KAISER, 7.0)) / 625
+    staged = aural_macs(AUDIO_RATE, SAMP_RATE)
+    print("filter MACs per 10 Msps output sample")
+    print(f"  625/3 resampler (then FM at 10 Msps)  {single:6.2f}")
+    for name, macs in staged:
+        print(f"  {name:<36} {macs:6.2f}")
+    print(f"  staged total (then rotator at 10 Msps) {sum(m for _, m in staged):5.2f}")
+
+    print(f"{'tone':>8} {'deviation single':>17} {'staged':>8}   (kHz, audio amplitude {AMPLITUDE})")
+    for tone in args.tones:
+        print(f"{tone/1e3:6.1f}k {deviation(tone, False)/1e3:17.3f} {deviation(tone, True)/1e3:8.3f}")
+
+    old = run(samples, False) / args.seconds
+    new = run(samples, True) / args.seconds
+    print(f"CPU s per output s: single stage {old:.3f}, staged {new:.3f} ({old / new:.1f}x)")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
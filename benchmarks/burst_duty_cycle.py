@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Measure CPU use of a PSK transmit chain in burst mode versus continuous.
+
+The flowgraph mirrors pskGenerator (glfsr source, symbol packing, phase
+modulator, RRC filter, scaling) feeding a throttle and a null sink in place
+of the radio. It runs once without a BurstGate and once per duty cycle
+with one, and reports process CPU time per wall-clock second. Between
+bursts the gate consumes nothing, so CPU should fall roughly in proportion
+to the duty cycle.
+
+Run from the repository root (needs GNU Radio, no radio hardware):
+
+    python benchmarks/burst_duty_cycle.py [--seconds 5] [--samp-rate 5e6] [--fill]
+
+``--fill`` uses the HackRF behaviour (zeros streamed between bursts).
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from gnuradio import analog, blocks, digital, filter, gr # type: ignore
+from gnuradio.filter import firdes # type: ignore
+
+from apps.burst_gate import BurstGate
+
+DUTY_CYCLES = [0.5, 0.25, 0.1, 0.02]
+PERIOD = 0.1  # seconds between burst starts
+
+
+class PskChain(gr.top_block):
+    def __init__(self, samp_rate, burst=None, fill_idle=False, sym_rate=100e3, bits_per_sym=2):
+        gr.top_block.__init__(self, "burst_duty_cycle")
+        sps = int(samp_rate / sym_rate)
+        self.source = digital.glfsr_source_b(32, True, 0, 1)
+        self.pack = blocks.pack_k_bits_bb(bits_per_sym)
+        self.to_float = blocks.uchar_to_float()
+        self.repeat = blocks.repeat(gr.sizeof_float, sps)
+        self.modulator = analog.phase_modulator_fc(2 * math.pi / 2 ** bits_per_sym)
+        self.rrc = filter.fft_filter_ccc(1, firdes.root_raised_cosine(1, samp_rate, sym_rate, 0.35, 11 * sps))
+        self.scale = blocks.multiply_const_cc(0.9 / math.sqrt(2))
+        self.throttle = blocks.throttle(gr.sizeof_gr_complex, samp_rate, True)
+        self.sink = blocks.null_sink(gr.sizeof_gr_complex)
+        self.connect(self.source, self.pack, self.to_float, self.repeat, self.modulator, self.rrc, self.scale)
+        self.gate = None
+        if burst:
+            self.gate = BurstGate(samp_rate, burst, fill_idle=fill_idle)
+            self.connect(self.scale, self.gate, self.throttle)
+        else:
+            self.connect(self.scale, self.throttle)
+        self.connect(self.throttle, self.sink)
+
+
+def measure(samp_rate, seconds, burst=None, fill_idle=False):
+    tb = PskChain(samp_rate, burst, fill_idle)
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    tb.start()
+    time.sleep(seconds)
+    tb.stop()
+    tb.wait()
+    cpu, wall = time.process_time() - cpu0, time.perf_counter() - wall0
+    stats = tb.gate.stats() if tb.gate else None
+    return cpu / wall, stats
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--samp-rate', type=float, default=5e6)
+    parser.add_argument('--fill', action='store_true', help="stream zeros between bursts (HackRF)")
+    args = parser.parse_args(argv)
+
+    baseline, _ = measure(args.samp_rate, args.seconds)
+    print(f"{'mode':>12} {'duty':>7} {'measured':>9} {'cpu':>7} {'relative':>9}")
+    print(f"{'continuous':>12} {1.0:7.0%} {1.0:9.0%} {baseline:7.2f} {1.0:9.2f}")
+    for duty in DUTY_CYCLES:
+        plan = {'burst': duty * PERIOD, 'period': PERIOD}
+        cpu, stats = measure(args.samp_rate, args.seconds, plan, args.fill)
+        print(f"{'burst':>12} {duty:7.0%} {stats['duty_cycle']:9.1%} {cpu:7.2f} {cpu / baseline:9.2f}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Compare the CPU cost per channel of the filterbank channel combiner.
+
+N noise sources at the channel rate (where the combiner runs the PSK, ASK
+and FSK generators) are placed at different offsets in a 20 Msps stream
+two ways: with ChannelSynthesizer (low-rate rotator, shared polyphase
+synthesis filterbank) and naively (resample each channel to 20 Msps, mix
+at full rate, add at full rate). Both run unthrottled into a null sink for
+a fixed number of output samples. The script reports CPU seconds per
+second of output and the marginal cost of each added channel.
+
+Run from the repository root (needs GNU Radio, no radio hardware):
+
+    python benchmarks/channel_synthesizer_cost.py [--seconds 2] [--channels 8]
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from gnuradio import analog, blocks, filter, gr # type: ignore
+
+from apps.channel_synthesizer import ChannelSynthesizer
+
+OUT_RATE = 20e6
+BANDWIDTH = 1e6  # occupied bandwidth per signal, within the +/-0.75 MHz flat passband at 8 bins
+CHANNEL_COUNTS = [1, 2, 4, 6]
+
+
+def offsets(count, channels):
+    spacing = OUT_RATE / channels
+    # Distinct bins either side of center, each with a residual offset
+    return [((i // 2 + 1) * (-1) ** i) * spacing + 150e3 for i in range(count)]
+
+
+class Combine(gr.top_block):
+    def __init__(self, count, channels, seconds, naive=False):
+        gr.top_block.__init__(self, "channel_synthesizer_cost")
+        channel_rate = OUT_RATE / channels
+        self.sources = [analog.fastnoise_source_c(analog.GR_GAUSSIAN, 0.1, i, 8192) for i in range(count)]
+        self.head = blocks.head(gr.sizeof_gr_complex, int(seconds * OUT_RATE))
+        self.sink = blocks.null_sink(gr.sizeof_gr_complex)
+        if naive:
+            adder = blocks.add_vcc(1)
+            for i, (source, offset) in enumerate(zip(self.sources, offsets(count, channels))):
+                resampler = filter.rational_resampler_ccc(interpolation=channels, decimation=1,
+                                                          taps=[], fractional_bw=0)
+                rotator = blocks.rotator_cc(2 * math.pi * offset / OUT_RATE)
+                self.connect(source, resampler, rotator, (adder, i))
+            self.connect(adder, self.head, self.sink)
+        else:
+            synthesizer = ChannelSynthesizer([channel_rate] * count, offsets(count, channels), OUT_RATE,
+                                             [BANDWIDTH] * count, channels)
+            for i, source in enumerate(self.sources):
+                self.connect(source, (synthesizer, i))
+            self.connect(synthesizer, self.head, self.sink)
+
+
+def measure(count, channels, seconds, naive):
+    tb = Combine(count, channels, seconds, naive)
+    cpu = time.process_time()
+    tb.run()
+    return (time.process_time() - cpu) / seconds
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=2.0, help="seconds of 20 Msps output per run")
+    parser.add_argument('--channels', type=int, default=8, help="filterbank bins")
+    args = parser.parse_args(argv)
+
+    print(f"{'signals':>7} {'filterbank':>11} {'naive':>7}   (CPU s per output s)")
+    previous = None
+    for count in CHANNEL_COUNTS:
+        pfb = measure(count, args.channels, args.seconds, False)
+        naive = measure(count, args.channels, args.seconds, True)
+        print(f"{count:7d} {pfb:11.2f} {naive:7.2f}")
+        previous = previous or (count, pfb, naive)
+    first_count, first_pfb, first_naive = previous
+    extra = CHANNEL_COUNTS[-1] - first_count
+    print(f"Marginal cost per added signal: filterbank {(pfb - first_pfb) / extra:.3f}, "
+          f"naive {(naive - first_naive) / extra:.3f} CPU s/s")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
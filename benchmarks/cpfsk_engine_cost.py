@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Compare the FSK engines: per-sample Gaussian FIR vs symbol-rate CPFSK tables.
+
+The old fskGenerator chain repeated each symbol ``sps`` times, mapped it to
+a level, ran a ``2*sps``-tap Gaussian FIR at 5 Msps and then
+analog.frequency_modulator_fc. apps/cpfsk.py looks up a precomputed phase
+trajectory per symbol instead. For each samples-per-symbol value the script
+checks that both produce the same instantaneous frequency and reports CPU
+seconds per second of 5 Msps output; the FIR cost grows with sps, the
+table engine's should not.
+
+Run from the repository root (needs GNU Radio, no radio hardware):
+
+    python benchmarks/cpfsk_engine_cost.py [--seconds 2] [--bits 3] [--bt 0.5] [--sps 10 50 250 1000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from math import pi
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np # type: ignore
+from gnuradio import analog, blocks, filter, gr # type: ignore
+
+from apps.cpfsk import CpfskModulator
+
+SAMP_RATE = 5e6
+EXCURSION = 100  # kHz
+CHECK_SYMBOLS = 2000
+
+
+class Engine(gr.top_block):
+    def __init__(self, bitsPerSym, sps, BT, samples, table, sink=None):
+        gr.top_block.__init__(self, "cpfsk_engine_cost")
+        sensitivity = EXCURSION*2000*pi/SAMP_RATE
+        symbols = np.random.default_rng(1).integers(0, 2**bitsPerSym, CHECK_SYMBOLS).tolist()
+        source = blocks.vector_source_b(symbols, True)
+        self.sink = sink or blocks.null_sink(gr.sizeof_gr_complex)
+        head = blocks.head(gr.sizeof_gr_complex, samples)
+        if table:
+            modulator = CpfskModulator(bitsPerSym, sps, sensitivity, BT)
+            self.connect(source, modulator, head, self.sink)
+            self.connect((modulator, 1), blocks.null_sink(gr.sizeof_float))
+        else:
+            fir = filter.fir_filter_fff(1, filter.firdes.gaussian(1, sps, BT, int(2*sps)))
+            self.connect(source, blocks.repeat(gr.sizeof_char, sps), blocks.uchar_to_float(),
+                         blocks.multiply_const_ff(1/(2**bitsPerSym-1)), blocks.add_const_ff(-0.5), fir,
+                         analog.frequency_modulator_fc(sensitivity), head, self.sink)
+
+
+def run(bitsPerSym, sps, BT, samples, table):
+    tb = Engine(bitsPerSym, sps, BT, samples, table)
+    cpu = time.process_time()
+    tb.run()
+    return time.process_time() - cpu
+
+
+def frequency(bitsPerSym, sps, BT, table):
+    tb = Engine(bitsPerSym, sps, BT, CHECK_SYMBOLS * sps, table, blocks.vector_sink_c())
+    tb.run()
+    x = np.array(tb.sink.data())[3*sps:]  # past the filter start-up
+    return np.angle(x[1:] * np.conj(x[:-1]))
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=2.0, help="seconds of 5 Msps output per run")
+    parser.add_argument('--bits', type=int, default=3, choices=[1, 2, 3], help="bits per symbol")
+    parser.add_argument('--bt', type=float, default=0.5, help="Gaussian BT product")
+    parser.add_argument('--sps', type=int, nargs='+', default=[10, 50, 250, 1000], help="samples per symbol")
+    args = parser.parse_args(argv)
+    samples = int(args.seconds * SAMP_RATE)
+
+    print(f"{'sps':>5} {'sym rate':>9} {'max error':>10} {'FIR':>8} {'table':>8} {'speedup':>8}   "
+          f"({2**args.bits}FSK, BT {args.bt}, CPU s per output s)")
+    for sps in args.sps:
+        error = np.max(np.abs(frequency(args.bits, sps, args.bt, False) - frequency(args.bits, sps, args.bt, True)))
+        old = run(args.bits, sps, args.bt, samples, False) / args.seconds
+        new = run(args.bits, sps, args.bt, samples, True) / args.seconds
+        print(f"{sps:5d} {SAMP_RATE/sps/1e3:6.1f} kHz {error:10.2e} {old:8.3f} {new:8.3f} {old / new:7.1f}x")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Report what the graph optimizer folds in each app and the CPU it saves.
+
+Every app in APPS is built from its saved dialog settings twice, with and
+without apps/graph_optimizer.py, its radio replaced by a sink that counts
+samples. Each build runs unthrottled until ``--seconds`` of output reached
+the sink; the script prints the block count and CPU seconds per second of
+output for both, and the speedup.
+
+Run from the repository root (needs GNU Radio and PyQt5, no radio hardware):
+
+    python benchmarks/graph_optimizer_speedup.py [--seconds 5] [apps ...]
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import threading
+import time
+import types
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from gnuradio import gr # type: ignore
+from PyQt5 import Qt # type: ignore
+
+from apps.graph_optimizer import optimize_graph, recording_connections
+from apps.waveform_compiler import SINK_FORMATS, StandInRadio, default_values, top_block_class
+
+APPS = ['amSineGenerator', 'askGenerator', 'fskGenerator', 'pskGenerator']
+
+
+class CountingSink(StandInRadio, gr.sync_block):
+    """Stands in for soapy.sink; sets ``done`` after ``count`` samples"""
+    def __init__(self, device, cpu_format='fc32', *args):
+        gr.sync_block.__init__(self, name="counting_sink", in_sig=[SINK_FORMATS[cpu_format][0]], out_sig=None)
+        self.settings = {}
+        self.count = 0
+        self.received = 0
+        self.done = threading.Event()
+
+    def work(self, input_items, output_items):
+        self.received += len(input_items[0])
+        if self.count and self.received >= self.count:
+            self.done.set()
+        return len(input_items[0])
+
+
+def measure(name, values, seconds, optimize):
+    module = importlib.import_module(f"apps.{name}")
+    holder = {}
+
+    def make_sink(*args):
+        holder['sink'] = CountingSink(*args)
+        return holder['sink']
+
+    module.soapy = types.SimpleNamespace(sink=make_sink)
+    tb = recording_connections(top_block_class(module))(dict(values, radio_type='hackrf'))
+    report = optimize_graph(tb) if optimize else None
+    blocks = len({id(b) for e in tb.recorded_edges for b in (e[0], e[2])})
+    sink = holder['sink']
+    sink.count = int(seconds * tb.samp_rate)
+
+    cpu = time.process_time()
+    tb.start()
+    sink.done.wait(600)
+    cpu = time.process_time() - cpu
+    tb.stop()
+    tb.wait()
+    return blocks, cpu / seconds, report
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('apps', nargs='*', default=APPS)
+    parser.add_argument('--seconds', type=float, default=5.0, help="seconds of output per run")
+    args = parser.parse_args(argv)
+
+    app = Qt.QApplication([sys.argv[0]])
+    print(f"{'app':<18} {'blocks':>13} {'CPU s/s':>15} {'speedup':>8}")
+    for name in args.apps:
+        values = default_values(name)
+        blocks, cpu, _ = measure(name, values, args.seconds, False)
+        fused_blocks, fused_cpu, report = measure(name, values, args.seconds, True)
+        print(f"{name:<18} {blocks:5d} -> {fused_blocks:<5d} {cpu:6.2f} -> {fused_cpu:<6.2f} {cpu / fused_cpu:7.2f}x")
+        for run in report['runs']:
+            print(f"    {' -> '.join(run['blocks'])}")
+        if not report['runs']:
+            print("    nothing to fold")
+    app.quit()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
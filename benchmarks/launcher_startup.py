@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Measure the launcher's time to first paint and the icon pipeline's share of it.
+
+Each measurement starts a fresh interpreter (offscreen Qt platform unless a
+display is requested) and times GNURadioLauncher construction until the first
+paint has been processed:
+
+  * cold - icon cache emptied first, so every icon is decoded and processed
+  * warm - icons come straight from config/icon_cache
+
+The pre-cache per-pixel Python loop for icons/settings.png is also timed on its
+own, for comparison with the vectorized transform.
+
+Run from the repository root:
+
+    python benchmarks/launcher_startup.py [--runs N] [--display]
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r"""
+import sys, time
+sys.path.insert(0, {root!r})
+from PyQt5.QtWidgets import QApplication
+app = QApplication(sys.argv)
+from gnuradio_launcher import GNURadioLauncher
+t0 = time.perf_counter()
+launcher = GNURadioLauncher(app)
+launcher.show()
+app.processEvents()
+launcher.repaint()
+t1 = time.perf_counter()
+print(t1 - t0)
+"""
+
+
+def first_paint(env):
+    result = subprocess.run([sys.executable, '-c', PROBE.format(root=REPO_ROOT)],
+                            cwd=REPO_ROOT, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def legacy_settings_icon(path, threshold=100):
+    """The per-pixel loop the launcher ran on every start before the icon cache"""
+    import io
+    from PIL import Image, ImageEnhance # type: ignore
+    img = ImageEnhance.Brightness(Image.open(path).convert("RGBA")).enhance(1.1)
+    new_data = []
+    for item in img.getdata():
+        if item[0] >= threshold and item[1] >= threshold and item[2] >= threshold:
+            new_data.append((255, 255, 255, 0))
+        else:
+            new_data.append(item)
+    img.putdata(new_data)
+    buffer = io.BytesIO()
+    img.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+_qt_app = None
+
+
+def vectorized_settings_icon(path):
+    global _qt_app
+    sys.path.insert(0, REPO_ROOT)
+    from PyQt5.QtGui import QGuiApplication # type: ignore
+    _qt_app = QGuiApplication.instance() or QGuiApplication([])
+    from apps.icon_cache import transparent_light_pixels
+    return transparent_light_pixels(path)
+
+
+def timed(func, *args, runs=5):
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        func(*args)
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--display', action='store_true', help="use the real display")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if not args.display:
+        env['QT_QPA_PLATFORM'] = 'offscreen'
+        os.environ['QT_QPA_PLATFORM'] = 'offscreen'
+    cache_dir = os.path.join(REPO_ROOT, 'config', 'icon_cache')
+
+    cold, warm = [], []
+    for _ in range(args.runs):
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        cold.append(first_paint(env))
+        warm.append(first_paint(env))
+
+    icon = os.path.join(REPO_ROOT, 'icons', 'settings.png')
+    legacy = timed(legacy_settings_icon, icon, runs=args.runs)
+    vectorized = timed(vectorized_settings_icon, icon, runs=args.runs)
+
+    cold_ms, warm_ms = statistics.median(cold) * 1e3, statistics.median(warm) * 1e3
+    print(f"first paint, cold icon cache : {cold_ms:8.1f} ms")
+    print(f"first paint, warm icon cache : {warm_ms:8.1f} ms  (saves {cold_ms - warm_ms:.1f} ms)")
+    print(f"settings icon, per-pixel loop: {legacy * 1e3:8.1f} ms")
+    print(f"settings icon, vectorized    : {vectorized * 1e3:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
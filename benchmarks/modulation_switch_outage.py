@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Measure the transmit outage of a live modulation-order change.
+
+Each digital generator (pskGenerator, askGenerator, fskGenerator) is built
+from its saved dialog settings with its radio replaced by a sink that
+timestamps every work() call. The graph runs unthrottled; the outage of a
+change is the longest gap between sink calls around it, i.e. how long the
+radio would be starved. For comparison the script also times what a change
+used to cost without the radio: building the flowgraph again and running
+it until the first sample reaches the sink (reopening the radio adds to
+that).
+
+Run from the repository root (needs GNU Radio and PyQt5, no radio hardware):
+
+    python benchmarks/modulation_switch_outage.py [--switches 20]
+"""
+
+import argparse
+import importlib
+import os
+import statistics
+import sys
+import threading
+import time
+import types
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from gnuradio import gr # type: ignore
+from PyQt5 import Qt # type: ignore
+
+from apps.waveform_compiler import SINK_FORMATS, StandInRadio, default_values, top_block_class
+
+APPS = ['pskGenerator', 'askGenerator', 'fskGenerator']
+SETTLE = 0.2  # seconds of running between changes
+
+
+class GapSink(StandInRadio, gr.sync_block):
+    """Stands in for soapy.sink; keeps the longest gap between work() calls"""
+    def __init__(self, device, cpu_format='fc32', *args):
+        gr.sync_block.__init__(self, name="gap_sink", in_sig=[SINK_FORMATS[cpu_format][0]], out_sig=None)
+        self.settings = {}
+        self.first = threading.Event()
+        self.last = None
+        self.max_gap = 0.0
+
+    def work(self, input_items, output_items):
+        now = time.perf_counter()
+        if self.last is not None:
+            self.max_gap = max(self.max_gap, now - self.last)
+        self.last = now
+        self.first.set()
+        return len(input_items[0])
+
+
+def build(module, values):
+    holder = {}
+
+    def make_sink(*args):
+        holder['sink'] = GapSink(*args)
+        return holder['sink']
+
+    module.soapy = types.SimpleNamespace(sink=make_sink)
+    started = time.perf_counter()
+    tb = top_block_class(module)(dict(values, radio_type='hackrf'))
+    tb.start()
+    holder['sink'].first.wait(10)
+    return tb, holder['sink'], (time.perf_counter() - started) * 1e3
+
+
+def measure(name, switches):
+    module = importlib.import_module(f"apps.{name}")
+    values = default_values(name)
+    tb, sink, relaunch_ms = build(module, values)
+    time.sleep(SETTLE)
+    sink.max_gap = 0.0
+    time.sleep(SETTLE)
+    baseline_ms = sink.max_gap * 1e3
+
+    outages, paused = [], []
+    for _ in range(switches):
+        sink.max_gap = 0.0
+        tb.set_bitsPerSym(tb.get_bitsPerSym() % 3 + 1)  # 1 -> 2 -> 3 -> 1
+        time.sleep(SETTLE)
+        outages.append(sink.max_gap * 1e3)
+        paused.append(tb.reconfigure_ms)
+    tb.stop()
+    tb.wait()
+    return relaunch_ms, baseline_ms, outages, paused
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--switches', type=int, default=20, help="modulation changes per app")
+    args = parser.parse_args(argv)
+
+    app = Qt.QApplication([sys.argv[0]])
+    print(f"{'app':<14} {'rebuild ms':>10} {'steady gap':>10} {'outage med':>10} {'outage max':>10} {'locked max':>10}")
+    for name in APPS:
+        relaunch_ms, baseline_ms, outages, paused = measure(name, args.switches)
+        print(f"{name:<14} {relaunch_ms:10.1f} {baseline_ms:10.2f} {statistics.median(outages):10.2f} "
+              f"{max(outages):10.2f} {max(paused):10.2f}")
+    app.quit()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Measure the NTSC composite synthesizer: still slide vs frame sequence.
+
+apps/ntsc_synth.py renders composite video from images instead of playing
+a pre-rendered float32 .dat file. The script writes colour bars and a short
+sequence of generated frames to a temporary directory, streams each through
+NtscSource and reports CPU seconds per second of 10 Msps output, the time
+to render one frame (against the 33.4 ms frame period), the frames the
+render-ahead thread did not finish in time and the memory the frame cache
+holds, next to the size of the .dat file the same playback would need.
+
+Run from the repository root (needs GNU Radio and Pillow, no radio hardware):
+
+    python benchmarks/ntsc_synth_cost.py [--seconds 5] [--frames 60]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np # type: ignore
+from gnuradio import blocks, gr # type: ignore
+from PIL import Image # type: ignore
+
+from apps.ntsc_synth import FRAME_PERIOD, NtscSource
+
+SAMP_RATE = 10e6
+BARS = [(191, 191, 191), (191, 191, 0), (0, 191, 191), (0, 191, 0), (191, 0, 191), (191, 0, 0), (0, 0, 191)]
+
+
+def write_media(directory, frames):
+    """Colour bars, and a directory of frames with a bar sweeping across a gradient"""
+    bars = np.repeat(np.array(BARS, np.uint8), 92, axis=0)[None].repeat(480, axis=0)
+    Image.fromarray(bars).save(os.path.join(directory, 'bars.png'))
+    sequence = os.path.join(directory, 'sequence')
+    os.mkdir(sequence)
+    ramp = np.linspace(0, 255, 640).astype(np.uint8)
+    for i in range(frames):
+        frame = np.stack([np.tile(ramp, (480, 1))] * 3, axis=-1)
+        x = i * 640 // frames
+        frame[:, x:x + 32] = (255, 64, 0)
+        Image.fromarray(frame).save(os.path.join(sequence, f'frame{i:04d}.png'))
+    return os.path.join(directory, 'bars.png'), sequence
+
+
+class Synth(gr.top_block):
+    def __init__(self, path, samples):
+        gr.top_block.__init__(self, "ntsc_synth_cost")
+        self.source = NtscSource(SAMP_RATE, path)
+        self.connect(self.source, blocks.head(gr.sizeof_float, samples), blocks.null_sink(gr.sizeof_float))
+
+
+def run(path, seconds):
+    started = time.perf_counter()
+    tb = Synth(path, int(seconds * SAMP_RATE))
+    setup = time.perf_counter() - started
+    cpu = time.process_time()
+    tb.run()
+    return setup, (time.process_time() - cpu) / seconds, tb.source.stats()
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5.0, help="seconds of 10 Msps output per run")
+    parser.add_argument('--frames', type=int, default=60, help="frames in the generated sequence")
+    args = parser.parse_args(argv)
+
+    dat_mb = args.seconds * SAMP_RATE * 4 / 2**20
+    print(f"frame period {1e3 * float(FRAME_PERIOD):.1f} ms; a .dat file for {args.seconds:g} s "
+          f"at 10 Msps is {dat_mb:.0f} MB ({dat_mb * 60 / args.seconds / 1024:.1f} GB per minute)")
+    print(f"{'source':>10} {'setup s':>8} {'CPU s/s':>8} {'rendered':>9} {'cached':>7} {'late':>5} {'ms/frame':>9} {'cache MB':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, path in zip(('still', 'sequence'), write_media(directory, args.frames)):
+            setup, cpu, stats = run(path, args.seconds)
+            print(f"{name:>10} {setup:8.2f} {cpu:8.3f} {stats['rendered']:9d} {stats['cache_hits']:7d} {stats['late']:5d} "
+                  f"{stats['render_ms']:9.1f} {stats['cached_mb']:9.1f}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
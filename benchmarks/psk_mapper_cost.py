@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Compare the PSK symbol mappers: per-sample phase modulator vs symbol-rate table.
+
+The old pskGenerator mapper repeated float symbol values to the sample rate
+and ran analog.phase_modulator_fc (sin/cos per sample) followed by a
+full-rate rotation multiply. The new one looks symbols up in psk_table()
+with digital.chunks_to_symbols_bc at the symbol rate and repeats the
+complex points. For BPSK, QPSK and 8PSK the script checks that both produce
+the same samples and reports CPU seconds per second of 5 Msps output.
+
+Run from the repository root (needs GNU Radio, no radio hardware):
+
+    python benchmarks/psk_mapper_cost.py [--seconds 10] [--symrate 100]
+"""
+
+import argparse
+import os
+import sys
+import time
+from math import pi
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np # type: ignore
+from gnuradio import analog, blocks, digital, gr # type: ignore
+
+from apps.pskGenerator import psk_table
+
+SAMP_RATE = 5e6
+CHECK_SAMPLES = 100000
+
+
+class Mapper(gr.top_block):
+    def __init__(self, bitsPerSym, sps, samples, table, sink=None):
+        gr.top_block.__init__(self, "psk_mapper_cost")
+        source = digital.glfsr_source_b(31, True, 0b1100000000010000000000010000000, 1001)
+        pack = blocks.pack_k_bits_bb(bitsPerSym)
+        if table:
+            chain = [digital.chunks_to_symbols_bc(psk_table(bitsPerSym), 1),
+                     blocks.repeat(gr.sizeof_gr_complex, sps)]
+        else:
+            chain = [blocks.uchar_to_float(), blocks.repeat(gr.sizeof_float, sps),
+                     analog.phase_modulator_fc(2*pi/(2**bitsPerSym)),
+                     blocks.multiply_const_cc(0.9*np.exp(1j*pi/(2**bitsPerSym)))]
+        self.sink = sink or blocks.null_sink(gr.sizeof_gr_complex)
+        self.connect(source, pack, *chain, blocks.head(gr.sizeof_gr_complex, samples), self.sink)
+
+
+def run(bitsPerSym, sps, samples, table):
+    tb = Mapper(bitsPerSym, sps, samples, table)
+    cpu = time.process_time()
+    tb.run()
+    return time.process_time() - cpu
+
+
+def output(bitsPerSym, sps, table):
+    tb = Mapper(bitsPerSym, sps, CHECK_SAMPLES, table, blocks.vector_sink_c())
+    tb.run()
+    return np.array(tb.sink.data())
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=10.0, help="seconds of 5 Msps output per run")
+    parser.add_argument('--symrate', type=float, default=100, help="symbol rate, kHz")
+    args = parser.parse_args(argv)
+    sps = int(SAMP_RATE/args.symrate/1000)
+    samples = int(args.seconds * SAMP_RATE)
+
+    print(f"{'mode':<5} {'max error':>10} {'phase mod':>10} {'table':>8} {'speedup':>8}   (CPU s per output s, {sps} samples/symbol)")
+    for bitsPerSym, mode in ((1, 'BPSK'), (2, 'QPSK'), (3, '8PSK')):
+        error = np.max(np.abs(output(bitsPerSym, sps, False) - output(bitsPerSym, sps, True)))
+        old = run(bitsPerSym, sps, samples, False) / args.seconds
+        new = run(bitsPerSym, sps, samples, True) / args.seconds
+        print(f"{mode:<5} {error:10.2e} {old:10.3f} {new:8.3f} {old / new:7.1f}x")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
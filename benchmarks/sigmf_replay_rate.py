@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Measure the sustained replay rate of SigmfSource against a null sink.
+
+A SigMF recording (cf32_le and ci16_le, written to a temporary directory
+unless ``--file`` is given) is replayed in a loop as fast as the flowgraph
+allows into blocks.null_sink, standing in for the radio. The replay app
+needs 20 Msps (the HackRF maximum); the script reports the achieved rate
+and CPU use per format and exits non-zero if any falls short.
+
+Run from the repository root (needs GNU Radio, no radio hardware):
+
+    python benchmarks/sigmf_replay_rate.py [--seconds 5] [--file capture.sigmf-meta]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np # type: ignore
+from gnuradio import blocks, gr # type: ignore
+
+from apps.sigmf_source import SigmfCapture, SigmfSource
+
+TARGET_RATE = 20e6
+RECORDING_SECONDS = 1.0  # length of the generated test recordings
+
+
+def write_recording(directory, datatype, samp_rate, seconds):
+    """Write a noise recording of ``seconds`` at ``samp_rate``; return its meta path"""
+    base = os.path.join(directory, f"replay-{datatype}")
+    count = int(samp_rate * seconds)
+    rng = np.random.default_rng(1)
+    with open(base + '.sigmf-data', 'wb') as f:
+        for start in range(0, count, 1 << 20):
+            n = min(1 << 20, count - start)
+            iq = rng.standard_normal((n, 2)).astype(np.float32) * 0.2
+            if datatype == 'ci16_le':
+                iq = (iq * 32767).astype(np.int16)
+            f.write(iq.tobytes())
+    with open(base + '.sigmf-meta', 'w') as f:
+        json.dump({'global': {'core:datatype': datatype, 'core:sample_rate': samp_rate,
+                              'core:version': '1.0.0'},
+                   'captures': [{'core:sample_start': 0}], 'annotations': []}, f)
+    return base + '.sigmf-meta'
+
+
+class Replay(gr.top_block):
+    def __init__(self, path):
+        gr.top_block.__init__(self, "sigmf_replay_rate")
+        self.capture = SigmfCapture(path)
+        self.source = SigmfSource(self.capture, loop=True)
+        self.sink = blocks.null_sink(self.capture.itemsize)
+        self.connect(self.source, self.sink)
+
+
+def measure(path, seconds):
+    tb = Replay(path)
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    tb.start()
+    time.sleep(seconds)
+    tb.stop()
+    tb.wait()
+    cpu, wall = time.process_time() - cpu0, time.perf_counter() - wall0
+    rate = tb.sink.nitems_read(0) / wall
+    datatype = tb.capture.datatype
+    tb.capture.close()
+    return datatype, rate, cpu / wall
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--file', help="replay this .sigmf-meta instead of generated recordings")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [args.file] if args.file else [
+            write_recording(directory, datatype, TARGET_RATE, RECORDING_SECONDS)
+            for datatype in ('cf32_le', 'ci16_le')]
+        print(f"{'datatype':>9} {'Msps':>8} {'cpu':>6} {'target':>7}")
+        ok = True
+        for path in paths:
+            datatype, rate, cpu = measure(path, args.seconds)
+            passed = rate >= TARGET_RATE
+            ok &= passed
+            print(f"{datatype:>9} {rate / 1e6:8.1f} {cpu:6.2f} {'ok' if passed else 'SLOW':>7}")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Compare the NTSC VSB chains: four mixers vs one band-pass plus interpolate-and-shift.
+
+The old ntscAnalogVideoRecorded chain mixed the video by -1.725 MHz,
+low-pass filtered it, mixed it by -25 kHz, added the FM audio mixed to
+2.75 MHz, interpolated 2x and mixed by -6 MHz at 20 Msps. The new one
+(apps/vsb.py) filters the video with one complex band-pass, generates the
+aural carrier with AuralModulator and uses InterpolateShift for the rest.
+Both are fed the same synthetic video and 48 kHz audio. The script reports CPU seconds
+per second of 20 Msps output and compares the channel spectra.
+
+Run from the repository root (needs GNU Radio, no radio hardware):
+
+    python benchmarks/vsb_engine_cost.py [--seconds 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+from math import pi
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np # type: ignore
+from gnuradio import analog, blocks, filter, gr # type: ignore
+from gnuradio.fft import window # type: ignore
+from gnuradio.filter import firdes # type: ignore
+
+from apps.vsb import AuralModulator, InterpolateShift, vsb_taps
+
+SAMP_RATE = 10e6
+AUDIO_RATE = 48e3
+NFFT = 4096
+CHECK_SAMPLES = 2000000
+
+
+def test_signals():
+    """A 0.1 s loop of noise-like video (DC + 0..4 MHz) and a 1 kHz audio tone"""
+    rng = np.random.default_rng(1)
+    n = 1 << 20
+    video = 1 + 0.3 * np.convolve(rng.normal(size=n), firdes.low_pass(1, SAMP_RATE, 4.0e6, 200e3))[:n]
+    audio = 0.7 * np.sin(2 * pi * 1e3 * np.arange(480) / AUDIO_RATE)
+    return blocks.vector_source_f(video.tolist(), True), blocks.vector_source_f(audio.tolist(), True)
+
+
+class Vsb(gr.top_block):
+    def __init__(self, samples, engine, sink=None):
+        gr.top_block.__init__(self, "vsb_engine_cost")
+        video, audio = test_signals()
+        self.sink = sink or blocks.null_sink(gr.sizeof_gr_complex)
+        to_complex = blocks.float_to_complex(1)
+        self.connect(video, to_complex)
+        self.connect(blocks.null_source(gr.sizeof_float), (to_complex, 1))
+        add = blocks.add_vcc(1)
+        if engine:
+            self.connect(to_complex, filter.fft_filter_ccc(1, vsb_taps(SAMP_RATE, 1/0.8), 1), (add, 0))
+            self.connect(audio, AuralModulator(AUDIO_RATE, SAMP_RATE), (add, 1))
+            self.connect(add, blocks.multiply_const_cc(0.25*0.8), InterpolateShift(SAMP_RATE, -7.75e6),
+                         blocks.head(gr.sizeof_gr_complex, samples), self.sink)
+        else:
+            def mixer(rate, freq, amplitude=1):
+                multiply = blocks.multiply_vcc(1)
+                self.connect(analog.sig_source_c(rate, analog.GR_COS_WAVE, freq, amplitude, 0, 0), (multiply, 1))
+                return multiply
+            lpf = filter.fft_filter_ccc(1, firdes.low_pass(1, SAMP_RATE, 2.475e6, 300e3, window.WIN_HAMMING, 6.76), 1)
+            self.connect(to_complex, mixer(SAMP_RATE, -1.725e6), lpf, mixer(SAMP_RATE, -25e3), (add, 0))
+            audio_resampler = filter.rational_resampler_fff(interpolation=625, decimation=3, taps=[], fractional_bw=0)
+            self.connect(audio, audio_resampler, analog.frequency_modulator_fc(2*pi*25e3/SAMP_RATE),
+                         mixer(SAMP_RATE, 2.75e6, 0.8), (add, 1))
+            resampler = filter.rational_resampler_ccc(interpolation=2, decimation=1, taps=[], fractional_bw=0)
+            self.connect(add, blocks.multiply_const_cc(0.25), resampler, mixer(SAMP_RATE*2, -6e6),
+                         blocks.head(gr.sizeof_gr_complex, samples), self.sink)
+
+
+def run(samples, engine):
+    tb = Vsb(samples, engine)
+    cpu = time.process_time()
+    tb.run()
+    return time.process_time() - cpu
+
+
+def spectrum(engine):
+    tb = Vsb(CHECK_SAMPLES, engine, blocks.vector_sink_c())
+    tb.run()
+    x = np.array(tb.sink.data())[NFFT:]
+    segments = x[:len(x) // NFFT * NFFT].reshape(-1, NFFT) * np.hanning(NFFT)
+    power = np.mean(np.abs(np.fft.fftshift(np.fft.fft(segments, axis=1), axes=1))**2, axis=0)
+    return 10*np.log10(power + 1e-30)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5.0, help="seconds of 20 Msps output per run")
+    args = parser.parse_args(argv)
+    samples = int(args.seconds * 2 * SAMP_RATE)
+
+    freq = (np.arange(NFFT) - NFFT // 2) * 2 * SAMP_RATE / NFFT
+    channel = (freq > -9e6) & (freq < -3e6)
+    old, new = spectrum(False), spectrum(True)
+    strong = channel & (old > old.max() - 30)
+    print(f"in-channel spectrum difference (bins within 30 dB of peak): {np.max(np.abs(old - new)[strong]):.3f} dB")
+    print(f"out-of-channel peak, dB below channel peak: old {old[channel].max() - old[~channel].max():.1f}, "
+          f"new {new[channel].max() - new[~channel].max():.1f}")
+
+    mixers = run(samples, False) / args.seconds
+    engine = run(samples, True) / args.seconds
+    print(f"CPU s per output s: four mixers {mixers:.3f}, band-pass + interpolate-shift {engine:.3f} "
+          f"({mixers / engine:.1f}x)")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -5,7 +5,6 @@
 import sys
 import os
 import json
-import importlib.util
 
 # Third party imports
 from PyQt5.QtWidgets import ( # type: ignore
@@ -19,16 +18,18 @@ from PyQt5.QtWidgets import ( # type: ignore
     QDialog,
     QMessageBox
 )
-from PyQt5.QtCore import Qt, QSize, QPoint # type: ignore
-from PyQt5.QtGui import QIcon, QPixmap, QFont # type: ignore
-
-# Add PIL import at the top with other imports
-from PIL import Image, ImageEnhance # type: ignore
-import io
+from PyQt5.QtCore import Qt, QSize, QPoint, QTimer # type: ignore
+from PyQt5.QtGui import QIcon, QFont # type: ignore
 
 # Local imports 
-from apps.utils import apply_launcher_theme, apply_dark_theme, DialogGeometryTracker
+from apps.utils import apply_launcher_theme, apply_dark_theme, DialogGeometryTracker, SettingsFollower, refresh_usrp_selector
+from apps.settings_store import get_settings_store, atomic_write_json
 from apps.settings_dialog import SettingsDialog
+from apps.module_registry import AppModuleRegistry
+from apps.device_discovery import get_device_discovery
+from apps.icon_cache import cached_pixmap, transparent_light_pixels
+from apps.app_index import load_app_index, APP_CATEGORIES
+from apps.multi_launch import coordinated_launch
 
 
 class GNURadioLauncher(QMainWindow):
@@ -42,6 +43,15 @@ class GNURadioLauncher(QMainWindow):
         self.config_dir = "config"
         self.settings_file = os.path.join(self.config_dir, "window_settings.json")
         os.makedirs(self.config_dir, exist_ok=True)
+        self.settings_store = get_settings_store(self.settings_file)
+        self.settings_store.add_listener(self.on_settings_changed)
+
+        # App modules are imported once and reused across launches
+        self.app_registry = AppModuleRegistry()
+        self.app_modules = []
+
+        # Radios are enumerated in the background; launches only read the cache
+        self.device_discovery = get_device_discovery()
         
         # Create main widget and layout
         main_widget = QWidget()
@@ -52,32 +62,10 @@ class GNURadioLauncher(QMainWindow):
         settings_btn = QPushButton()
         icon_path = "icons/settings.png"
         
-        # Process image with PIL
-        img = Image.open(icon_path)
-        img = img.convert("RGBA")
-        
-        # Add brightness enhancement
-        enhancer = ImageEnhance.Brightness(img)
-        img = enhancer.enhance(1.1)  # Adjust this value to make it brighter/darker
-        
-        datas = img.getdata()
-        new_data = []
-        threshold = 100
-        
-        for item in datas:
-            if item[0] >= threshold and item[1] >= threshold and item[2] >= threshold:
-                new_data.append((255, 255, 255, 0))
-            else:
-                new_data.append(item)
-        
-        img.putdata(new_data)
-        
-        # Convert PIL image to QPixmap
-        buffer = io.BytesIO()
-        img.save(buffer, "PNG")
-        buffer.seek(0)
-        pixmap = QPixmap()
-        pixmap.loadFromData(buffer.getvalue())
+        # Brighten the icon and make its light background transparent
+        # (processed once, then served from the on-disk icon cache)
+        pixmap = cached_pixmap(icon_path, 40, self.devicePixelRatioF(),
+                               transform=transparent_light_pixels, variant="transparent")
         
         icon = QIcon(pixmap)
         settings_btn.setIcon(icon)
@@ -92,27 +80,21 @@ class GNURadioLauncher(QMainWindow):
         title.setAlignment(Qt.AlignCenter)
         grid.addWidget(title, 0, 0, 1, 3)
         
-        # Add application buttons
-        self.create_app_button("AM Sine Generator", "amSineGenerator", "amSine.jpg", grid, 1, 0)
-        self.create_app_button("ASK Generator", "askGenerator", "ask.jpg", grid, 1, 1)
-        self.create_app_button("FSK Signal Generator", "fskGenerator", "fsk.jpg", grid, 1, 2)
-        self.create_app_button("PSK Signal Generator", "pskGenerator", "psk.jpg", grid, 1, 3)
-        self.create_app_button("PPM-OOK Generator", "ppmookAudioXmitter", "ppm-ook.png", grid, 1, 4)
-        # Audio
-        self.create_app_button("AM Audio Generator", "amAudioInternalGeneratorLive", "amAudio.jpg", grid, 2, 0)
-        self.create_app_button("FM Audio Generator", "fmAudioRecordedGenerator", "fmAudio.png", grid, 2, 1)
-        self.create_app_button("FM Subcarrier", "subcarrierRecordedAudio", "fmSubcarrier.jpg", grid, 2, 2)
-        # Video
-        self.create_app_button("ATSC Video Transmitter", "atscXmitter", "atsc.jpg", grid, 3, 0)
-        #self.create_app_button("ATSC Transmitter", "atscXmitter", "atsc.jpg", grid, 3, 0)
-        self.create_app_button("NTSC Analog Video", "ntscAnalogVideoRecorded", "ntsc.jpg", grid, 3, 1)
-        self.create_app_button("AM Video Transmitter", "amVideoRecordedXmitter", "amVideo.jpg", grid, 3, 2)
+        # Add application buttons from the app manifests, one row per category
+        self.app_manifests = {m['module']: m for m in load_app_index()}
+        for row, category in enumerate(APP_CATEGORIES, start=1):
+            apps = [m for m in self.app_manifests.values() if m.get('category') == category]
+            for col, manifest in enumerate(apps):
+                self.create_app_button(manifest['name'], manifest['module'], manifest['icon'], grid, row, col)
         
         # Apply stylesheet
         apply_launcher_theme(self)
         
         # Load last position or center if none exists
         self.load_window_position()
+
+        # Warm the app modules once the window has been painted
+        QTimer.singleShot(0, self.preload_applications)
         
     def center_window(self):
         """Center the window on the screen and save position"""
@@ -128,61 +110,58 @@ class GNURadioLauncher(QMainWindow):
         self.save_window_position()
         
     def save_window_position(self):
-        """Save the current window position and size to settings file"""
+        """Save the current window position and size to the settings store"""
         try:
-            # Load existing settings
-            settings = {}
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r') as f:
-                    settings = json.load(f)
-            
-            # Update window position and size
-            settings['window_position'] = {
+            self.settings_store.set('window_position', {
                 'x': self.pos().x(),
                 'y': self.pos().y(),
                 'width': self.width(),
                 'height': self.height()
-            }
-
-            
-            # Save updated settings
-            with open(self.settings_file, 'w') as f:
-                json.dump(settings, f, indent=4)
+            })
         except Exception as e:
             print(f"Error saving window position: {e}")
             
     def load_window_position(self):
-        """Load the saved window position and size from settings file or center if none exists"""
+        """Load the saved window position and size from the settings store or center if none exists"""
         try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r') as f:
-                    settings = json.load(f)
-                    if 'window_position' in settings:
-                        position = settings['window_position']
-                        screen = self.app.primaryScreen().geometry()
-                        
-                        # Restore position if valid
-                        if (0 <= position['x'] <= screen.width() - self.width() and 
-                            0 <= position['y'] <= screen.height() - self.height()):
-                            self.move(QPoint(position['x'], position['y']))
-                        else:
-                            self.center_window()
-                            
-                        # Restore size if saved and valid
-                        if 'width' in position and 'height' in position:
-                            # Ensure size is within reasonable bounds
-                            width = min(max(position['width'], 800), screen.width())
-                            height = min(max(position['height'], 600), screen.height())
-                            self.resize(width, height)
-                    else:
-                        self.center_window()
+            position = self.settings_store.get('window_position')
+            if position:
+                screen = self.app.primaryScreen().geometry()
+                
+                # Restore position if valid
+                if (0 <= position['x'] <= screen.width() - self.width() and 
+                    0 <= position['y'] <= screen.height() - self.height()):
+                    self.move(QPoint(position['x'], position['y']))
+                else:
+                    self.center_window()
+                    
+                # Restore size if saved and valid
+                if 'width' in position and 'height' in position:
+                    # Ensure size is within reasonable bounds
+                    width = min(max(position['width'], 800), screen.width())
+                    height = min(max(position['height'], 600), screen.height())
+                    self.resize(width, height)
             else:
                 self.center_window()
         except Exception as e:
             print(f"Error loading window position: {e}")
             self.center_window()
 
+    def preload_applications(self):
+        """Import all app modules in the background so ConfigDialogs open instantly"""
+        radio_type = self.settings_store.get('radio_type', 'hackrf')
+        self.app_registry.preload(self.app_modules, radio_type)
+        # Only the configured radio type is enumerated, so only its driver is loaded
+        self.device_discovery.refresh(radio_type)
+
+    def on_settings_changed(self, changed):
+        """Warm and enumerate the other radio driver when the radio type is switched in Settings"""
+        if 'radio_type' in changed:
+            self.preload_applications()
+
     def create_app_button(self, name, module_name, icon_name, grid, row, col):
+        self.app_modules.append(module_name)
+
         # Create button
         btn = QPushButton()
         size = 200  # Square size
@@ -197,8 +176,7 @@ class GNURadioLauncher(QMainWindow):
         # Create label for icon
         icon_label = QLabel()
         icon_path = f"icons/{icon_name}"
-        icon = QIcon(icon_path)
-        pixmap = icon.pixmap(QSize(size - 0, size - 0))  # Slightly smaller to accommodate text
+        pixmap = cached_pixmap(icon_path, size, self.devicePixelRatioF())
         icon_label.setPixmap(pixmap)
         icon_label.setAlignment(Qt.AlignCenter)
         
@@ -223,11 +201,8 @@ class GNURadioLauncher(QMainWindow):
         
     def launch_application(self, module_name):
         try:
-            # Import the module
-            module_path = os.path.join('apps', f"{module_name}.py")
-            spec = importlib.util.spec_from_file_location(module_name, module_path)
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
+            # Get the module (imported once, reloaded only if its file changed)
+            module = self.app_registry.get(module_name)
             
             # Create configuration dialog (no need to pass parameters)
             config_dialog = module.ConfigDialog()
@@ -264,6 +239,10 @@ class GNURadioLauncher(QMainWindow):
             # Track geometry before the dialog is hidden (covers OK, Cancel, and window close)
             tracker = DialogGeometryTracker(config_dialog)
 
+            # Keep the USRP list current if the addresses change while the dialog is open
+            SettingsFollower(config_dialog, lambda changed: refresh_usrp_selector(config_dialog, changed),
+                             self.settings_store)
+
             # Show dialog and wait for user response
             result = config_dialog.exec_()
 
@@ -280,22 +259,18 @@ class GNURadioLauncher(QMainWindow):
                     'height': config_dialog.height(),
                 }
                 app_config['dialog_position'] = pos
-                with open(app_config_file, 'w') as f:
-                    json.dump(app_config, f, indent=4)
+                atomic_write_json(app_config_file, app_config)
             except Exception as e:
                 print(f"Error saving dialog position: {e}")
 
             if result == QDialog.Accepted:
                 config_values = config_dialog.get_values()
 
-                # Validate HackRF is present before launching
+                # Validate HackRF is present before launching (None means discovery
+                # has not finished yet; the flowgraph then reports a missing radio)
                 if config_values.get('radio_type') == 'hackrf':
-                    try:
-                        import SoapySDR
-                        devices = SoapySDR.Device.enumerate({'driver': 'hackrf'})
-                        if not devices:
-                            raise RuntimeError("no hackrf device found")
-                    except Exception:
+                    if self.device_discovery.is_present('hackrf') is False:
+                        self.device_discovery.refresh('hackrf')
                         QMessageBox.warning(
                             self, "HackRF Not Found",
                             "No HackRF One was detected on USB.\n\n"
@@ -305,22 +280,23 @@ class GNURadioLauncher(QMainWindow):
                         return
 
                 # Load radio mode setting
-                radio_mode = 'single'
-                try:
-                    if os.path.exists(self.settings_file):
-                        with open(self.settings_file, 'r') as f:
-                            settings = json.load(f)
-                            radio_mode = settings.get('radio_mode', 'single')
-                except Exception as e:
-                    print(f"Error loading radio mode setting: {e}")
+                radio_mode = self.settings_store.get('radio_mode', 'single')
 
                 # Only hide launcher in single mode
                 if radio_mode == 'single':
                     self.save_window_position()
                     self.hide()
                 
-                # Start the GNU Radio application
-                tb = module.main(app=self.app, config_values=config_values)
+                # Start the GNU Radio application (on every USRP at once for a synchronized launch)
+                if (radio_mode == 'multi' and config_values.get('radio_type') == 'usrp'
+                        and self.settings_store.get('sync_launch', False)):
+                    tbs = coordinated_launch(module, config_values,
+                                             self.settings_store.get('ip_addresses', []),
+                                             self.settings_store.get('time_source', 'host'))
+                    self.synchronized_apps = tbs
+                    tb = tbs[0]
+                else:
+                    tb = module.main(app=self.app, config_values=config_values)
                 
                 # Modify close event only in single mode
                 if radio_mode == 'single' and hasattr(tb, 'closeEvent'):
@@ -354,20 +330,14 @@ class GNURadioLauncher(QMainWindow):
         tracker = DialogGeometryTracker(settings_dialog)
         settings_dialog.exec_()
         if tracker.captured:
-            try:
-                existing = {}
-                if os.path.exists(self.settings_file):
-                    with open(self.settings_file, 'r') as f:
-                        existing = json.load(f)
-                existing['settings_dialog_position'] = tracker.captured
-                with open(self.settings_file, 'w') as f:
-                    json.dump(existing, f, indent=4)
-            except Exception as e:
-                print(f"Error saving settings dialog geometry: {e}")
+            self.settings_store.set('settings_dialog_position', tracker.captured)
+        # Parented to the launcher, so it would otherwise live (hidden) until exit
+        settings_dialog.deleteLater()
 
     def closeEvent(self, event):
         """Save window position when closing the application"""
         self.save_window_position()
+        self.settings_store.flush()
         super().closeEvent(event)
 
 if __name__ == '__main__':